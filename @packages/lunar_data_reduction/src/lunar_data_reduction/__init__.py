@@ -0,0 +1,7 @@
+from .data_reduction import downcast, read_csv_reduced, pop_data_reduction_settings
+
+__all__ = [
+    "downcast",
+    "read_csv_reduced",
+    "pop_data_reduction_settings",
+]
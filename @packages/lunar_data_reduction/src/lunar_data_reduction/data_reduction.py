@@ -0,0 +1,97 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# column holding the random sampling key of each row while reading
+_KEY = '__sample_key__'
+# column holding the position of each row in the file
+_ROW = '__sample_row__'
+
+
+def downcast(data: pd.DataFrame) -> pd.DataFrame:
+    """ Downcast float columns to float32 and integer columns to the smallest integer type. """
+    data = data.copy()
+    for column in data.columns:
+        if pd.api.types.is_float_dtype(data[column]):
+            data[column] = data[column].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(data[column]) and not pd.api.types.is_bool_dtype(data[column]):
+            data[column] = pd.to_numeric(data[column], downcast='integer')
+    return data
+
+
+def _strata_quotas(path: str, sep: str, stratify_by: str, max_rows: int, chunk_size: int) -> pd.Series:
+    """ Rows to keep per stratum, proportional to the stratum sizes (at least 1 each). """
+    counts = pd.Series(dtype=np.int64)
+    for chunk in pd.read_csv(path, sep=sep, usecols=[stratify_by], chunksize=chunk_size):
+        counts = counts.add(chunk[stratify_by].value_counts(dropna=False), fill_value=0)
+    total = counts.sum()
+    if total <= max_rows:
+        return counts.astype(np.int64)
+    return np.maximum(1, np.floor(counts * max_rows / total)).astype(np.int64)
+
+
+def read_csv_reduced(
+    path: str,
+    sep: str = ',',
+    max_rows: int = 0,
+    stratify_by: str = None,
+    chunk_size: int = 100_000,
+    downcast_dtypes: bool = False,
+    seed: int = 0) -> pd.DataFrame:
+    """
+    Read a CSV file keeping at most `max_rows` rows, sampled uniformly at random
+    (reservoir sampling) or, with `stratify_by`, proportionally to the strata of
+    that column. The file is read in chunks of `chunk_size` rows, so memory is
+    bounded by the sample and one chunk. The sampled rows keep their order in
+    the file (time series are thinned, not shuffled).
+
+    path: CSV file path
+    sep: separator = ','
+    max_rows: rows to keep, 0 to read the whole file = 0
+    stratify_by: column to stratify the sample by = None
+    chunk_size: rows read at a time = 100000
+    downcast_dtypes: downcast float columns to float32 = False
+    seed: random seed of the sample = 0
+    """
+    if max_rows <= 0:
+        data = pd.read_csv(path, sep=sep)
+        return downcast(data) if downcast_dtypes else data
+
+    rng = np.random.default_rng(seed)
+    quotas = _strata_quotas(path, sep, stratify_by, max_rows, chunk_size) if stratify_by else None
+
+    sample = None
+    offset = 0
+    for chunk in pd.read_csv(path, sep=sep, chunksize=chunk_size):
+        if downcast_dtypes:
+            chunk = downcast(chunk)
+        chunk[_ROW] = np.arange(offset, offset + len(chunk))
+        # the rows with the smallest random keys are a uniform sample of the rows seen
+        chunk[_KEY] = rng.random(len(chunk))
+        offset += len(chunk)
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        sample = sample.sort_values(_KEY, kind='stable')
+        if quotas is None:
+            sample = sample.head(max_rows)
+        else:
+            strata = sample[stratify_by]
+            rank = sample.groupby(strata, dropna=False, sort=False).cumcount()
+            sample = sample[rank.to_numpy() < strata.map(quotas).fillna(0).to_numpy()]
+
+    if sample is None:
+        return pd.read_csv(path, sep=sep)
+    return sample.sort_values(_ROW).drop(columns=[_KEY, _ROW]).reset_index(drop=True)
+
+
+def pop_data_reduction_settings(configuration: Dict) -> Dict:
+    """
+    Pop the data reduction settings (max_rows, stratify_by, read_chunk_size and
+    downcast_dtypes) from a component configuration, as `read_csv_reduced` arguments.
+    """
+    return {
+        "max_rows": int(configuration.pop("max_rows", 0) or 0),
+        "stratify_by": configuration.pop("stratify_by", "") or None,
+        "chunk_size": int(configuration.pop("read_chunk_size", 100000) or 100000),
+        "downcast_dtypes": configuration.pop("downcast_dtypes", False) in [True, 1, "True", "1"],
+    }
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lunar_data_reduction import downcast, pop_data_reduction_settings, read_csv_reduced
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    data = pd.DataFrame(
+        {
+            "t": np.arange(1000),
+            "x": np.linspace(0.0, 1.0, 1000),
+            "group": ["a"] * 900 + ["b"] * 100,
+        }
+    )
+    path = tmp_path / "data.csv"
+    data.to_csv(path, index=False)
+    return str(path)
+
+
+def test_read_without_limit_reads_the_whole_file(csv_path):
+    data = read_csv_reduced(csv_path)
+
+    assert len(data) == 1000
+    assert list(data.columns) == ["t", "x", "group"]
+
+
+def test_read_with_limit_keeps_file_order(csv_path):
+    data = read_csv_reduced(csv_path, max_rows=100, chunk_size=64)
+
+    assert len(data) == 100
+    assert list(data.columns) == ["t", "x", "group"]
+    assert data["t"].is_monotonic_increasing
+    assert data["t"].is_unique
+
+
+def test_read_with_limit_is_reproducible(csv_path):
+    first = read_csv_reduced(csv_path, max_rows=50, chunk_size=64, seed=1)
+    second = read_csv_reduced(csv_path, max_rows=50, chunk_size=64, seed=1)
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_read_stratified_keeps_strata_proportions(csv_path):
+    data = read_csv_reduced(csv_path, max_rows=100, stratify_by="group", chunk_size=64)
+
+    assert data["group"].value_counts().to_dict() == {"a": 90, "b": 10}
+
+
+def test_read_with_limit_above_file_size_reads_everything(csv_path):
+    data = read_csv_reduced(csv_path, max_rows=5000, chunk_size=64)
+
+    assert len(data) == 1000
+
+
+def test_downcast_shrinks_numeric_columns():
+    data = pd.DataFrame({"i": [1, 2, 3], "f": [0.5, 1.5, 2.5], "b": [True, False, True], "s": ["x", "y", "z"]})
+
+    reduced = downcast(data)
+
+    assert reduced["i"].dtype == np.int8
+    assert reduced["f"].dtype == np.float32
+    assert reduced["b"].dtype == bool
+    assert reduced["s"].dtype == data["s"].dtype
+    assert data["f"].dtype == np.float64
+
+
+def test_pop_settings_removes_them_from_the_configuration():
+    configuration = {
+        "model": "gpt",
+        "max_rows": "200",
+        "stratify_by": "group",
+        "read_chunk_size": "",
+        "downcast_dtypes": "True",
+    }
+
+    settings = pop_data_reduction_settings(configuration)
+
+    assert settings == {
+        "max_rows": 200,
+        "stratify_by": "group",
+        "chunk_size": 100000,
+        "downcast_dtypes": True,
+    }
+    assert configuration == {"model": "gpt"}
+
+
+def test_pop_settings_defaults():
+    assert pop_data_reduction_settings({}) == {
+        "max_rows": 0,
+        "stratify_by": None,
+        "chunk_size": 100000,
+        "downcast_dtypes": False,
+    }
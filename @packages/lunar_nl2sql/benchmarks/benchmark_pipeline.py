@@ -0,0 +1,293 @@
+"""
+Offline benchmark of the NL2SQL pipeline cost.
+
+Runs Indexer, ContextRetriever and Generator against synthetic SQLite/CSV schemas with a
+deterministic local AI service, and reports per schema size the prompts and prompt tokens
+per question, the wall time and the peak memory.
+
+Usage:
+    python benchmarks/benchmark_pipeline.py --tables 10 100 1000 --questions 20
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lunar_nl2sql.data_access import (
+    CsvDataAccess,
+    DataAccess,
+    DuckDBCsvDataAccess,
+    SqliteDataAccess,
+)
+from lunar_nl2sql.generators import ContextBuilder, Generator
+from lunar_nl2sql.generators.context_builder import default_token_counter
+from lunar_nl2sql.indexers import Indexer
+from lunar_nl2sql.retrievers import ContextRetriever
+from lunar_nl2sql.services.ai import AIService
+
+COLUMNS_PER_TABLE = 6
+ROWS_PER_TABLE = 50
+CITIES = ["Geneva", "Zurich", "Bern", "Basel", "Lausanne", "Lugano"]
+
+
+class StubAIService(AIService):
+    """
+    Deterministic local AI service answering every pipeline prompt from the expected
+    answer of the benchmark question found in the prompt, and recording the prompt sizes.
+    """
+
+    def __init__(
+        self,
+        answers: Dict[str, dict],
+        latency: float = 0.0,
+        max_concurrency: int = 1,
+        embedding_size: int = 64,
+    ):
+        super().__init__(max_concurrency=max_concurrency)
+        self.answers = answers
+        self.latency = latency
+        self.embedding_size = embedding_size
+        self.count_tokens = default_token_counter()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.prompts = Counter()
+        self.prompt_tokens = Counter()
+        self.max_prompt_tokens = 0
+
+    def connect(self) -> None:
+        self._client = self
+
+    def run(self, messages: List[Dict[str, str]], type: str = "text", **kwargs):
+        return self._request(self._respond, messages, type, **kwargs)
+
+    @property
+    def supports_embeddings(self) -> bool:
+        return True
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _respond(self, messages, type, response_format=None, **kwargs):
+        prompt = messages[-1]["content"]
+        kind = response_format.__module__.rsplit(".", 1)[-1] if response_format else "text"
+        tokens = self.count_tokens(prompt)
+        with self._stats_lock:
+            self.prompts[kind] += 1
+            self.prompt_tokens[kind] += tokens
+            self.max_prompt_tokens = max(self.max_prompt_tokens, tokens)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if response_format is None:
+            return self._message(content=f"Description of: {prompt[:200]}")
+
+        answer = next(
+            (answer for question, answer in self.answers.items() if question in prompt),
+            None,
+        )
+        fields = response_format.model_fields
+        if "tables" in fields:
+            parsed = {"tables": [answer["table"]] if answer else []}
+        elif "table_attributes" in fields:
+            parsed = {
+                "table_attributes": (
+                    [{"table": answer["table"], "attributes": answer["attributes"]}]
+                    if answer
+                    else []
+                )
+            }
+        elif "references" in fields:
+            parsed = {
+                "references": (
+                    [
+                        {
+                            "table": answer["table"],
+                            "attribute": answer["attributes"][-1],
+                            "values": answer["values"],
+                        }
+                    ]
+                    if answer
+                    else []
+                )
+            }
+        else:
+            parsed = {"sql": answer["sql"] if answer else "SELECT 1"}
+        return self._message(parsed=response_format.model_validate(parsed))
+
+    @staticmethod
+    def _message(content: Optional[str] = None, parsed=None):
+        message = SimpleNamespace(content=content, parsed=parsed)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.embedding_size, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.embedding_size] += 1.0
+        return vector.tolist()
+
+
+def synthetic_tables(n_tables: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    rng = random.Random(seed)
+    tables = {}
+    for t in range(n_tables):
+        data = {
+            "id": list(range(ROWS_PER_TABLE)),
+            "city": [rng.choice(CITIES) for _ in range(ROWS_PER_TABLE)],
+        }
+        for c in range(COLUMNS_PER_TABLE - 2):
+            data[f"measure_{c}"] = [rng.randint(0, 1000) for _ in range(ROWS_PER_TABLE)]
+        tables[f"table_{t}"] = pd.DataFrame(data)
+    return tables
+
+
+def synthetic_questions(tables: Dict[str, pd.DataFrame], n_questions: int, seed: int = 0):
+    rng = random.Random(seed)
+    answers = {}
+    for q in range(n_questions):
+        table = rng.choice(list(tables))
+        city = rng.choice(CITIES)
+        question = f"Question {q}: what is the total measure_0 of {table} rows in {city}?"
+        answers[question] = {
+            "table": table,
+            "attributes": ["measure_0", "city"],
+            "values": [city],
+            "sql": f"SELECT SUM(measure_0) FROM {table} WHERE city = '{city}'",
+        }
+    return answers
+
+
+def create_data_access(backend: str, tables: Dict[str, pd.DataFrame], directory: Path) -> DataAccess:
+    if backend == "sqlite":
+        db_path = directory / "benchmark.db"
+        with sqlite3.connect(db_path) as connection:
+            for table_name, df in tables.items():
+                df.to_sql(table_name, connection, index=False)
+        return SqliteDataAccess(str(db_path))
+
+    csv_paths = {}
+    for table_name, df in tables.items():
+        csv_paths[table_name] = str(directory / f"{table_name}.csv")
+        df.to_csv(csv_paths[table_name], index=False)
+    if backend == "duckdb_csv":
+        return DuckDBCsvDataAccess(csv_paths)
+    return CsvDataAccess(csv_paths)
+
+
+def run_benchmark(
+    backend: str,
+    n_tables: int,
+    n_questions: int,
+    latency: float = 0.0,
+    max_concurrency: int = 1,
+    max_candidate_tables: Optional[int] = None,
+    use_value_index: bool = False,
+    token_budget: Optional[int] = None,
+) -> dict:
+    tables = synthetic_tables(n_tables)
+    answers = synthetic_questions(tables, n_questions)
+    ai_service = StubAIService(answers, latency=latency, max_concurrency=max_concurrency)
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_access = create_data_access(backend, tables, Path(directory))
+
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        indexer = Indexer(ai_service, data_access)
+        indexer.nl_db_schema
+        if max_candidate_tables:
+            indexer.table_vector_index
+        if use_value_index:
+            indexer.value_index
+        index_time = time.perf_counter() - start
+        index_prompts = sum(ai_service.prompts.values())
+        ai_service.reset_stats()
+
+        context_retriever = ContextRetriever(
+            ai_service,
+            indexer,
+            max_candidate_tables=max_candidate_tables,
+            use_value_index=use_value_index,
+        )
+        generator = Generator(
+            ai_service,
+            context_retriever,
+            context_builder=ContextBuilder(
+                token_budget=token_budget, count_tokens=ai_service.count_tokens
+            ),
+        )
+
+        question_start = time.perf_counter()
+        results = ai_service.map(generator.generate, list(answers))
+        question_time = time.perf_counter() - question_start
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    correct = sum(
+        result == answer["sql"] for result, answer in zip(results, answers.values())
+    )
+    return {
+        "backend": backend,
+        "tables": n_tables,
+        "questions": n_questions,
+        "index_prompts": index_prompts,
+        "index_s": index_time,
+        "prompts_per_question": sum(ai_service.prompts.values()) / n_questions,
+        "prompt_tokens_per_question": sum(ai_service.prompt_tokens.values()) / n_questions,
+        "max_prompt_tokens": ai_service.max_prompt_tokens,
+        "question_s": question_time / n_questions,
+        "peak_memory_mb": peak_memory / 2**20,
+        "correct": correct,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument(
+        "--backend", choices=["sqlite", "csv", "duckdb_csv"], nargs="+", default=["sqlite"]
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per prompt")
+    parser.add_argument("--max-concurrency", type=int, default=1)
+    parser.add_argument("--max-candidate-tables", type=int, default=None)
+    parser.add_argument("--use-value-index", action="store_true")
+    parser.add_argument("--token-budget", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = [
+        run_benchmark(
+            backend,
+            n_tables,
+            args.questions,
+            latency=args.latency,
+            max_concurrency=args.max_concurrency,
+            max_candidate_tables=args.max_candidate_tables,
+            use_value_index=args.use_value_index,
+            token_budget=args.token_budget,
+        )
+        for backend in args.backend
+        for n_tables in args.tables
+    ]
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
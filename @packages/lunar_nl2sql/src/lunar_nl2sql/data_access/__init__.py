@@ -1,5 +1,13 @@
 from .data_access import DataAccess
 from .csv_data_access import CsvDataAccess
+from .duckdb_csv_data_access import DuckDBCsvDataAccess
 from .sqlite_data_access import SqliteDataAccess
+from .value_index import ValueIndex
 
-__all__ = ["DataAccess", "CsvDataAccess", "SqliteDataAccess"]
+__all__ = [
+    "DataAccess",
+    "CsvDataAccess",
+    "DuckDBCsvDataAccess",
+    "SqliteDataAccess",
+    "ValueIndex",
+]
@@ -1,10 +1,14 @@
+from typing import List, Optional, Tuple
 from .data_access import DataAccess
+from . import duckdb_queries
+import duckdb
 import pandas as pd
 from lunar_nl2sql.data_access.types import TableSamples, Tables
 
 
 class CsvDataAccess(DataAccess):
     _data: dict[str, pd.DataFrame] = {}
+    _sql_connection: Optional[duckdb.DuckDBPyConnection] = None
 
     def __init__(
         self,
@@ -14,13 +18,30 @@ class CsvDataAccess(DataAccess):
         has_header=True,
         ignore_errors=True,
     ):
+        super().__init__()
+        self._csv_paths = csv_paths
+        self._encoding = encoding
+        self._separator = separator
+        self._load()
+
+    def _load(self) -> None:
         self._data = {
             table_name: pd.read_csv(
-                csv_paths[table_name], sep=separator, encoding=encoding
+                self._csv_paths[table_name],
+                sep=self._separator,
+                encoding=self._encoding,
             )
-            for table_name in csv_paths
+            for table_name in self._csv_paths
         }
 
+    def refresh(self) -> None:
+        super().refresh()
+        with self._query_lock:
+            if self._sql_connection is not None:
+                self._sql_connection.close()
+                self._sql_connection = None
+            self._load()
+
     @property
     def tables(self) -> Tables:
         if not self._tables:
@@ -33,7 +54,7 @@ class CsvDataAccess(DataAccess):
             self._samples = TableSamples(
                 {
                     table_name: self._get_sample(table_name, 5)
-                    for table_name in self._tables
+                    for table_name in self.tables
                 }
             )
         return self._samples
@@ -41,3 +62,38 @@ class CsvDataAccess(DataAccess):
     def _get_sample(self, table_name: str, n: int = 5) -> pd.DataFrame:
         sample_df = self._data[table_name].sample(n=n, random_state=0)
         return sample_df
+
+    def _get_columns(self, table_name: str) -> List[Tuple[str, str]]:
+        return [
+            (str(column), str(dtype))
+            for column, dtype in self._data[table_name].dtypes.items()
+        ]
+
+    def _get_row_count(self, table_name: str) -> int:
+        return len(self._data[table_name])
+
+    def _get_distinct_values(
+        self, table_name: str, column: str, limit: int
+    ) -> Optional[List[str]]:
+        series = self._data[table_name][column]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return None
+        values = series.dropna().unique()
+        if len(values) > limit:
+            return None
+        return [str(value) for value in values]
+
+    @property
+    def sql_connection(self) -> duckdb.DuckDBPyConnection:
+        """An in-memory DuckDB connection over the loaded tables, to validate and run SQL queries."""
+        if self._sql_connection is None:
+            self._sql_connection = duckdb.connect()
+            for table_name, df in self._data.items():
+                self._sql_connection.register(table_name, df)
+        return self._sql_connection
+
+    def _explain(self, sql: str) -> None:
+        duckdb_queries.explain(self.sql_connection, sql)
+
+    def _execute(self, sql: str, timeout: float) -> pd.DataFrame:
+        return duckdb_queries.execute(self.sql_connection, sql, timeout)
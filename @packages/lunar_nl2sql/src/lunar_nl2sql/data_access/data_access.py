@@ -1,10 +1,42 @@
+import hashlib
+import json
+import re
+import threading
 from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+import pandas as pd
 from lunar_nl2sql.data_access.types import TableSamples, Tables
+from lunar_nl2sql.data_access.value_index import ValueIndex
+
+_LITERALS_AND_COMMENTS = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|--[^\n]*|/\*.*?\*/", re.DOTALL
+)
+_PARENTHESIZED = re.compile(r"\([^()]*\)")
+# the statement following the common table expressions of a WITH query
+_WITH_STATEMENT = re.compile(
+    r"WITH\s+(?:RECURSIVE\s+)?(?:\w+\s+AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?,\s*)*"
+    r"\w+\s+AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?(\w+)",
+    re.IGNORECASE,
+)
+# a modifying statement opening a subquery or common table expression, keywords used
+# as column names or functions are not followed by a name
+_NESTED_MODIFYING_STATEMENT = re.compile(
+    r"\(\s*(INSERT|UPDATE|DELETE|REPLACE|MERGE|UPSERT)\s+\w", re.IGNORECASE
+)
 
 
 class DataAccess(ABC):
     _tables: Tables = []
     _samples: TableSamples = {}
+    _value_index: Optional[ValueIndex] = None
+
+    """
+    Text columns with more distinct values than this are not indexed.
+    """
+    MAX_INDEXED_DISTINCT_VALUES = 100
+
+    def __init__(self):
+        self._query_lock = threading.Lock()
 
     @property
     @abstractmethod
@@ -15,3 +47,131 @@ class DataAccess(ABC):
     @abstractmethod
     def tables(self) -> Tables:
         pass
+
+    def refresh(self) -> None:
+        """Drop the cached tables, samples and value index so they are read again."""
+        self._tables = []
+        self._samples = {}
+        self._value_index = None
+
+    @abstractmethod
+    def _get_columns(self, table_name: str) -> List[Tuple[str, str]]:
+        """Return the (name, type) pairs of the table columns."""
+        pass
+
+    @abstractmethod
+    def _get_row_count(self, table_name: str) -> int:
+        pass
+
+    @abstractmethod
+    def _get_distinct_values(
+        self, table_name: str, column: str, limit: int
+    ) -> Optional[List[str]]:
+        """
+        Return the distinct values of a text column, or None when the column is not
+        textual or has more than limit distinct values.
+        """
+        pass
+
+    @abstractmethod
+    def _explain(self, sql: str) -> None:
+        """Plan the query without running it, raising the database error if it is invalid."""
+        pass
+
+    @abstractmethod
+    def _execute(self, sql: str, timeout: float) -> pd.DataFrame:
+        """Run the query, aborting after timeout seconds."""
+        pass
+
+    def validate_query(self, sql: str) -> Optional[str]:
+        """
+        Return the error raised by the database planner for the query, None if it is valid.
+        Only a single read-only SELECT or WITH statement is valid.
+        """
+        error = self._read_only_error(sql)
+        if error is not None:
+            return error
+        try:
+            with self._query_lock:
+                self._explain(sql)
+        except Exception as e:
+            return str(e)
+        return None
+
+    def execute_query(
+        self, sql: str, limit: int = 100, timeout: float = 10.0
+    ) -> pd.DataFrame:
+        """
+        Run a read query, returning at most limit rows. The query is wrapped in a
+        SELECT, so the database fails on statements that are not queries; use
+        validate_query to check that a query is read-only first.
+        """
+        with self._query_lock:
+            return self._execute(self._limit_query(sql, limit), timeout)
+
+    @staticmethod
+    def _read_only_error(sql: str) -> Optional[str]:
+        """Why the query is not a single read-only SELECT or WITH statement, None if it is."""
+        # string literals, quoted identifiers and comments cannot hide a statement,
+        # literals and identifiers are kept as a placeholder name
+        code = _LITERALS_AND_COMMENTS.sub(
+            lambda match: " " if match.group(0)[:2] in ("--", "/*") else " _ ", sql
+        ).strip().rstrip(";").strip()
+        if ";" in code:
+            return "Only a single SQL statement is allowed."
+        first_word = re.match(r"\W*(\w+)", code)
+        if first_word is None or first_word.group(1).upper() not in ("SELECT", "WITH"):
+            return "Only SELECT or WITH queries are allowed."
+        nested = _NESTED_MODIFYING_STATEMENT.search(code)
+        if nested is not None:
+            return f"Only read-only queries are allowed, found {nested.group(1).upper()}."
+        top_level = code
+        while _PARENTHESIZED.search(top_level):
+            top_level = _PARENTHESIZED.sub(" ", top_level)
+        if first_word.group(1).upper() == "WITH":
+            statement = _WITH_STATEMENT.match(top_level.strip())
+            if statement is None or statement.group(1).upper() not in ("SELECT", "VALUES"):
+                found = f", found {statement.group(1).upper()}" if statement else ""
+                return f"Only read-only queries are allowed{found}."
+        if re.search(r"\bINTO\b", top_level, re.IGNORECASE):
+            return "Only read-only queries are allowed, found INTO."
+        return None
+
+    @staticmethod
+    def _limit_query(sql: str, limit: int) -> str:
+        sql = sql.strip().rstrip(";")
+        return f"SELECT * FROM ({sql}) AS limited_query LIMIT {int(limit)}"
+
+    @property
+    def value_index(self) -> ValueIndex:
+        if self._value_index is None:
+            column_values = {}
+            for table_name in self.tables:
+                for column, _ in self._get_columns(table_name):
+                    values = self._get_distinct_values(
+                        table_name, column, self.MAX_INDEXED_DISTINCT_VALUES
+                    )
+                    if values:
+                        column_values[(table_name, column)] = values
+            self._value_index = ValueIndex(column_values)
+        return self._value_index
+
+    def fingerprint(self, table_name: str) -> str:
+        """
+        A stable hash of the table structure (name, columns, types and row count),
+        used to detect when a cached description of the table is outdated.
+        """
+        return hashlib.sha256(
+            json.dumps(self._fingerprint_payload(table_name), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _fingerprint_payload(self, table_name: str) -> dict:
+        """What the fingerprint of the table hashes. Subclasses may use cheaper data."""
+        return {
+            "table": table_name,
+            "columns": [
+                [column, column_type]
+                for column, column_type in self._get_columns(table_name)
+            ],
+            "rows": self._get_row_count(table_name),
+        }
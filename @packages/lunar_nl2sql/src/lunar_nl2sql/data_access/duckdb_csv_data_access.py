@@ -0,0 +1,122 @@
+import os
+from typing import Dict, List, Optional, Tuple
+import duckdb
+import pandas as pd
+from .data_access import DataAccess
+from . import duckdb_queries
+from lunar_nl2sql.data_access.types import TableSamples, Tables
+
+
+class DuckDBCsvDataAccess(DataAccess):
+    """
+    CSV data access registering every file as a lazy DuckDB view, so files are
+    streamed when queried instead of being loaded in memory.
+    """
+
+    def __init__(
+        self,
+        csv_paths: dict,
+        encoding="utf-8",
+        separator=",",
+        has_header=True,
+        ignore_errors=True,
+    ):
+        super().__init__()
+        self.connection = duckdb.connect()
+        for table_name, csv_path in csv_paths.items():
+            self.connection.execute(
+                f"CREATE VIEW {self._quote_identifier(table_name)} AS "
+                f"SELECT * FROM read_csv({self._quote_literal(csv_path)}, "
+                f"delim = {self._quote_literal(separator)}, "
+                f"header = {str(bool(has_header)).lower()}, "
+                f"encoding = {self._quote_literal(encoding)}, "
+                f"ignore_errors = {str(bool(ignore_errors)).lower()})"
+            )
+        self._table_names = list(csv_paths)
+        self._csv_paths = dict(csv_paths)
+        self._columns: Dict[str, List[Tuple[str, str]]] = {}
+
+    def refresh(self) -> None:
+        super().refresh()
+        self._columns = {}
+
+    @property
+    def tables(self) -> Tables:
+        if not self._tables:
+            self._tables = Tables(list(self._table_names))
+        return self._tables
+
+    @property
+    def samples(self) -> TableSamples:
+        if not self._samples:
+            self._samples = TableSamples(
+                {
+                    table_name: self._get_sample(table_name, 5)
+                    for table_name in self.tables
+                }
+            )
+        return self._samples
+
+    def _get_sample(self, table_name: str, n: int = 5) -> pd.DataFrame:
+        return self.connection.execute(
+            f"SELECT * FROM {self._quote_identifier(table_name)} "
+            f"USING SAMPLE reservoir({int(n)} ROWS) REPEATABLE (0)"
+        ).df()
+
+    def _get_columns(self, table_name: str) -> List[Tuple[str, str]]:
+        # described once per table, DESCRIBE infers the types from the file
+        if table_name not in self._columns:
+            rows = self.connection.execute(
+                f"DESCRIBE {self._quote_identifier(table_name)}"
+            ).fetchall()
+            self._columns[table_name] = [(row[0], row[1]) for row in rows]
+        return self._columns[table_name]
+
+    def _get_row_count(self, table_name: str) -> int:
+        return self.connection.execute(
+            f"SELECT COUNT(*) FROM {self._quote_identifier(table_name)}"
+        ).fetchone()[0]
+
+    def _get_distinct_values(
+        self, table_name: str, column: str, limit: int
+    ) -> Optional[List[str]]:
+        if dict(self._get_columns(table_name)).get(column) != "VARCHAR":
+            return None
+        column = self._quote_identifier(column)
+        rows = self.connection.execute(
+            f"SELECT DISTINCT {column} FROM {self._quote_identifier(table_name)} "
+            f"WHERE {column} IS NOT NULL LIMIT {limit + 1}"
+        ).fetchall()
+        if len(rows) > limit:
+            return None
+        return [row[0] for row in rows]
+
+    def _fingerprint_payload(self, table_name: str) -> dict:
+        # the file size and modification time instead of a row count, which scans the file
+        stat = os.stat(self._csv_paths[table_name])
+        return {
+            "table": table_name,
+            "columns": [
+                [column, column_type]
+                for column, column_type in self._get_columns(table_name)
+            ],
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def _explain(self, sql: str) -> None:
+        duckdb_queries.explain(self.connection, sql)
+
+    def _execute(self, sql: str, timeout: float) -> pd.DataFrame:
+        return duckdb_queries.execute(self.connection, sql, timeout)
+
+    @staticmethod
+    def _quote_identifier(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    @staticmethod
+    def _quote_literal(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+
+    def __del__(self):
+        self.connection.close()
@@ -0,0 +1,18 @@
+import threading
+import duckdb
+import pandas as pd
+
+
+def explain(connection: duckdb.DuckDBPyConnection, sql: str) -> None:
+    connection.execute(f"EXPLAIN {sql}").fetchall()
+
+
+def execute(
+    connection: duckdb.DuckDBPyConnection, sql: str, timeout: float
+) -> pd.DataFrame:
+    timer = threading.Timer(timeout, connection.interrupt)
+    timer.start()
+    try:
+        return connection.execute(sql).df()
+    finally:
+        timer.cancel()
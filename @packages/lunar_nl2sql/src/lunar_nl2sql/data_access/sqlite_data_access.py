@@ -1,5 +1,7 @@
 import sqlite3
+import time
 import pandas as pd
+from typing import List, Optional, Tuple
 from .data_access import DataAccess
 from lunar_nl2sql.data_access.types import Tables, TableSamples
 
@@ -7,7 +9,8 @@ from lunar_nl2sql.data_access.types import Tables, TableSamples
 class SqliteDataAccess(DataAccess):
 
     def __init__(self, db_path: str):
-        self.connection = sqlite3.connect(db_path)
+        super().__init__()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
 
     @property
     def tables(self) -> Tables:
@@ -28,7 +31,7 @@ class SqliteDataAccess(DataAccess):
             self._samples = TableSamples(
                 {
                     table_name: self._get_sample(table_name, 5)
-                    for table_name in self._tables
+                    for table_name in self.tables
                 }
             )
         return self._samples
@@ -44,5 +47,55 @@ class SqliteDataAccess(DataAccess):
 
         return df
 
+    def _get_columns(self, table_name: str) -> List[Tuple[str, str]]:
+        cursor = self.connection.cursor()
+        cursor.execute(f"PRAGMA table_info({table_name});")
+        columns = [(row[1], row[2]) for row in cursor.fetchall()]
+        cursor.close()
+        return columns
+
+    def _get_row_count(self, table_name: str) -> int:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def _get_distinct_values(
+        self, table_name: str, column: str, limit: int
+    ) -> Optional[List[str]]:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            f'SELECT DISTINCT "{column}" FROM {table_name} '
+            f'WHERE typeof("{column}") = \'text\' LIMIT {limit + 1};'
+        )
+        values = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        if len(values) > limit:
+            return None
+        return values
+
+    def _explain(self, sql: str) -> None:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN {sql}")
+        finally:
+            cursor.close()
+
+    def _execute(self, sql: str, timeout: float) -> pd.DataFrame:
+        deadline = time.monotonic() + timeout
+        self.connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, 10000
+        )
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+            return pd.DataFrame(
+                cursor.fetchall(), columns=[desc[0] for desc in cursor.description]
+            )
+        finally:
+            cursor.close()
+            self.connection.set_progress_handler(None, 0)
+
     def __del__(self):
         self.connection.close()
@@ -0,0 +1,104 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of the normalized words of the text, padded as in pg_trgm."""
+    grams = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ValueIndex:
+    """
+    Trigram index over the distinct values of the low cardinality text columns,
+    used to find which column values a natural language query refers to.
+    """
+
+    def __init__(self, column_values: Dict[Tuple[str, str], Iterable[str]]):
+        """
+        :param column_values: distinct values of each (table, column) pair.
+        """
+        self._entries: List[Tuple[str, str, str, Set[str]]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._max_words = 1
+
+        for (table, column), values in column_values.items():
+            for value in values:
+                value_trigrams = trigrams(value)
+                if not value_trigrams:
+                    continue
+                entry_id = len(self._entries)
+                self._entries.append((table, column, value, value_trigrams))
+                for gram in value_trigrams:
+                    self._postings[gram].append(entry_id)
+                self._max_words = max(
+                    self._max_words, len(WORD_PATTERN.findall(value))
+                )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def match(
+        self,
+        text: str,
+        tables: Optional[Iterable[str]] = None,
+        threshold: float = 0.5,
+    ) -> List[Dict[str, object]]:
+        """
+        Find the values referenced in the text, comparing every span of up to as many words
+        as the longest indexed value. A span references its most similar values, provided
+        their trigram similarity is at least threshold.
+
+        :return: a list of {"table", "attribute", "values"} references, best matches first.
+        """
+        tables = set(tables) if tables is not None else None
+        words = WORD_PATTERN.findall(text)
+        scores: Dict[int, float] = {}
+
+        for start in range(len(words)):
+            for length in range(1, self._max_words + 1):
+                if start + length > len(words):
+                    break
+                span_trigrams = trigrams(" ".join(words[start : start + length]))
+                shared: Dict[int, int] = defaultdict(int)
+                for gram in span_trigrams:
+                    for entry_id in self._postings.get(gram, ()):
+                        shared[entry_id] += 1
+                span_scores = {
+                    entry_id: count
+                    / (len(span_trigrams) + len(self._entries[entry_id][3]) - count)
+                    for entry_id, count in shared.items()
+                }
+                if not span_scores:
+                    continue
+                # Only the closest values of a span are kept, near misses are noise.
+                best = max(span_scores.values())
+                if best < threshold:
+                    continue
+                for entry_id, score in span_scores.items():
+                    if score == best and score > scores.get(entry_id, 0.0):
+                        scores[entry_id] = score
+
+        references: Dict[Tuple[str, str], List[Tuple[float, str]]] = defaultdict(list)
+        for entry_id, score in scores.items():
+            table, column, value, _ = self._entries[entry_id]
+            if tables is None or table in tables:
+                references[(table, column)].append((score, value))
+
+        ranked = sorted(
+            references.items(), key=lambda item: -max(score for score, _ in item[1])
+        )
+        return [
+            {
+                "table": table,
+                "attribute": column,
+                "values": [value for _, value in sorted(matches, key=lambda m: -m[0])],
+            }
+            for (table, column), matches in ranked
+        ]
@@ -1,4 +1,12 @@
 from .generator import Generator
+from .context_builder import ContextBuilder
+from .types import GeneratedQuery, PromptContext, QueryValidation
 
 
-__all__ = ["Generator"]
+__all__ = [
+    "Generator",
+    "ContextBuilder",
+    "GeneratedQuery",
+    "PromptContext",
+    "QueryValidation",
+]
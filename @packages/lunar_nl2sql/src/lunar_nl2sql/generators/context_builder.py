@@ -0,0 +1,129 @@
+import math
+from typing import Callable, Iterable, List, Optional
+from lunar_nl2sql.retrievers.types import Context
+from lunar_nl2sql.generators.types import PromptContext
+
+
+def default_token_counter(encoding_name: str = "cl100k_base") -> Callable[[str], int]:
+    """
+    Count tokens with tiktoken when it is installed, otherwise estimate them
+    as one token every four characters.
+    """
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(encoding_name)
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        return lambda text: math.ceil(len(text) / 4)
+
+
+class ContextBuilder:
+    """
+    Assembles the table attributes, reference values and sample data sections of the
+    SQL generation prompt within a token budget.
+
+    The table attributes are always included. Reference values come next, then the sample
+    data, both in the relevance order of the context, until the budget is spent. With a
+    budget, values are deduplicated and long values are truncated; without one, the
+    sections are rendered in full.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        max_value_length: Optional[int] = 200,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        :param token_budget: maximum number of tokens of the three sections, unbounded when None.
+        :param max_value_length: number of characters after which values are truncated,
+            when there is a token budget.
+        :param count_tokens: function counting the tokens of a text.
+        """
+        self.token_budget = token_budget
+        self.max_value_length = max_value_length
+        self._count_tokens = count_tokens
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens is None:
+            self._count_tokens = default_token_counter()
+        return self._count_tokens(text)
+
+    def build(self, context: Context) -> PromptContext:
+        table_attributes_context = ""
+        sample_data_lines = []
+
+        for table in context.relevant_tables:
+            sample_table_data = context.relevant_sample_data[table]
+
+            table_attributes_context += f"- Table: {table}"
+
+            attributes = []
+            for value in context.relevant_attributes:
+                if value.table == table:
+                    for attribute in value.attributes:
+                        attributes.append(f"`{attribute}`")
+                        sample_data_lines.append(
+                            (
+                                f"`{table}.{attribute}`",
+                                sample_table_data[attribute].to_list(),
+                            )
+                        )
+
+            if len(attributes) > 0:
+                table_attributes_context += f"; Attributes: {', '.join(attributes)}"
+
+            table_attributes_context += "\n"
+
+        remaining = None
+        if self.token_budget is not None:
+            remaining = self.token_budget - self.count_tokens(table_attributes_context)
+
+        reference_values_context, remaining = self._fit_lines(
+            [
+                (f"`{entry.table}.{entry.attribute}`", entry.values)
+                for entry in context.reference_values
+            ],
+            remaining,
+        )
+        sample_data_context, _ = self._fit_lines(sample_data_lines, remaining)
+
+        return PromptContext(
+            table_attributes_context=table_attributes_context,
+            reference_values_context=reference_values_context,
+            sample_data_context=sample_data_context,
+        )
+
+    def _fit_lines(self, lines, remaining: Optional[int]):
+        """
+        Render `name = values` lines until the remaining tokens are spent. A line that does
+        not fit is trimmed to the values that fit, or skipped when none does.
+        """
+        text = ""
+        for name, values in lines:
+            if remaining is None:
+                text += f"{name} = {', '.join(f'{value}' for value in values)}\n"
+                continue
+            values = self._prepare_values(values)
+            while values:
+                line = f"{name} = {', '.join(values)}\n"
+                tokens = self.count_tokens(line)
+                if tokens <= remaining:
+                    text += line
+                    remaining -= tokens
+                    break
+                values = values[:-1]
+        return text, remaining
+
+    def _prepare_values(self, values: Iterable) -> List[str]:
+        prepared = []
+        seen = set()
+        for value in values:
+            value = f"{value}"
+            if self.max_value_length is not None and len(value) > self.max_value_length:
+                value = value[: self.max_value_length] + "..."
+            if value not in seen:
+                seen.add(value)
+                prepared.append(value)
+        return prepared
@@ -1,55 +1,96 @@
+import json
+from typing import Optional
 from lunar_nl2sql.services.ai import AIService
+from lunar_nl2sql.data_access.data_access import DataAccess
 from lunar_nl2sql.retrievers.context_retriever import ContextRetriever
-from lunar_nl2sql.prompts import GenerateSQLQueryPrompt, DoubleCheckQueryPrompt
+from lunar_nl2sql.retrievers.types import Context
+from lunar_nl2sql.generators.types import GeneratedQuery, QueryValidation
+from lunar_nl2sql.generators.context_builder import ContextBuilder
+from lunar_nl2sql.prompts import (
+    GenerateSQLQueryPrompt,
+    DoubleCheckQueryPrompt,
+    RepairSQLQueryPrompt,
+)
 
 
 class Generator:
     def __init__(
-        self, ai_service: AIService, context_retriever: ContextRetriever
+        self,
+        ai_service: AIService,
+        context_retriever: ContextRetriever,
+        data_access: Optional[DataAccess] = None,
+        validation: QueryValidation = QueryValidation.EXPLAIN,
+        row_limit: int = 100,
+        timeout: float = 10.0,
+        context_builder: Optional[ContextBuilder] = None,
     ) -> None:
+        """
+        :param data_access: database used by generate_validated to check the generated queries.
+        :param validation: whether the queries are only planned or also executed.
+        :param row_limit: maximum number of rows returned by executed queries.
+        :param timeout: seconds after which the execution of a query is aborted.
+        :param context_builder: assembles the SQL generation prompt context, unbounded by default.
+        """
         self.ai_service = ai_service
         self.context_retriever = context_retriever
+        self.data_access = data_access
+        self.validation = validation
+        self.row_limit = row_limit
+        self.timeout = timeout
+        self.context_builder = context_builder or ContextBuilder()
 
         self.generator_prompt = GenerateSQLQueryPrompt(self.ai_service)
         self.double_check_prompt = DoubleCheckQueryPrompt(self.ai_service)
+        self.repair_prompt = RepairSQLQueryPrompt(self.ai_service)
 
     def generate(self, nl_query: str) -> str:
         context = self.context_retriever.retrieve(nl_query)
+        sql_query = self._generate_sql_query(nl_query, context)
 
-        table_attributes_context = ""
-        sample_data_context = ""
-
-        for table in context.relevant_tables:
-            sample_table_data = context.relevant_sample_data[table]
-
-            table_attributes_context += f"- Table: {table}"
+        return self.double_check_prompt.run(
+            nl_query, sql_query, context.relevant_nl_db_schema
+        )
 
-            attributes = []
-            for value in context.relevant_attributes:
-                if value.table == table:
-                    for attribute in value.attributes:
-                        attributes.append(f"`{attribute}`")
+    def generate_validated(self, nl_query: str) -> GeneratedQuery:
+        """
+        Generate the SQL query and check it against the database instead of the double
+        check prompt. A query rejected by the database gets one repair attempt.
+        """
+        if self.data_access is None:
+            raise ValueError("Query validation requires a data access.")
 
-                        attribute_sample_data = sample_table_data[attribute].to_list()
-                        sample_data_context += f"`{table}.{attribute}` = {', '.join([f'{value}' for value in attribute_sample_data])}\n"
+        context = self.context_retriever.retrieve(nl_query)
+        sql_query = self._generate_sql_query(nl_query, context)
 
-            if len(attributes) > 0:
-                table_attributes_context += f"; Attributes: {', '.join(attributes)}"
+        result = self._validate(sql_query)
+        if result.error is not None:
+            sql_query = self.repair_prompt.run(
+                nl_query, sql_query, result.error, context.relevant_nl_db_schema
+            )
+            result = self._validate(sql_query)
+        return result
 
-            table_attributes_context += "\n"
+    def _validate(self, sql_query: str) -> GeneratedQuery:
+        error = self.data_access.validate_query(sql_query)
+        if error is not None or self.validation == QueryValidation.EXPLAIN:
+            return GeneratedQuery(sql=sql_query, error=error)
 
-        reference_values_context = ""
+        try:
+            df = self.data_access.execute_query(sql_query, self.row_limit, self.timeout)
+        except Exception as e:
+            return GeneratedQuery(sql=sql_query, error=str(e))
+        return GeneratedQuery(
+            sql=sql_query,
+            columns=[str(column) for column in df.columns],
+            rows=json.loads(df.to_json(orient="records")),
+        )
 
-        for entry in context.reference_values:
-            reference_values_context += f"`{entry.table}.{entry.attribute}` = {', '.join([f'{value}' for value in entry.values])}\n"
+    def _generate_sql_query(self, nl_query: str, context: Context) -> str:
+        prompt_context = self.context_builder.build(context)
 
-        sql_query = self.generator_prompt.run(
+        return self.generator_prompt.run(
             nl_query,
-            table_attributes_context,
-            reference_values_context,
-            sample_data_context,
-        )
-
-        return self.double_check_prompt.run(
-            nl_query, sql_query, context.relevant_nl_db_schema
+            prompt_context.table_attributes_context,
+            prompt_context.reference_values_context,
+            prompt_context.sample_data_context,
         )
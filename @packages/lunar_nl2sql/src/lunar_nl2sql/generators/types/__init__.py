@@ -0,0 +1,26 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class QueryValidation(Enum):
+    """
+    How generated queries are checked against the database:
+    EXPLAIN plans them, EXECUTE also runs them and returns their first rows.
+    """
+
+    EXPLAIN = "explain"
+    EXECUTE = "execute"
+
+
+class GeneratedQuery(BaseModel):
+    sql: str
+    error: Optional[str] = None
+    columns: Optional[List[str]] = None
+    rows: Optional[List[Dict[str, Any]]] = None
+
+
+class PromptContext(BaseModel):
+    table_attributes_context: str
+    reference_values_context: str
+    sample_data_context: str
@@ -1,3 +1,5 @@
 from .indexer import Indexer
+from .schema_store import SchemaStore
+from .table_vector_index import TableVectorIndex
 
-__all__ = ["Indexer"]
+__all__ = ["Indexer", "SchemaStore", "TableVectorIndex"]
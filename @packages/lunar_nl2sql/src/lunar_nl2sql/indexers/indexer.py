@@ -1,8 +1,13 @@
+import threading
+from typing import Dict, List, Optional
 from lunar_nl2sql.prompts import NLDBSchemaDescriptionPrompt, NLTableSummaryPrompt
 from lunar_nl2sql.services.ai import AIService
 from lunar_nl2sql.data_access.data_access import DataAccess
 from lunar_nl2sql.data_access.types import TableSamples
+from lunar_nl2sql.data_access.value_index import ValueIndex
 from lunar_nl2sql.indexers.types import NLDBSchema, NLTablesSummary
+from lunar_nl2sql.indexers.schema_store import SchemaStore
+from lunar_nl2sql.indexers.table_vector_index import TableVectorIndex
 
 
 class Indexer:
@@ -17,32 +22,126 @@ class Indexer:
     """
     _nl_tables_summary: NLTablesSummary = {}
 
-    def __init__(self, ai_service: AIService, data_access: DataAccess):
+    """
+    An embedding index over the natural language schema description of each table.
+    """
+    _table_vector_index: Optional[TableVectorIndex] = None
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        data_access: DataAccess,
+        schema_store: Optional[SchemaStore] = None,
+    ):
         self.ai_service = ai_service
         self.data_access = data_access
+        self.schema_store = schema_store
+        self._fingerprints: Dict[str, str] = {}
+        self._lock = threading.RLock()
 
     @property
     def nl_db_schema(self) -> NLDBSchema:
-        if not self._nl_db_schema:
-            prompt = NLDBSchemaDescriptionPrompt(self.ai_service)
-            nl_db_schema = {}
-            for table_name in self.data_access.tables:
-                nl_db_schema[table_name] = prompt.run(
-                    table_name, self.data_access.samples[table_name]
+        with self._lock:
+            if not self._nl_db_schema:
+                prompt = NLDBSchemaDescriptionPrompt(self.ai_service)
+                tables = self.data_access.tables
+                samples = self.data_access.samples
+                nl_db_schema = {
+                    table_name: self._stored_description(table_name)
+                    for table_name in tables
+                }
+                missing = [table for table, value in nl_db_schema.items() if value is None]
+                descriptions = self.ai_service.map(
+                    lambda table_name: prompt.run(table_name, samples[table_name]),
+                    missing,
                 )
-            self._nl_db_schema = NLDBSchema(nl_db_schema)
+                for table_name, description in zip(missing, descriptions):
+                    self._store_description(table_name, description)
+                    nl_db_schema[table_name] = description
+                self._nl_db_schema = NLDBSchema(nl_db_schema)
         return self._nl_db_schema
 
     @property
     def nl_tables_summary(self) -> NLTablesSummary:
-        if not self._nl_tables_summary:
-            prompt = NLTableSummaryPrompt(self.ai_service)
-            summary = {}
-            for table_name in self.data_access.tables:
-                summary[table_name] = prompt.run(self.nl_db_schema[table_name])
-            self._nl_tables_summary = NLTablesSummary(summary)
+        with self._lock:
+            if not self._nl_tables_summary:
+                prompt = NLTableSummaryPrompt(self.ai_service)
+                nl_db_schema = self.nl_db_schema
+                summary = {
+                    table_name: self._stored_summary(table_name)
+                    for table_name in self.data_access.tables
+                }
+                missing = [table for table, value in summary.items() if value is None]
+                summaries = self.ai_service.map(
+                    lambda table_name: prompt.run(nl_db_schema[table_name]), missing
+                )
+                for table_name, table_summary in zip(missing, summaries):
+                    self._store_summary(table_name, table_summary)
+                    summary[table_name] = table_summary
+                self._nl_tables_summary = NLTablesSummary(summary)
         return self._nl_tables_summary
 
+    @property
+    def table_vector_index(self) -> TableVectorIndex:
+        with self._lock:
+            if self._table_vector_index is None:
+                nl_db_schema = self.nl_db_schema
+                tables = list(nl_db_schema)
+                embeddings = {
+                    table_name: self._stored_embedding(table_name)
+                    for table_name in tables
+                }
+                missing = [table for table, value in embeddings.items() if value is None]
+                if missing:
+                    new_embeddings = self.ai_service.embed(
+                        [nl_db_schema[table_name] for table_name in missing]
+                    )
+                    for table_name, embedding in zip(missing, new_embeddings):
+                        self._store_embedding(table_name, embedding)
+                        embeddings[table_name] = embedding
+                self._table_vector_index = TableVectorIndex(
+                    tables, [embeddings[table_name] for table_name in tables]
+                )
+        return self._table_vector_index
+
     @property
     def samples(self) -> TableSamples:
         return self.data_access.samples
+
+    @property
+    def value_index(self) -> ValueIndex:
+        return self.data_access.value_index
+
+    def _fingerprint(self, table_name: str) -> str:
+        if table_name not in self._fingerprints:
+            self._fingerprints[table_name] = self.data_access.fingerprint(table_name)
+        return self._fingerprints[table_name]
+
+    def _stored_description(self, table_name: str) -> Optional[str]:
+        if self.schema_store is None:
+            return None
+        return self.schema_store.get_description(self._fingerprint(table_name))
+
+    def _store_description(self, table_name: str, description: str) -> None:
+        if self.schema_store is not None:
+            self.schema_store.set_description(
+                self._fingerprint(table_name), table_name, description
+            )
+
+    def _stored_summary(self, table_name: str) -> Optional[str]:
+        if self.schema_store is None:
+            return None
+        return self.schema_store.get_summary(self._fingerprint(table_name))
+
+    def _store_summary(self, table_name: str, summary: str) -> None:
+        if self.schema_store is not None:
+            self.schema_store.set_summary(self._fingerprint(table_name), summary)
+
+    def _stored_embedding(self, table_name: str) -> Optional[List[float]]:
+        if self.schema_store is None:
+            return None
+        return self.schema_store.get_embedding(self._fingerprint(table_name))
+
+    def _store_embedding(self, table_name: str, embedding: List[float]) -> None:
+        if self.schema_store is not None:
+            self.schema_store.set_embedding(self._fingerprint(table_name), embedding)
@@ -0,0 +1,93 @@
+import json
+import sqlite3
+import threading
+from typing import List, Optional
+
+
+class SchemaStore:
+    """
+    On-disk store of the natural language descriptions, summaries and description
+    embeddings of tables, keyed by the table fingerprint provided by the data access.
+
+    A description is only reused while the fingerprint of the table is unchanged,
+    so tables whose structure or size changed are described again.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS nl_schema (
+                fingerprint TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                description TEXT,
+                summary TEXT,
+                embedding TEXT
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(nl_schema)")
+        }
+        if "embedding" not in columns:
+            self.connection.execute("ALTER TABLE nl_schema ADD COLUMN embedding TEXT")
+        self.connection.commit()
+
+    def get_description(self, fingerprint: str) -> Optional[str]:
+        return self._get("description", fingerprint)
+
+    def set_description(
+        self, fingerprint: str, table_name: str, description: str
+    ) -> None:
+        # A new description invalidates the summary and embedding derived from the previous one.
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO nl_schema (fingerprint, table_name, description, summary, embedding)
+                VALUES (?, ?, ?, NULL, NULL)
+                ON CONFLICT(fingerprint) DO UPDATE SET
+                    table_name = excluded.table_name,
+                    description = excluded.description,
+                    summary = NULL,
+                    embedding = NULL
+                """,
+                (fingerprint, table_name, description),
+            )
+            self.connection.commit()
+
+    def get_summary(self, fingerprint: str) -> Optional[str]:
+        return self._get("summary", fingerprint)
+
+    def set_summary(self, fingerprint: str, summary: str) -> None:
+        with self._lock:
+            self.connection.execute(
+                "UPDATE nl_schema SET summary = ? WHERE fingerprint = ?",
+                (summary, fingerprint),
+            )
+            self.connection.commit()
+
+    def get_embedding(self, fingerprint: str) -> Optional[List[float]]:
+        embedding = self._get("embedding", fingerprint)
+        return json.loads(embedding) if embedding is not None else None
+
+    def set_embedding(self, fingerprint: str, embedding: List[float]) -> None:
+        with self._lock:
+            self.connection.execute(
+                "UPDATE nl_schema SET embedding = ? WHERE fingerprint = ?",
+                (json.dumps([float(value) for value in embedding]), fingerprint),
+            )
+            self.connection.commit()
+
+    def _get(self, column: str, fingerprint: str) -> Optional[str]:
+        with self._lock:
+            cursor = self.connection.execute(
+                f"SELECT {column} FROM nl_schema WHERE fingerprint = ?",
+                (fingerprint,),
+            )
+            row = cursor.fetchone()
+            cursor.close()
+        return row[0] if row else None
+
+    def __del__(self):
+        self.connection.close()
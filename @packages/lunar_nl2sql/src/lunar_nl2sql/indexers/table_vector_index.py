@@ -0,0 +1,31 @@
+from typing import List, Sequence
+import numpy as np
+
+
+class TableVectorIndex:
+    """
+    In-memory cosine similarity index over the embeddings of the table descriptions.
+    """
+
+    def __init__(self, tables: Sequence[str], embeddings: Sequence[Sequence[float]]):
+        if len(tables) != len(embeddings):
+            raise ValueError("Expected one embedding per table.")
+        self.tables = list(tables)
+        self._embeddings = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+    def search(self, query_embedding: Sequence[float], k: int) -> List[str]:
+        """Return the k tables most similar to the query, most similar first."""
+        if not self.tables or k <= 0:
+            return []
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])
+        scores = (self._embeddings @ query.T).ravel()
+        k = min(k, len(self.tables))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.tables[i] for i in top]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
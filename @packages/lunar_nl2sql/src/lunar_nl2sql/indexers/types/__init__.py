@@ -10,6 +10,9 @@ class NLDBSchema(RootModel):
     def __getitem__(self, item):
         return self.root[item]
 
+    def __len__(self):
+        return len(self.root)
+
 
 class NLTablesSummary(RootModel):
     root: dict[str, str]
@@ -19,3 +22,6 @@ class NLTablesSummary(RootModel):
 
     def __getitem__(self, item):
         return self.root[item]
+
+    def __len__(self):
+        return len(self.root)
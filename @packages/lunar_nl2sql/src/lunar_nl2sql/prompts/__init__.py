@@ -5,6 +5,7 @@ from .retrieve_relevant_attributes_prompt import RetrieveRelevantTableAttributes
 from .retrieve_reference_values_prompt import RetrieveReferenceValuesPrompt
 from .generate_sql_query_prompt import GenerateSQLQueryPrompt
 from .double_check_query_prompt import DoubleCheckQueryPrompt
+from .repair_sql_query_prompt import RepairSQLQueryPrompt
 
 __all__ = [
     "NLDBSchemaDescriptionPrompt",
@@ -14,4 +15,5 @@ __all__ = [
     "RetrieveReferenceValuesPrompt",
     "GenerateSQLQueryPrompt",
     "DoubleCheckQueryPrompt",
+    "RepairSQLQueryPrompt",
 ]
@@ -0,0 +1,53 @@
+from lunar_nl2sql.services.ai import AIService
+
+from pydantic import BaseModel
+
+
+class ResponseFormat(BaseModel):
+    sql: str
+
+
+class RepairSQLQueryPrompt:
+    USER_MESSAGE = """
+    Given the following natural language query, the generated SQL query, the error raised by 
+    the database when running it, and a natural language description of the database schema, 
+    fix the SQL query so that it runs and answers the natural language query.
+    
+    Natural Language Query: {nl_query}
+    SQL Query: {sql_query}
+    Database Error: {error}
+    NL DB Schema Description: {nl_db_schema_description}
+
+
+    Expected Output in json format:
+    {{
+    
+        "sql": "<sql_query>"
+    }}
+
+    """
+
+    def __init__(self, ai_service: AIService):
+        self.ai_service = ai_service
+
+    def run(
+        self,
+        nl_query: str,
+        sql_query: str,
+        error: str,
+        nl_db_schema_description: str,
+    ):
+        prompt = self.USER_MESSAGE.format(
+            nl_query=nl_query,
+            sql_query=sql_query,
+            error=error,
+            nl_db_schema_description=nl_db_schema_description,
+        )
+
+        response = self.ai_service.run(
+            messages=[{"role": "user", "content": prompt}],
+            type="json",
+            response_format=ResponseFormat,
+        )
+        value = response.choices[0].message.parsed
+        return value.sql
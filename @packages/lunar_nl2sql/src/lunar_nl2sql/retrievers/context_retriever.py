@@ -1,3 +1,4 @@
+from typing import Optional
 from lunar_nl2sql.data_access.types import Tables, TableSamples
 from lunar_nl2sql.indexers.types import NLDBSchema
 from lunar_nl2sql.retrievers.types import (
@@ -16,9 +17,29 @@ from lunar_nl2sql.prompts import (
 
 class ContextRetriever:
 
-    def __init__(self, ai_service: AIService, indexer: Indexer) -> None:
+    def __init__(
+        self,
+        ai_service: AIService,
+        indexer: Indexer,
+        max_candidate_tables: Optional[int] = None,
+        use_value_index: bool = False,
+    ) -> None:
+        """
+        :param max_candidate_tables: when set, only the tables whose description is the most
+            similar to the query, up to this number, are submitted to the relevant tables prompt.
+        :param use_value_index: look the reference values up in the column value index of the
+            database instead of prompting the LLM for them.
+        :raises ValueError: when max_candidate_tables is set and the AI service has no embeddings.
+        """
+        if max_candidate_tables and not ai_service.supports_embeddings:
+            raise ValueError(
+                f"max_candidate_tables requires embeddings, which {ai_service.__class__.__name__} "
+                "does not support (configure an embedding model)."
+            )
         self.ai_service = ai_service
         self.indexer = indexer
+        self.max_candidate_tables = max_candidate_tables
+        self.use_value_index = use_value_index
 
     def retrieve(self, nl_query: str) -> Context:
         relevant_tables = self._retrieve_relevant_tables(nl_query)
@@ -28,9 +49,12 @@ class ContextRetriever:
         relevant_attributes = self._retrieve_relevant_table_attributes(
             nl_query, relevant_nl_db_schema
         )
-        reference_values = self._retrieve_reference_values(
-            nl_query, relevant_attributes, relevant_nl_db_schema
-        )
+        if self.use_value_index:
+            reference_values = self._lookup_reference_values(nl_query, relevant_tables)
+        else:
+            reference_values = self._retrieve_reference_values(
+                nl_query, relevant_attributes, relevant_nl_db_schema
+            )
 
         relevant_sample_data = self._retrieve_relevant_sample_data(relevant_tables)
 
@@ -44,7 +68,22 @@ class ContextRetriever:
 
     def _retrieve_relevant_tables(self, nl_query: str) -> Tables:
         prompt = RetrieveRelevantTablesPrompt(self.ai_service)
-        return Tables(prompt.run(nl_query, self.indexer.nl_db_schema))
+        return Tables(
+            prompt.run(nl_query, self._retrieve_candidate_nl_db_schema(nl_query))
+        )
+
+    def _retrieve_candidate_nl_db_schema(self, nl_query: str) -> NLDBSchema:
+        nl_db_schema = self.indexer.nl_db_schema
+        if (
+            not self.max_candidate_tables
+            or len(nl_db_schema) <= self.max_candidate_tables
+        ):
+            return nl_db_schema
+        query_embedding = self.ai_service.embed([nl_query])[0]
+        candidate_tables = self.indexer.table_vector_index.search(
+            query_embedding, self.max_candidate_tables
+        )
+        return self._retrieve_relevant_nl_db_schema(Tables(candidate_tables))
 
     def _retrieve_relevant_nl_db_schema(self, relevant_tables: Tables) -> NLDBSchema:
         return NLDBSchema(
@@ -68,6 +107,13 @@ class ContextRetriever:
             prompt.run(nl_query, relevant_nl_db_schema, relevant_attributes)
         )
 
+    def _lookup_reference_values(
+        self, nl_query: str, relevant_tables: Tables
+    ) -> TableReferenceValuesCollection:
+        return TableReferenceValuesCollection(
+            self.indexer.value_index.match(nl_query, tables=relevant_tables)
+        )
+
     def _retrieve_relevant_sample_data(self, relevant_tables: Tables) -> TableSamples:
         relevant_sample_data = {
             table: self.indexer.samples[table] for table in relevant_tables
@@ -1,4 +1,11 @@
 from .base import AIService
 from .azure_openai_ai_service import AzureOpenAIService
+from .response_cache import ResponseCache, MemoryResponseCache, SqliteResponseCache
 
-__all__ = ["AIService", "AzureOpenAIService"]
+__all__ = [
+    "AIService",
+    "AzureOpenAIService",
+    "ResponseCache",
+    "MemoryResponseCache",
+    "SqliteResponseCache",
+]
@@ -1,11 +1,19 @@
 from .base import AIService
-from openai import AzureOpenAI
-from typing import List, Dict, Any
+from .response_cache import ResponseCache
+from openai import AzureOpenAI, RateLimitError
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+from typing import List, Dict, Any, Optional
 
 
 class AzureOpenAIService(AIService):
-    def __init__(self, configuration: dict):
-        super().__init__()
+    def __init__(
+        self, configuration: dict, response_cache: Optional[ResponseCache] = None
+    ):
+        super().__init__(
+            max_concurrency=int(configuration.get("max_concurrency", 1)),
+            max_retries=int(configuration.get("max_retries", 3)),
+            response_cache=response_cache,
+        )
         self.configuration = configuration
 
     def connect(self) -> None:
@@ -16,7 +24,23 @@ class AzureOpenAIService(AIService):
                 azure_endpoint=self.configuration["azure_endpoint"],
             )
 
-    def run(self, messages: List[Dict[str, str]], type: str = "text", **kwargs):
+    def run(
+        self,
+        messages: List[Dict[str, str]],
+        type: str = "text",
+        bypass_cache: bool = False,
+        **kwargs,
+    ):
+        return self._cached(
+            lambda: self._run(messages, type, **kwargs),
+            bypass_cache,
+            model=self.configuration["model"],
+            messages=messages,
+            type=type,
+            **kwargs,
+        )
+
+    def _run(self, messages: List[Dict[str, str]], type: str, **kwargs):
         if type == "text":
             return self.run_text(messages, **kwargs)
 
@@ -28,16 +52,49 @@ class AzureOpenAIService(AIService):
 
     def run_json(self, messages: List[Dict[str, str]], **kwargs):
         try:
-            return self.client.beta.chat.completions.parse(
-                messages=messages, model=self.configuration["model"], **kwargs
+            return self._request(
+                self.client.beta.chat.completions.parse,
+                messages=messages,
+                model=self.configuration["model"],
+                **kwargs,
             )
         except Exception as e:
             raise e
 
     def run_text(self, messages: List[Dict[str, str]], **kwargs):
         try:
-            return self.client.chat.completions.create(
-                messages=messages, model=self.configuration["model"], **kwargs
+            return self._request(
+                self.client.chat.completions.create,
+                messages=messages,
+                model=self.configuration["model"],
+                **kwargs,
             )
         except Exception as e:
             raise e
+
+    @property
+    def supports_embeddings(self) -> bool:
+        return bool(self.configuration.get("embedding_model"))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not self.supports_embeddings:
+            return super().embed(texts)
+        response = self._request(
+            self.client.embeddings.create,
+            input=texts,
+            model=self.configuration["embedding_model"],
+        )
+        return [item.embedding for item in response.data]
+
+    def _encode_response(self, response: Any) -> Any:
+        return response.model_dump(mode="json")
+
+    def _decode_response(self, value: Any, **request: Any) -> Any:
+        if request["type"] == "json" and "response_format" in request:
+            return ParsedChatCompletion[request["response_format"]].model_validate(
+                value
+            )
+        return ChatCompletion.model_validate(value)
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        return isinstance(error, RateLimitError)
@@ -1,12 +1,37 @@
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .response_cache import ResponseCache
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 class AIService(ABC):
     _client = None
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        """
+        :param max_concurrency: maximum number of requests in flight at the same time.
+        :param max_retries: number of retries of a rate limited request.
+        :param backoff_factor: base delay, in seconds, of the exponential backoff between retries.
+        :param response_cache: cache of the responses, keyed by the request. Disabled when None.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._in_flight = threading.BoundedSemaphore(self.max_concurrency)
+        self._client_lock = threading.Lock()
+        self.response_cache = response_cache
 
     @abstractmethod
     def connect(self) -> None:
@@ -17,10 +42,74 @@ class AIService(ABC):
     def client(self):
         """Get the API client, connecting if necessary."""
         if self._client is None:
-            self.connect()
+            with self._client_lock:
+                if self._client is None:
+                    self.connect()
         return self._client
 
     @abstractmethod
     def run(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """Run a request to the AI service. Must be implemented by subclasses."""
         pass
+
+    @property
+    def supports_embeddings(self) -> bool:
+        """Whether embed is available. Subclasses supporting embeddings should override it."""
+        return False
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed each text into a vector. Subclasses supporting embeddings should override it."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support embeddings."
+        )
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Apply func to every item, overlapping up to max_concurrency calls. Results keep the items order."""
+        items = list(items)
+        if self.max_concurrency == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(func, items))
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        """Whether the request failed because of rate limiting. Subclasses should override it."""
+        return False
+
+    def _request(self, func: Callable[..., R], *args, **kwargs) -> R:
+        """Send a request, bounding the requests in flight and backing off when rate limited."""
+        attempt = 0
+        while True:
+            try:
+                with self._in_flight:
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_rate_limit_error(e):
+                    raise
+                time.sleep(self.backoff_factor * 2**attempt)
+                attempt += 1
+
+    def _encode_response(self, response: Any) -> Any:
+        """Convert a response into a JSON serializable value to be cached."""
+        return response
+
+    def _decode_response(self, value: Any, **request: Any) -> Any:
+        """Rebuild a response from its cached value."""
+        return value
+
+    def _cached(
+        self, func: Callable[[], Any], bypass_cache: bool = False, **request: Any
+    ) -> Any:
+        """
+        Return the cached response of the request, calling func on a cache miss.
+        With bypass_cache the cached response is ignored and replaced by a fresh one.
+        """
+        if self.response_cache is None:
+            return func()
+        key = self.response_cache.key(**request)
+        if not bypass_cache:
+            value = self.response_cache.get(key)
+            if value is not None:
+                return self._decode_response(value, **request)
+        response = func()
+        self.response_cache.set(key, self._encode_response(response))
+        return response
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class ResponseCache(ABC):
+    """
+    Content addressed cache of AI service responses.
+
+    Values must be JSON serializable. Entries older than ttl seconds are ignored,
+    a ttl of None keeps them forever.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+
+    @staticmethod
+    def key(**request: Any) -> str:
+        """Hash the request (model, messages and parameters) into a cache key."""
+        payload = json.dumps(request, sort_keys=True, default=_serialize_key_part)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+
+class MemoryResponseCache(ResponseCache):
+    """Least recently used in-memory cache holding up to max_size responses."""
+
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._expired(created_at):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class SqliteResponseCache(ResponseCache):
+    """Persistent cache storing the responses as JSON in a SQLite database."""
+
+    def __init__(self, path: str, ttl: Optional[float] = None):
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_response_cache (
+                key TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                value TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            cursor = self.connection.execute(
+                "SELECT created_at, value FROM ai_response_cache WHERE key = ?",
+                (key,),
+            )
+            row = cursor.fetchone()
+            cursor.close()
+        if row is None or self._expired(row[0]):
+            return None
+        return json.loads(row[1])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO ai_response_cache (key, created_at, value) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    created_at = excluded.created_at,
+                    value = excluded.value
+                """,
+                (key, time.time(), json.dumps(value)),
+            )
+            self.connection.commit()
+
+    def __del__(self):
+        self.connection.close()
+
+
+def _serialize_key_part(value: Any) -> Any:
+    # Response formats are keyed by their schema, so changing them invalidates the entries.
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {
+            "model": f"{value.__module__}.{value.__qualname__}",
+            "schema": value.model_json_schema(),
+        }
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return repr(value)
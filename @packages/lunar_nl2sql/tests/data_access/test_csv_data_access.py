@@ -122,3 +122,41 @@ def test_csv_data_access_with_encoding(tmp_path):
     assert "id" in data.columns
     assert "name" in data.columns
     assert data.loc[1, "name"] == "Böb"
+
+
+def test_fingerprint_is_stable_and_table_specific(csv_data_access):
+    fingerprint = csv_data_access.fingerprint("test_table")
+    assert fingerprint == csv_data_access.fingerprint("test_table")
+    assert fingerprint != csv_data_access.fingerprint("test_table2")
+
+
+def test_get_distinct_values_only_returns_text_columns(csv_data_access):
+    assert csv_data_access._get_distinct_values("test_table", "age", 100) is None
+    assert sorted(csv_data_access._get_distinct_values("test_table2", "product", 100)) == list("ABCDEFGHIJ")
+    assert csv_data_access._get_distinct_values("test_table2", "product", 5) is None
+
+
+def test_value_index_matches_question_values(csv_data_access):
+    references = csv_data_access.value_index.match("How old is Charlie?")
+
+    assert references == [{"table": "test_table", "attribute": "name", "values": ["Charlie"]}]
+
+
+def test_validate_and_execute_query(csv_data_access):
+    assert csv_data_access.validate_query("SELECT nme FROM test_table") is not None
+
+    result = csv_data_access.execute_query(
+        "SELECT name FROM test_table WHERE age > 60 ORDER BY age", limit=5
+    )
+    assert result["name"].to_list() == ["Ivy", "Jack"]
+
+
+def test_refresh_reloads_files(csv_files):
+    csv_access = CsvDataAccess(csv_files)
+    assert csv_access.execute_query("SELECT COUNT(*) AS n FROM test_table")["n"][0] == 10
+
+    pd.DataFrame({"id": [1], "name": ["Alice"], "age": [25]}).to_csv(csv_files["test_table"], index=False)
+    csv_access.refresh()
+
+    assert len(csv_access._data["test_table"]) == 1
+    assert csv_access.execute_query("SELECT COUNT(*) AS n FROM test_table")["n"][0] == 1
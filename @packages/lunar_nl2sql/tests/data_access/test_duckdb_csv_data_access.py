@@ -0,0 +1,115 @@
+import pytest
+import pandas as pd
+import duckdb
+from lunar_nl2sql.data_access.duckdb_csv_data_access import DuckDBCsvDataAccess
+from lunar_nl2sql.data_access.types import Tables, TableSamples
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    test_df = pd.DataFrame(
+        {
+            "id": list(range(1, 11)),
+            "name": ["Alice", "Bob", "Charlie", "David", "Eve", "Frank", "Grace", "Hank", "Ivy", "Jack"],
+            "age": [25, 30, 35, 40, 45, 50, 55, 60, 65, 70],
+        }
+    )
+    test_df2 = pd.DataFrame(
+        {
+            "order_id": list(range(101, 111)),
+            "product": ["A", "B", "A", "B", "A", "B", "A", "B", "A", "B"],
+        }
+    )
+
+    test_path = tmp_path / "test.csv"
+    test_df.to_csv(test_path, index=False)
+
+    test_path2 = tmp_path / "test2.csv"
+    test_df2.to_csv(test_path2, index=False)
+
+    return {"test_table": str(test_path), "test_table2": str(test_path2)}
+
+
+@pytest.fixture
+def duckdb_csv_data_access(csv_files):
+    return DuckDBCsvDataAccess(csv_files)
+
+
+def test_tables_property_returns_correct_tables(duckdb_csv_data_access):
+    tables = duckdb_csv_data_access.tables
+    assert isinstance(tables, Tables)
+    assert tables.root == ["test_table", "test_table2"]
+
+
+def test_samples_property_returns_correct_samples(duckdb_csv_data_access):
+    samples = duckdb_csv_data_access.samples
+    assert isinstance(samples, TableSamples)
+    assert len(samples.root) == 2
+
+    test_sample = samples.root["test_table"]
+    assert isinstance(test_sample, pd.DataFrame)
+    assert len(test_sample) == 5
+    assert list(test_sample.columns) == ["id", "name", "age"]
+
+
+def test_get_sample_is_repeatable(duckdb_csv_data_access):
+    first = duckdb_csv_data_access._get_sample("test_table", n=3)
+    second = duckdb_csv_data_access._get_sample("test_table", n=3)
+    assert first.equals(second)
+
+
+def test_get_sample_with_invalid_table(duckdb_csv_data_access):
+    with pytest.raises(duckdb.CatalogException):
+        duckdb_csv_data_access._get_sample("non_existent_table")
+
+
+def test_columns_and_row_count(duckdb_csv_data_access):
+    assert [column for column, _ in duckdb_csv_data_access._get_columns("test_table")] == ["id", "name", "age"]
+    assert duckdb_csv_data_access._get_row_count("test_table") == 10
+
+
+def test_get_distinct_values_only_returns_text_columns(duckdb_csv_data_access):
+    assert duckdb_csv_data_access._get_distinct_values("test_table", "age", 100) is None
+    assert sorted(duckdb_csv_data_access._get_distinct_values("test_table2", "product", 100)) == ["A", "B"]
+    assert duckdb_csv_data_access._get_distinct_values("test_table", "name", 5) is None
+
+
+def test_fingerprint_does_not_count_rows(duckdb_csv_data_access, csv_files, monkeypatch):
+    fingerprint = duckdb_csv_data_access.fingerprint("test_table")
+
+    def fail(table_name):
+        raise AssertionError("the row count scans the whole file")
+
+    monkeypatch.setattr(duckdb_csv_data_access, "_get_row_count", fail)
+    assert duckdb_csv_data_access.fingerprint("test_table") == fingerprint
+
+    with open(csv_files["test_table"], "a") as csv_file:
+        csv_file.write("11,Kim,75\n")
+    assert duckdb_csv_data_access.fingerprint("test_table") != fingerprint
+
+
+def test_columns_are_described_once(duckdb_csv_data_access):
+    columns = duckdb_csv_data_access._get_columns("test_table")
+
+    assert duckdb_csv_data_access._get_columns("test_table") is columns
+    duckdb_csv_data_access.refresh()
+    assert duckdb_csv_data_access._get_columns("test_table") == columns
+
+
+def test_custom_separator(tmp_path):
+    test_df = pd.DataFrame({"id": [1, 2, 3], "name": ["Alice", "Bob", "Charlie"]})
+    test_path = tmp_path / "test_custom.csv"
+    test_df.to_csv(test_path, index=False, sep=";")
+
+    data_access = DuckDBCsvDataAccess({"test_table": str(test_path)}, separator=";")
+
+    assert data_access._get_row_count("test_table") == 3
+    assert [column for column, _ in data_access._get_columns("test_table")] == ["id", "name"]
+
+
+def test_validate_and_execute_query(duckdb_csv_data_access):
+    assert duckdb_csv_data_access.validate_query("SELECT name FROM test_table") is None
+    assert duckdb_csv_data_access.validate_query("SELECT nme FROM test_table") is not None
+
+    result = duckdb_csv_data_access.execute_query("SELECT id FROM test_table ORDER BY id", limit=3)
+    assert result["id"].to_list() == [1, 2, 3]
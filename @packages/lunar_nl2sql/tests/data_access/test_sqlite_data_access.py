@@ -66,3 +66,89 @@ def test_tables_property_returns_correct_tables(sqlite_data_access):
     tables = sqlite_data_access.tables
     assert isinstance(tables, Tables)
     assert "test_table" in tables.root
+
+
+def test_fingerprint_changes_with_table_content(sqlite_data_access):
+    fingerprint = sqlite_data_access.fingerprint("test_table")
+    assert fingerprint == sqlite_data_access.fingerprint("test_table")
+
+    sqlite_data_access.connection.execute(
+        "INSERT INTO test_table (name) VALUES ('test3')"
+    )
+    assert sqlite_data_access.fingerprint("test_table") != fingerprint
+
+
+def test_value_index_indexes_low_cardinality_text_columns(sqlite_data_access):
+    references = sqlite_data_access.value_index.match("rows named test2")
+
+    assert references == [{"table": "test_table", "attribute": "name", "values": ["test2"]}]
+
+
+def test_get_distinct_values_skips_high_cardinality_columns(sqlite_data_access):
+    assert sqlite_data_access._get_distinct_values("test_table", "name", 1) is None
+    assert sqlite_data_access._get_distinct_values("test_table", "id", 10) == []
+
+
+def test_validate_query_returns_planner_errors(sqlite_data_access):
+    assert sqlite_data_access.validate_query("SELECT name FROM test_table") is None
+    assert "no such column" in sqlite_data_access.validate_query("SELECT nme FROM test_table")
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM test_table",
+    "UPDATE test_table SET name = 'x'",
+    "WITH t AS (SELECT 1) DELETE FROM test_table",
+    "SELECT name FROM test_table; DROP TABLE test_table",
+    "WITH t AS (DELETE FROM test_table RETURNING *) SELECT * FROM t",
+    "SELECT * INTO copy_table FROM test_table",
+])
+def test_validate_query_rejects_modifying_statements(sqlite_data_access, sql):
+    assert sqlite_data_access.validate_query(sql) is not None
+    assert sqlite_data_access._get_row_count("test_table") == 2
+
+
+def test_validate_query_ignores_keywords_in_literals(sqlite_data_access):
+    sql = "WITH t AS (SELECT name FROM test_table) SELECT name FROM t WHERE name != 'delete; drop' -- update\n;"
+    assert sqlite_data_access.validate_query(sql) is None
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT load, copy FROM shipments",
+    "SELECT update, replace, merge, import FROM shipments",
+    "SELECT replace(name, 'a', 'b') AS delete FROM shipments",
+    'WITH "t" AS (SELECT 1) SELECT * FROM "t"',
+])
+def test_read_only_check_accepts_keywords_as_names(sql):
+    assert SqliteDataAccess._read_only_error(sql) is None
+
+
+def test_execute_query_limits_rows(sqlite_data_access):
+    result = sqlite_data_access.execute_query("SELECT name FROM test_table ORDER BY id;", limit=1)
+
+    assert list(result.columns) == ["name"]
+    assert result["name"].to_list() == ["test1"]
+
+
+def test_execute_query_rejects_modifying_statements(sqlite_data_access):
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_data_access.execute_query("DELETE FROM test_table")
+    assert sqlite_data_access._get_row_count("test_table") == 2
+
+
+def test_execute_query_aborts_after_timeout(sqlite_data_access):
+    slow_query = (
+        "WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter) "
+        "SELECT COUNT(*) FROM counter"
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_data_access.execute_query(slow_query, timeout=0.1)
+
+
+def test_refresh_reads_tables_again(sqlite_data_access):
+    assert sqlite_data_access.tables.root == ["test_table"]
+
+    sqlite_data_access.connection.execute("CREATE TABLE other_table (id INTEGER)")
+    assert sqlite_data_access.tables.root == ["test_table"]
+
+    sqlite_data_access.refresh()
+    assert sqlite_data_access.tables.root == ["test_table", "other_table"]
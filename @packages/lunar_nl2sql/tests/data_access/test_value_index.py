@@ -0,0 +1,43 @@
+import pytest
+from lunar_nl2sql.data_access.value_index import ValueIndex, trigrams
+
+
+@pytest.fixture
+def value_index():
+    return ValueIndex(
+        {
+            ("customers", "country"): ["Switzerland", "Germany", "United States"],
+            ("customers", "segment"): ["Retail", "Wholesale"],
+            ("suppliers", "country"): ["Germany", "France"],
+        }
+    )
+
+
+def test_trigrams_ignore_case_and_punctuation():
+    assert trigrams("Bern!") == trigrams("bern")
+
+
+def test_match_finds_referenced_values(value_index):
+    references = value_index.match("How many retail customers live in Switzerland?")
+
+    assert {"table": "customers", "attribute": "country", "values": ["Switzerland"]} in references
+    assert {"table": "customers", "attribute": "segment", "values": ["Retail"]} in references
+    assert len(references) == 2
+
+
+def test_match_tolerates_misspellings_and_multi_word_values(value_index):
+    references = value_index.match("orders shipped to the united state from germny")
+    values = {value for reference in references for value in reference["values"]}
+
+    assert "United States" in values
+    assert "Germany" in values
+
+
+def test_match_is_restricted_to_the_given_tables(value_index):
+    references = value_index.match("suppliers from Germany", tables=["suppliers"])
+
+    assert references == [{"table": "suppliers", "attribute": "country", "values": ["Germany"]}]
+
+
+def test_match_without_references_returns_empty_list(value_index):
+    assert value_index.match("What is the average order amount?") == []
@@ -0,0 +1,107 @@
+import threading
+import time
+import pytest
+from lunar_nl2sql.services.ai import AIService, MemoryResponseCache
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class DummyAIService(AIService):
+    def connect(self) -> None:
+        self._client = object()
+
+    def run(self, messages, **kwargs):
+        return self._request(lambda: messages)
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        return isinstance(error, RateLimitError)
+
+
+def test_map_preserves_order():
+    ai_service = DummyAIService(max_concurrency=4)
+    assert ai_service.map(lambda x: x * 2, [1, 2, 3, 4, 5]) == [2, 4, 6, 8, 10]
+
+
+def test_request_bounds_requests_in_flight():
+    ai_service = DummyAIService(max_concurrency=2)
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def request(_):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+
+    ai_service.map(lambda item: ai_service._request(request, item), range(8))
+
+    assert max(peak) == 2
+
+
+def test_request_retries_rate_limited_requests():
+    ai_service = DummyAIService(max_retries=2, backoff_factor=0)
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RateLimitError()
+        return "ok"
+
+    assert ai_service._request(request) == "ok"
+    assert len(calls) == 3
+
+
+def test_request_gives_up_after_max_retries():
+    ai_service = DummyAIService(max_retries=1, backoff_factor=0)
+
+    def request():
+        raise RateLimitError()
+
+    with pytest.raises(RateLimitError):
+        ai_service._request(request)
+
+
+def test_request_does_not_retry_other_errors():
+    ai_service = DummyAIService(max_retries=3, backoff_factor=0)
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        ai_service._request(request)
+    assert len(calls) == 1
+
+
+def test_cached_reuses_responses():
+    ai_service = DummyAIService(response_cache=MemoryResponseCache())
+    calls = []
+
+    def request():
+        calls.append(1)
+        return len(calls)
+
+    assert ai_service._cached(request, model="m", messages=["a"]) == 1
+    assert ai_service._cached(request, model="m", messages=["a"]) == 1
+    assert ai_service._cached(request, model="m", messages=["b"]) == 2
+
+
+def test_cached_bypass_refreshes_responses():
+    ai_service = DummyAIService(response_cache=MemoryResponseCache())
+    calls = []
+
+    def request():
+        calls.append(1)
+        return len(calls)
+
+    ai_service._cached(request, model="m", messages=["a"])
+
+    assert ai_service._cached(request, bypass_cache=True, model="m", messages=["a"]) == 2
+    assert ai_service._cached(request, model="m", messages=["a"]) == 2
@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+from pydantic import BaseModel
+from lunar_nl2sql.services.ai import AzureOpenAIService, SqliteResponseCache
+
+
+class SQLFormat(BaseModel):
+    sql: str
+
+
+PARSED_COMPLETION = {
+    "id": "completion",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {
+                "role": "assistant",
+                "content": '{"sql": "SELECT 1"}',
+                "parsed": {"sql": "SELECT 1"},
+            },
+        }
+    ],
+}
+
+
+def test_cached_json_responses_are_parsed_again(tmp_path):
+    ai_service = AzureOpenAIService(
+        {"model": "gpt"}, response_cache=SqliteResponseCache(str(tmp_path / "cache.db"))
+    )
+    ai_service._client = MagicMock()
+    ai_service._client.beta.chat.completions.parse.return_value = (
+        AzureOpenAIService._decode_response(
+            ai_service, PARSED_COMPLETION, type="json", response_format=SQLFormat
+        )
+    )
+    messages = [{"role": "user", "content": "question"}]
+
+    ai_service.run(messages, type="json", response_format=SQLFormat)
+    response = ai_service.run(messages, type="json", response_format=SQLFormat)
+
+    ai_service._client.beta.chat.completions.parse.assert_called_once()
+    assert isinstance(response.choices[0].message.parsed, SQLFormat)
+    assert response.choices[0].message.parsed.sql == "SELECT 1"
@@ -0,0 +1,62 @@
+import time
+import pytest
+from pydantic import BaseModel
+from lunar_nl2sql.services.ai.response_cache import (
+    MemoryResponseCache,
+    ResponseCache,
+    SqliteResponseCache,
+)
+
+
+class SQLFormat(BaseModel):
+    sql: str
+
+
+class OtherSQLFormat(BaseModel):
+    sql: str
+    explanation: str
+
+
+def test_key_depends_on_the_whole_request():
+    messages = [{"role": "user", "content": "question"}]
+    key = ResponseCache.key(model="gpt", messages=messages, response_format=SQLFormat)
+
+    assert key == ResponseCache.key(model="gpt", messages=messages, response_format=SQLFormat)
+    assert key != ResponseCache.key(model="gpt-2", messages=messages, response_format=SQLFormat)
+    assert key != ResponseCache.key(model="gpt", messages=[], response_format=SQLFormat)
+    assert key != ResponseCache.key(model="gpt", messages=messages, response_format=OtherSQLFormat)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@pytest.mark.parametrize(
+    "make_cache",
+    [
+        lambda tmp_path, ttl: MemoryResponseCache(ttl=ttl),
+        lambda tmp_path, ttl: SqliteResponseCache(str(tmp_path / "cache.db"), ttl=ttl),
+    ],
+)
+def test_expired_entries_are_ignored(tmp_path, make_cache):
+    cache = make_cache(tmp_path, 0.01)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_is_persistent(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SqliteResponseCache(path).set("a", {"choices": [1, 2]})
+
+    assert SqliteResponseCache(path).get("a") == {"choices": [1, 2]}
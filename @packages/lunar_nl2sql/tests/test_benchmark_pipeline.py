@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import benchmark_pipeline  # noqa: E402
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "duckdb_csv"])
+def test_benchmark_runs_with_candidate_tables(backend, monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "benchmark_pipeline.py",
+            "--tables", "10",
+            "--questions", "3",
+            "--backend", backend,
+            "--max-candidate-tables", "5",
+        ],
+    )
+
+    benchmark_pipeline.main()
+
+    output = capsys.readouterr().out
+    assert backend in output
+    assert "max_prompt_tokens" in output
+
+
+def test_benchmark_reports_largest_prompt():
+    result = benchmark_pipeline.run_benchmark("sqlite", 10, 3, max_candidate_tables=5)
+
+    assert result["correct"] == 3
+    assert result["max_prompt_tokens"] >= (
+        result["prompt_tokens_per_question"] / result["prompts_per_question"]
+    )
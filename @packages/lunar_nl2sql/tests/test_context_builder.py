@@ -0,0 +1,85 @@
+import pytest
+from pandas import DataFrame
+from lunar_nl2sql.generators.context_builder import ContextBuilder
+from lunar_nl2sql.generators.types import PromptContext
+from lunar_nl2sql.retrievers.types import (
+    Tables,
+    TableAttributesCollection,
+    TableAttributes,
+    TableReferenceValuesCollection,
+    TableReferenceValues,
+    Context,
+)
+from lunar_nl2sql.data_access.types import TableSamples
+
+
+def count_words(text):
+    return len(text.split())
+
+@pytest.fixture
+def context():
+    return Context(
+        relevant_tables=Tables(['users', 'orders']),
+        relevant_attributes=TableAttributesCollection([
+            TableAttributes(table='users', attributes=['name', 'city']),
+            TableAttributes(table='orders', attributes=['amount'])
+        ]),
+        reference_values=TableReferenceValuesCollection([
+            TableReferenceValues(table='users', attribute='city', values=['Geneva'])
+        ]),
+        relevant_sample_data=TableSamples({
+            'users': DataFrame({'name': ['John', 'Jane', 'Jack'], 'city': ['Geneva', 'Geneva', 'Bern']}),
+            'orders': DataFrame({'amount': [10, 20]})
+        }),
+        relevant_nl_db_schema={'users': 'Users table', 'orders': 'Orders table'}
+    )
+
+def test_build_without_budget_includes_everything(context):
+    prompt_context = ContextBuilder(count_tokens=count_words).build(context)
+
+    assert prompt_context == PromptContext(
+        table_attributes_context="- Table: users; Attributes: `name`, `city`\n- Table: orders; Attributes: `amount`\n",
+        reference_values_context="`users.city` = Geneva\n",
+        sample_data_context="`users.name` = John, Jane, Jack\n`users.city` = Geneva, Geneva, Bern\n`orders.amount` = 10, 20\n",
+    )
+
+def test_build_without_budget_keeps_long_values(context):
+    context.relevant_sample_data.root['users']['name'] = ['J' * 300, 'Jane', 'Jack']
+
+    prompt_context = ContextBuilder(count_tokens=count_words).build(context)
+
+    assert f"`users.name` = {'J' * 300}, Jane, Jack\n" in prompt_context.sample_data_context
+
+def test_build_with_budget_truncates_and_deduplicates_values(context):
+    context.relevant_sample_data.root['users']['name'] = ['J' * 20, 'Jane', 'Jack']
+
+    prompt_context = ContextBuilder(token_budget=100, max_value_length=6, count_tokens=count_words).build(context)
+
+    assert "`users.name` = JJJJJJ..., Jane, Jack\n" in prompt_context.sample_data_context
+    assert "`users.city` = Geneva, Bern\n" in prompt_context.sample_data_context
+
+def test_build_skips_lines_that_do_not_fit(context):
+    context.relevant_sample_data.root['users']['name'] = ['John Jane Jack Jill Joe', 'Jim', 'Jo']
+    # 11 tokens of table attributes, 3 of reference values
+    builder = ContextBuilder(token_budget=18, count_tokens=count_words)
+
+    prompt_context = builder.build(context)
+
+    assert prompt_context.sample_data_context == "`users.city` = Geneva, Bern\n"
+
+def test_build_respects_token_budget(context):
+    builder = ContextBuilder(token_budget=18, count_tokens=count_words)
+
+    prompt_context = builder.build(context)
+
+    assert prompt_context.reference_values_context == "`users.city` = Geneva\n"
+    assert prompt_context.sample_data_context == "`users.name` = John, Jane\n"
+    total = sum(count_words(section) for section in prompt_context.model_dump().values())
+    assert total <= 18
+
+def test_build_always_keeps_table_attributes(context):
+    prompt_context = ContextBuilder(token_budget=1, count_tokens=count_words).build(context)
+
+    assert "- Table: users" in prompt_context.table_attributes_context
+    assert prompt_context.reference_values_context == ""
+    assert prompt_context.sample_data_context == ""
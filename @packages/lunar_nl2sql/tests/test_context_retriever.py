@@ -12,6 +12,8 @@ from lunar_nl2sql.retrievers.types import (
 from lunar_nl2sql.retrievers.context_retriever import ContextRetriever
 from lunar_nl2sql.services.ai import AIService
 from lunar_nl2sql.indexers.indexer import Indexer
+from lunar_nl2sql.indexers.table_vector_index import TableVectorIndex
+from lunar_nl2sql.data_access.value_index import ValueIndex
 import pandas as pd
 
 @pytest.fixture
@@ -123,4 +125,58 @@ def test_retrieve_relevant_sample_data(context_retriever):
 
     assert result.root['table2'].iloc[0, 0] == 1
 
-    assert result.root['table2'].iloc[0, 1] == 30
\ No newline at end of file
+    assert result.root['table2'].iloc[0, 1] == 30
+
+
+def test_retrieve_relevant_tables_prefilters_candidate_tables(ai_service, indexer):
+    nl_query = "Find users older than 30"
+    ai_service.embed.return_value = [[0.0, 1.0]]
+    indexer.table_vector_index = TableVectorIndex(['table1', 'table2'], [[1.0, 0.0], [0.0, 1.0]])
+    context_retriever = ContextRetriever(ai_service, indexer, max_candidate_tables=1)
+
+    mock_prompt = MagicMock()
+    mock_prompt.run.return_value = ['table2']
+
+    with patch('lunar_nl2sql.retrievers.context_retriever.RetrieveRelevantTablesPrompt', return_value=mock_prompt):
+        result = context_retriever._retrieve_relevant_tables(nl_query)
+
+        mock_prompt.run.assert_called_once_with(nl_query, NLDBSchema({'table2': 'table2 description'}))
+        assert result == Tables(['table2'])
+
+def test_retrieve_relevant_tables_skips_prefilter_on_small_schemas(ai_service, indexer):
+    context_retriever = ContextRetriever(ai_service, indexer, max_candidate_tables=5)
+
+    mock_prompt = MagicMock()
+    mock_prompt.run.return_value = ['table2']
+
+    with patch('lunar_nl2sql.retrievers.context_retriever.RetrieveRelevantTablesPrompt', return_value=mock_prompt):
+        context_retriever._retrieve_relevant_tables("Find users older than 30")
+
+        ai_service.embed.assert_not_called()
+        mock_prompt.run.assert_called_once_with("Find users older than 30", indexer.nl_db_schema)
+
+def test_retrieve_with_value_index_skips_reference_values_prompt(ai_service, indexer):
+    indexer.value_index = ValueIndex({('table2', 'city'): ['Geneva', 'Zurich']})
+    context_retriever = ContextRetriever(ai_service, indexer, use_value_index=True)
+
+    with patch('lunar_nl2sql.retrievers.context_retriever.RetrieveRelevantTablesPrompt') as mock_tables_prompt, \
+         patch('lunar_nl2sql.retrievers.context_retriever.RetrieveRelevantTableAttributesPrompt') as mock_attributes_prompt, \
+         patch('lunar_nl2sql.retrievers.context_retriever.RetrieveReferenceValuesPrompt') as mock_values_prompt:
+
+        mock_tables_prompt.return_value.run.return_value = ['table2']
+        mock_attributes_prompt.return_value.run.return_value = [{'table': 'table2', 'attributes': ['city']}]
+
+        result = context_retriever.retrieve("Find users living in Geneva")
+
+        mock_values_prompt.return_value.run.assert_not_called()
+        assert result.reference_values == TableReferenceValuesCollection([
+            TableReferenceValues(table='table2', attribute='city', values=['Geneva'])
+        ])
+
+def test_prefilter_requires_embeddings(ai_service, indexer):
+    ai_service.supports_embeddings = False
+
+    with pytest.raises(ValueError):
+        ContextRetriever(ai_service, indexer, max_candidate_tables=1)
+
+    ContextRetriever(ai_service, indexer)
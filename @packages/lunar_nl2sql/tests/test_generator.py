@@ -3,7 +3,9 @@ from unittest.mock import MagicMock
 from lunar_nl2sql.services.ai import AIService
 from lunar_nl2sql.retrievers.context_retriever import ContextRetriever
 from lunar_nl2sql.generators.generator import Generator
-from lunar_nl2sql.prompts import GenerateSQLQueryPrompt, DoubleCheckQueryPrompt
+from lunar_nl2sql.prompts import GenerateSQLQueryPrompt, DoubleCheckQueryPrompt, RepairSQLQueryPrompt
+from lunar_nl2sql.data_access.data_access import DataAccess
+from lunar_nl2sql.generators.types import GeneratedQuery, QueryValidation
 from lunar_nl2sql.retrievers.types import (
     Tables,
     TableAttributesCollection,
@@ -109,4 +111,67 @@ def test_generator_generate_with_no_attributes(generator, context_retriever, con
     nl_query = "Show me all users"
     result = generator.generate(nl_query)
     
-    assert result == "SELECT * FROM users"
\ No newline at end of file
+    assert result == "SELECT * FROM users"
+
+@pytest.fixture
+def data_access():
+    return MagicMock(spec=DataAccess)
+
+@pytest.fixture
+def validating_generator(ai_service, context_retriever, data_access, context_with_attributes, mock_prompts):
+    generator = Generator(ai_service, context_retriever, data_access=data_access)
+    generator.generator_prompt, generator.double_check_prompt = mock_prompts
+    generator.repair_prompt = MagicMock(spec=RepairSQLQueryPrompt)
+    context_retriever.retrieve.return_value = context_with_attributes
+    return generator
+
+def test_generate_validated_skips_double_check_for_valid_queries(validating_generator, data_access):
+    validating_generator.generator_prompt.run.return_value = "SELECT * FROM users WHERE age > 30"
+    data_access.validate_query.return_value = None
+
+    result = validating_generator.generate_validated("Find users older than 30")
+
+    assert result == GeneratedQuery(sql="SELECT * FROM users WHERE age > 30")
+    validating_generator.double_check_prompt.run.assert_not_called()
+    validating_generator.repair_prompt.run.assert_not_called()
+    data_access.execute_query.assert_not_called()
+
+def test_generate_validated_repairs_rejected_queries_once(validating_generator, data_access, context_with_attributes):
+    validating_generator.generator_prompt.run.return_value = "SELECT * FROM user WHERE age > 30"
+    validating_generator.repair_prompt.run.return_value = "SELECT * FROM users WHERE age > 30"
+    data_access.validate_query.side_effect = ["no such table: user", None]
+
+    result = validating_generator.generate_validated("Find users older than 30")
+
+    validating_generator.repair_prompt.run.assert_called_once_with(
+        "Find users older than 30",
+        "SELECT * FROM user WHERE age > 30",
+        "no such table: user",
+        context_with_attributes.relevant_nl_db_schema,
+    )
+    assert result == GeneratedQuery(sql="SELECT * FROM users WHERE age > 30")
+
+def test_generate_validated_reports_errors_after_repair(validating_generator, data_access):
+    validating_generator.generator_prompt.run.return_value = "SELECT * FROM user"
+    validating_generator.repair_prompt.run.return_value = "SELECT * FROM usr"
+    data_access.validate_query.side_effect = ["no such table: user", "no such table: usr"]
+
+    result = validating_generator.generate_validated("Show me all users")
+
+    assert result == GeneratedQuery(sql="SELECT * FROM usr", error="no such table: usr")
+
+def test_generate_validated_returns_execution_results(validating_generator, data_access):
+    validating_generator.validation = QueryValidation.EXECUTE
+    validating_generator.generator_prompt.run.return_value = "SELECT name FROM users"
+    data_access.validate_query.return_value = None
+    data_access.execute_query.return_value = DataFrame([{'name': 'John'}])
+
+    result = validating_generator.generate_validated("Show me all user names")
+
+    data_access.execute_query.assert_called_once_with("SELECT name FROM users", 100, 10.0)
+    assert result.columns == ['name']
+    assert result.rows == [{'name': 'John'}]
+
+def test_generate_validated_requires_data_access(generator):
+    with pytest.raises(ValueError):
+        generator.generate_validated("Show me all users")
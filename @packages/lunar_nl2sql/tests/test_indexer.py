@@ -6,11 +6,13 @@ from lunar_nl2sql.services.ai import AIService
 from lunar_nl2sql.data_access.data_access import DataAccess
 from lunar_nl2sql.data_access.types import Tables, TableSamples
 from lunar_nl2sql.indexers.types import NLDBSchema, NLTablesSummary
+from lunar_nl2sql.indexers.schema_store import SchemaStore
 
 
 @pytest.fixture
 def mock_ai_service():
     ai_service = MagicMock(spec=AIService)
+    ai_service.map.side_effect = lambda func, items: [func(item) for item in items]
     return ai_service
 
 @pytest.fixture
@@ -90,3 +92,68 @@ def test_nl_tables_summary_property(indexer):
 
         mock_prompt_instance.run.assert_any_call(indexer._nl_db_schema['users'])
         mock_prompt_instance.run.assert_any_call(indexer._nl_db_schema['orders'])
+
+def test_nl_db_schema_reuses_stored_descriptions(mock_ai_service, mock_data_access, tmp_path):
+    schema_store = SchemaStore(str(tmp_path / "schema.db"))
+    mock_data_access.fingerprint.side_effect = lambda table_name: f"{table_name}-v1"
+
+    with patch('lunar_nl2sql.indexers.indexer.NLDBSchemaDescriptionPrompt') as MockPromptClass:
+        MockPromptClass.return_value.run.side_effect = ["users description", "orders description"]
+        Indexer(mock_ai_service, mock_data_access, schema_store).nl_db_schema
+
+    with patch('lunar_nl2sql.indexers.indexer.NLDBSchemaDescriptionPrompt') as MockPromptClass:
+        schema = Indexer(mock_ai_service, mock_data_access, schema_store).nl_db_schema
+
+        MockPromptClass.return_value.run.assert_not_called()
+        assert schema['users'] == "users description"
+        assert schema['orders'] == "orders description"
+
+def test_nl_db_schema_redescribes_changed_tables(mock_ai_service, mock_data_access, tmp_path):
+    schema_store = SchemaStore(str(tmp_path / "schema.db"))
+    schema_store.set_description("users-v1", "users", "users description")
+    schema_store.set_description("orders-v1", "orders", "orders description")
+    mock_data_access.fingerprint.side_effect = lambda table_name: (
+        "orders-v2" if table_name == "orders" else f"{table_name}-v1"
+    )
+
+    with patch('lunar_nl2sql.indexers.indexer.NLDBSchemaDescriptionPrompt') as MockPromptClass:
+        MockPromptClass.return_value.run.return_value = "new orders description"
+        schema = Indexer(mock_ai_service, mock_data_access, schema_store).nl_db_schema
+
+        MockPromptClass.return_value.run.assert_called_once_with('orders', mock_data_access.samples['orders'])
+        assert schema['users'] == "users description"
+        assert schema['orders'] == "new orders description"
+        assert schema_store.get_description("orders-v2") == "new orders description"
+
+def test_table_vector_index_embeds_table_descriptions(indexer, mock_ai_service):
+    indexer._nl_db_schema = NLDBSchema({
+        'users': 'users table schema description',
+        'orders': 'orders table schema description'
+    })
+    mock_ai_service.embed.return_value = [[1.0, 0.0], [0.0, 1.0]]
+
+    table_vector_index = indexer.table_vector_index
+
+    mock_ai_service.embed.assert_called_once_with(
+        ['users table schema description', 'orders table schema description']
+    )
+    assert table_vector_index.search([0.1, 1.0], 1) == ['orders']
+
+def test_table_vector_index_reuses_stored_embeddings(mock_ai_service, mock_data_access, tmp_path):
+    schema_store = SchemaStore(str(tmp_path / "schema.db"))
+    schema_store.set_description("users-v1", "users", "users description")
+    schema_store.set_description("orders-v1", "orders", "orders description")
+    schema_store.set_embedding("users-v1", [1.0, 0.0])
+    mock_data_access.fingerprint.side_effect = lambda table_name: f"{table_name}-v1"
+    mock_ai_service.embed.return_value = [[0.0, 1.0]]
+
+    table_vector_index = Indexer(mock_ai_service, mock_data_access, schema_store).table_vector_index
+
+    mock_ai_service.embed.assert_called_once_with(['orders description'])
+    assert schema_store.get_embedding("orders-v1") == [0.0, 1.0]
+    assert table_vector_index.search([0.1, 1.0], 1) == ['orders']
+
+    mock_ai_service.embed.reset_mock()
+    Indexer(mock_ai_service, mock_data_access, schema_store).table_vector_index
+
+    mock_ai_service.embed.assert_not_called()
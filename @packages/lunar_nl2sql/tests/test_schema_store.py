@@ -0,0 +1,48 @@
+import pytest
+from lunar_nl2sql.indexers.schema_store import SchemaStore
+
+
+@pytest.fixture
+def schema_store(tmp_path):
+    return SchemaStore(str(tmp_path / "schema.db"))
+
+
+def test_missing_fingerprint_returns_none(schema_store):
+    assert schema_store.get_description("unknown") is None
+    assert schema_store.get_summary("unknown") is None
+
+
+def test_description_and_summary_roundtrip(schema_store):
+    schema_store.set_description("fp1", "users", "users description")
+    schema_store.set_summary("fp1", "users summary")
+
+    assert schema_store.get_description("fp1") == "users description"
+    assert schema_store.get_summary("fp1") == "users summary"
+
+
+def test_new_description_invalidates_summary(schema_store):
+    schema_store.set_description("fp1", "users", "users description")
+    schema_store.set_summary("fp1", "users summary")
+
+    schema_store.set_description("fp1", "users", "new users description")
+
+    assert schema_store.get_description("fp1") == "new users description"
+    assert schema_store.get_summary("fp1") is None
+
+
+def test_embedding_roundtrip_and_invalidation(schema_store):
+    schema_store.set_description("fp1", "users", "users description")
+    schema_store.set_embedding("fp1", [0.5, 1.0])
+
+    assert schema_store.get_embedding("fp1") == [0.5, 1.0]
+
+    schema_store.set_description("fp1", "users", "new users description")
+
+    assert schema_store.get_embedding("fp1") is None
+
+
+def test_store_is_persistent(tmp_path):
+    path = str(tmp_path / "schema.db")
+    SchemaStore(path).set_description("fp1", "users", "users description")
+
+    assert SchemaStore(path).get_description("fp1") == "users description"
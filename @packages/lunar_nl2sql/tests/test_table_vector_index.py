@@ -0,0 +1,27 @@
+import pytest
+from lunar_nl2sql.indexers.table_vector_index import TableVectorIndex
+
+
+@pytest.fixture
+def table_vector_index():
+    return TableVectorIndex(
+        ["users", "orders", "products"],
+        [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.7, 0.7, 0.0]],
+    )
+
+
+def test_search_returns_most_similar_tables_first(table_vector_index):
+    assert table_vector_index.search([1.0, 0.1, 0.0], 2) == ["users", "products"]
+
+
+def test_search_ignores_vector_magnitude(table_vector_index):
+    assert table_vector_index.search([0.0, 10.0, 0.0], 1) == ["orders"]
+
+
+def test_search_caps_k_to_number_of_tables(table_vector_index):
+    assert len(table_vector_index.search([1.0, 0.0, 0.0], 10)) == 3
+
+
+def test_mismatched_embeddings_raise_error():
+    with pytest.raises(ValueError):
+        TableVectorIndex(["users", "orders"], [[1.0, 0.0]])
@@ -11,6 +11,8 @@ from typing import List, Optional, Any, Dict
 import pandas as pd
 
 from .causal_discovery_llm import CausalDiscoveryAgentLLM
+from lunar_data_reduction import read_csv_reduced, pop_data_reduction_settings
+
 
 class CausalDiscoveryLLM(
     BaseComponent,
@@ -41,10 +43,24 @@ class CausalDiscoveryLLM(
     component_group=ComponentGroup.CAUSAL_INFERENCE,
     openai_api_key="$LUNARENV::CAUSAL_DISCOVERY_OPENAI_API_KEY",
     model_name="$LUNARENV::CAUSAL_DISCOVERY_MODEL_NAME",
+    ci_test_cache_path="",
+    ci_test_processes="1",
+    max_rows="0",
+    stratify_by="",
+    read_chunk_size="100000",
+    downcast_dtypes="False",
+    bootstrap_runs="0",
+    bootstrap_processes="1",
 ):
     def __init__(self, model: Optional[ComponentModel] = None, **kwargs: Any):
         super().__init__(model=model, configuration=kwargs)
-        self._client = ChatOpenAI(**self.configuration)
+        client_configuration = dict(self.configuration)
+        self._ci_test_cache_path = client_configuration.pop("ci_test_cache_path", "") or None
+        self._ci_test_processes = int(client_configuration.pop("ci_test_processes", 1) or 1)
+        self._data_reduction = pop_data_reduction_settings(client_configuration)
+        self._bootstrap_runs = int(client_configuration.pop("bootstrap_runs", 0) or 0)
+        self._bootstrap_processes = int(client_configuration.pop("bootstrap_processes", 1) or 1)
+        self._client = ChatOpenAI(**client_configuration)
 
     def run(
         self,
@@ -58,7 +74,7 @@ class CausalDiscoveryLLM(
         # Get the inputs
 
         try:
-            df = pd.read_csv(data_path, sep=data_separator)
+            df = read_csv_reduced(data_path, sep=data_separator, **self._data_reduction)
         except Exception as e:
             raise Exception(f"Error getting dataset: {e}")
 
@@ -66,6 +82,10 @@ class CausalDiscoveryLLM(
             client=self._client,
             data=df,
             bg_knowledge=background_graph,
+            ci_test_cache_path=self._ci_test_cache_path,
+            ci_test_processes=self._ci_test_processes,
+            bootstrap_runs=self._bootstrap_runs,
+            bootstrap_processes=self._bootstrap_processes,
         )
 
         ###############################
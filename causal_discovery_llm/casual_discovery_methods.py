@@ -1,3 +1,7 @@
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pandas as pd
 import numpy as np
 import networkx as nx
@@ -11,6 +15,7 @@ from causallearn.utils.PCUtils.BackgroundKnowledge import BackgroundKnowledge
 from causallearn.graph.GraphNode import GraphNode
 from causallearn.search.HiddenCausal.GIN.GIN import GIN
 from causallearn.search.PermutationBased.GRaSP import grasp
+from .ci_tests import CITestCache, ci_test_cache_path
 
 
 ## Utilities -----------------------------------------------------
@@ -56,81 +61,108 @@ def _parse_background_knowledge(background_knowledge):
         return None
     return bk
 
+def _graph_result(dg: dict) -> str:
+    """ Serialize a node-link graph (and its extra info) as compact JSON. """
+    def _default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        return str(value)
+    return json.dumps(dg, separators=(',', ':'), default=_default)
+
+def _mask_links(columns, mask: np.ndarray, **attributes) -> list:
+    """ Links for every (i, j) set in the boolean adjacency mask. """
+    sources, targets = np.nonzero(mask)
+    return [
+        {**attributes, 'source': columns[i], 'target': columns[j]}
+        for i, j in zip(sources, targets)]
+
+def _cpdag_links(graph: np.ndarray, columns) -> list:
+    """ Links of a causallearn CPDAG adjacency matrix.
+
+    graph[i, j] == -1 and graph[j, i] == 1: i --> j, link with weight 1
+    graph[i, j] == graph[j, i] == -1: i --- j, one link with weight 0
+    graph[i, j] == graph[j, i] == 1: i <-> j, one link with weight 0
+
+    Pairs without an edge are not listed.
+    """
+    graph = np.asarray(graph)
+    directed = (graph == -1) & (graph.T == 1)
+    undirected = np.triu(
+        ((graph == -1) & (graph.T == -1)) | ((graph == 1) & (graph.T == 1)), k=1)
+    return (
+        _mask_links(columns, directed, weight=1)
+        + _mask_links(columns, undirected, weight=0))
+
+def _pag_links(graph: np.ndarray, columns) -> list:
+    """ Links of a causallearn PAG adjacency matrix, for the edges with a tail at i
+    (graph[i, j] == -1) not ending in a circle at j.
+    """
+    graph = np.asarray(graph)
+    return _mask_links(columns, (graph == -1) & (graph.T != 2))
+
 ## Constraint Based -----------------------------------------------------
 
 # -- PC 
 def pc_algorithm(
     data: pd.DataFrame,
     alpha=0.05,
-    background_knowledge=None) -> str:
+    background_knowledge=None,
+    indep_test='fisherz',
+    ci_test_cache: CITestCache = None,
+    processes=1) -> str:
     """ Run PC algorithm
     data: pandas dataframe
     alpha: significance level = 0.05
     background_knowledge: background knowledge = None
+    indep_test: causallearn CI test = 'fisherz'
+    ci_test_cache: CI test results shared between runs = None
+    processes: worker processes running the CI tests of each depth = 1
     
     returns:
-        dict: dictionary with the graph in node-link format
+        str: JSON graph in node-link format, with only the edges found
+            (weight 1: directed edge, weight 0: undirected edge)
     """
     
     bk = _parse_background_knowledge(background_knowledge)
         
-    cg = pc(
-        data.values,
-        alpha=alpha,
-        background_knowledge=bk,
-        node_names=data.columns)
+    values = data.values
+    with ci_test_cache_path(
+            values, indep_test, ci_test_cache, processes,
+            alpha=alpha, background_knowledge=bk, node_names=data.columns) as cache_path:
+        cg = pc(
+            values,
+            alpha=alpha,
+            indep_test=indep_test,
+            background_knowledge=bk,
+            node_names=data.columns,
+            cache_path=cache_path)
     
-    # back to node-link format
+    # back to node-link format, listing only the edges found
     dg = nx.node_link_data(nx.DiGraph())
-
     dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
-    for i in range(len(cg.G.graph)):
-        for j in range(len(cg.G.graph)):
-            if(cg.G.graph[i,j] == -1 and cg.G.graph[j, i] == 1):
-                dg.get('links').append({
-                    'weight': 1,
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-            elif(cg.G.graph[i,j] == 1 and cg.G.graph[j, i] == 1):
-                dg.get('links').append({
-                    'weight': 0,
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-            else:
-                dg.get('links').append({
-                    'weight': -1,
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-    # cg.to_nx_graph()
-    # dg = nx.node_link_data(cg.nx_graph.to_directed())
-    # dg['nodes'] = list(
-    #     map(lambda x:
-    #         {'id': cg.labels[x['id']]},  dg['nodes'] ))
-    # dg['links'] = list(
-    #     map(lambda x:
-    #         {
-    #             **x,
-    #             'source': cg.labels[x['source']],
-    #             'target': cg.labels[x['target']]
-    #         },
-    #         dg['links'] ))
-    return str(dg)
+    dg['links'] = _cpdag_links(cg.G.graph, data.columns)
+    return _graph_result(dg)
 
 # -- FCI 
 def fci_algorithm(
     data: pd.DataFrame,
     alpha=0.05,
-    background_knowledge=None) -> dict:
+    background_knowledge=None,
+    indep_test='fisherz',
+    ci_test_cache: CITestCache = None,
+    processes=1) -> str:
     """ Run FCI algorithm
     data: pandas dataframe
     alpha: significance level = 0.05
     background_knowledge: background knowledge = None
+    indep_test: causallearn CI test = 'fisherz'
+    ci_test_cache: CI test results shared between runs = None
+    processes: worker processes running the CI tests of the adjacency search = 1
 
     returns:
-        graph: dictionary with the graph in node-link format
+        str: JSON graph in node-link format, with only the edges found
     """
     # transform the background knowledge colums into Xi format fro FCI
     transformed_dg = nx.node_link_data(nx.DiGraph())
@@ -144,24 +176,24 @@ def fci_algorithm(
             }, background_knowledge['links']))
     bk = _parse_background_knowledge(transformed_dg)
 
-    gg, edges = fci(
-        data.values,
-        alpha=alpha,
-        background_knowledge=bk
-        )
+    # the possible-D-SEP tests after the adjacency search are not prefetched
+    values = data.values
+    with ci_test_cache_path(
+            values, indep_test, ci_test_cache, processes,
+            alpha=alpha, background_knowledge=bk) as cache_path:
+        gg, edges = fci(
+            values,
+            independence_test_method=indep_test,
+            alpha=alpha,
+            background_knowledge=bk,
+            cache_path=cache_path
+            )
     
     # back to node-link format
     dg = nx.node_link_data(nx.DiGraph())
-
     dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
-    for i in range(len(gg.graph)):
-        for j in range(len(gg.graph)):
-            if(gg.graph[i,j] == -1 and gg.graph[j, i] != 2):
-                dg.get('links').append({
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-                
+    dg['links'] = _pag_links(gg.graph, data.columns)
+
     def _parseEdges(stp):
         indx = stp.split('X')
         if(len(indx) == 2):
@@ -187,22 +219,15 @@ def fci_algorithm(
         'interpretation': interpretation,
         'edges': dataF
     }
-    return str(dg)
+    return _graph_result(dg)
 
 ## PermutationBased
 def grasp_algorithm(data: pd.DataFrame, score_func: str):
     G = grasp(data.values, score_func=score_func)
     dg = nx.node_link_data(nx.DiGraph())
     dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
-    for i in range(len(G.graph)):
-        for j in range(len(G.graph)):
-            if(G.graph[i,j] == -1 and G.graph[j, i] == -1):
-                dg.get('links').append({
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-
-    return str(dg)
+    dg['links'] = _cpdag_links(G.graph, data.columns)
+    return _graph_result(dg)
                     
     
 ## ScoreBased
@@ -212,15 +237,9 @@ def ges_algorithm(data: pd.DataFrame, score_func: str):
     dg = nx.node_link_data(nx.DiGraph())
     G = Record['G']
     dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
-    for i in range(len(G.graph)):
-        for j in range(len(G.graph)):
-            if(G.graph[i,j] == -1 and G.graph[j, i] != -1):
-                dg.get('links').append({
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
+    dg['links'] = _cpdag_links(G.graph, data.columns)
     dg['graph_score'] = Record['score']
-    return str(dg)
+    return _graph_result(dg)
     
 ## Func. Constrained Based ----------------------------------------------
 
@@ -285,7 +304,7 @@ def lingam_algorithm(
             x['weight'] > alpha,
             dg['links'] ))
     
-    return str(dg)
+    return _graph_result(dg)
 
 # -- PNL
 def pnl_algorithm(
@@ -362,21 +381,18 @@ def granger_algorithm(
 
     # Create a directed graph from the Granger causality results
     # Depending on the maxlag, 
+    # adjmat[i, j*maxlag + lag] -> lagged[i, j, lag]
+    n = len(data.columns)
+    lagged = np.asarray(adjmat).reshape(n, n, maxlag) != 0
+    significant = lagged.any(axis=2) & ~np.eye(n, dtype=bool)
     G = nx.DiGraph()
     edge_info = {}
-    for i, col_i in enumerate(data.columns):
-        for j, col_j in enumerate(data.columns):
-            if i != j:
-                # Check if the relationship is allowed by background knowledge
-                if bk is None or not bk.is_forbidden(GraphNode(col_i), GraphNode(col_j)):
-                    significant_lags = []
-                    for lag in range(maxlag):
-                        if adjmat[i, j*maxlag + lag]:
-                            significant_lags.append(lag + 1)
-
-                    if significant_lags:
-                        G.add_edge(col_i, col_j)
-                        edge_info[(col_i, col_j)] = significant_lags
+    for i, j in zip(*np.nonzero(significant)):
+        col_i, col_j = data.columns[i], data.columns[j]
+        # Check if the relationship is allowed by background knowledge
+        if bk is None or not bk.is_forbidden(GraphNode(col_i), GraphNode(col_j)):
+            G.add_edge(col_i, col_j)
+            edge_info[(col_i, col_j)] = (np.nonzero(lagged[i, j])[0] + 1).tolist()
 
     # Convert the graph to node-link format
     dg = nx.node_link_data(G)
@@ -397,7 +413,7 @@ def granger_algorithm(
                 causal of the variable X_j at the lag k.
                 """
     dg['granger_matrix'] = adjmat.tolist()
-    return str(dg)
+    return _graph_result(dg)
 
 ## Hidden Causal Model ----------------------------------------------------
 def gin_algorithm(
@@ -407,21 +423,57 @@ def gin_algorithm(
     data: pandas dataframe
     alpha: significance level = 0.05
     
-    Return: str(dict)
+    Return: str: JSON graph in node-link format
     """
     G, K = GIN(data, alpha=alpha)
     dg = nx.node_link_data(nx.DiGraph())
 
+ 
     dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
-    for i in range(len(G.graph)):
-        for j in range(len(G.graph)):
-            if(G.graph[i,j] == -1 and G.graph[j, i] != 2):
-                dg.get('links').append({
-                    'source': data.columns[i],
-                    'target': data.columns[j]
-                })
-        
+    dg['links'] = _pag_links(G.graph, data.columns)
+
     dg['causal_order'] = K
         
-    return str(dg)
-    
\ No newline at end of file
+    return _graph_result(dg)
+    
+## Bootstrap Stability ----------------------------------------------------
+def _bootstrap_run(algorithm, data: pd.DataFrame, seed: int, kwargs: dict) -> list:
+    resample = data.sample(n=len(data), replace=True, random_state=seed).reset_index(drop=True)
+    return json.loads(algorithm(resample, **kwargs))['links']
+
+def bootstrap_stability(
+    algorithm,
+    data: pd.DataFrame,
+    runs=20,
+    processes=1,
+    seed=0,
+    **kwargs) -> str:
+    """ Run a causal discovery algorithm on bootstrap resamples of the data
+    algorithm: causal discovery function returning a JSON node-link graph
+        (e.g. pc_algorithm), which must be importable to run in a process pool
+    data: pandas dataframe
+    runs: number of bootstrap resamples = 20
+    processes: worker processes running the resamples = 1
+    seed: random seed of the first resample = 0
+    kwargs: arguments of the algorithm
+
+    returns:
+        str: JSON graph in node-link format, with every edge found in any run
+            and the fraction of the runs that found it ('stability')
+    """
+    seeds = range(seed, seed + runs)
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(
+                _bootstrap_run, repeat(algorithm), repeat(data), seeds, repeat(kwargs)))
+    else:
+        results = [_bootstrap_run(algorithm, data, s, kwargs) for s in seeds]
+
+    counts = Counter(
+        json.dumps(link, sort_keys=True, default=str) for links in results for link in links)
+    dg = nx.node_link_data(nx.DiGraph())
+    dg['nodes'] = list(map(lambda x: {'id': x}, data.columns))
+    dg['links'] = [
+        {**json.loads(link), 'stability': count / runs}
+        for link, count in counts.most_common()]
+    return _graph_result(dg)
@@ -1,5 +1,3 @@
-import json
-import networkx as nx
 import re
 import pandas as pd
 from langchain.agents import Tool, AgentExecutor, LLMSingleActionAgent, AgentOutputParser
@@ -7,13 +5,14 @@ from langchain.prompts import StringPromptTemplate
 from langchain import LLMChain
 from langchain.schema import AgentAction, AgentFinish
 from langchain.callbacks.base import BaseCallbackHandler
-from scipy import stats
-from statsmodels.stats.stattools import durbin_watson
-from statsmodels.tsa.stattools import adfuller
 from typing import List, Union
 from .casual_discovery_methods import pc_algorithm, fci_algorithm
 from .casual_discovery_methods import lingam_algorithm, granger_algorithm, grasp_algorithm
 from .casual_discovery_methods import pnl_algorithm, gin_algorithm, ges_algorithm
+from .casual_discovery_methods import bootstrap_stability
+from .ci_tests import CITestCache
+from .data_properties import DataProfile
+from .dag_state import DAGState
 
 class LoggingCallback(BaseCallbackHandler):
     def __init__(self):
@@ -38,10 +37,19 @@ class LoggingCallback(BaseCallbackHandler):
         self.log.append(f"\t> Agent finished with output: {finish.return_values['output']}\n")
 
 class CausalDiscoveryAgentLLM:
-    def __init__(self, client, data, bg_knowledge):
+    def __init__(
+        self, client, data, bg_knowledge, ci_test_cache_path=None, ci_test_processes=1,
+        bootstrap_runs=0, bootstrap_processes=1):
         self.llm = client
-        self.background_knowledge = bg_knowledge
+        self.dag = DAGState(bg_knowledge)
         self.data = data
+        # PC / FCI re-runs (other alpha or background knowledge) reuse the CI tests
+        self.ci_test_cache = CITestCache(ci_test_cache_path) if ci_test_cache_path else None
+        self.ci_test_processes = ci_test_processes
+        self.data_profile = DataProfile(data)
+        # PC / FCI results come with their edge stability over bootstrap resamples
+        self.bootstrap_runs = bootstrap_runs
+        self.bootstrap_processes = bootstrap_processes
         self.tools = [
             Tool(
                 name="Run_PC_Algorithm",
@@ -216,7 +224,7 @@ class CausalDiscoveryAgentLLM:
 
                 This tool will:
                 1. Apply the specified changes to the current DAG
-                2. Return the updated DAG in node-link format
+                2. Return the changes that were applied
                 
                 This is the only tool that can be used to modify the DAG!
                 If new links are found, use this tool to update the DAG before finishing the causal discovery process.
@@ -246,7 +254,7 @@ class CausalDiscoveryAgentLLM:
                 name="See_Current_DAG",
                 func=self._see_current_dag,
                 description="""
-                Returns the current DAG in node-link format.
+                Returns the current DAG: its direct causal edges and the pairs with no causation.
                 """
             ),
             Tool(
@@ -260,16 +268,19 @@ class CausalDiscoveryAgentLLM:
     def _pc_algorithm(self, input_str):
         try: 
             bk, alpha = input_str.split(',')
-            return pc_algorithm(self.data, float(alpha), self._get_background_knowledge(bk))
+            return self._with_stability(
+                pc_algorithm, float(alpha), self._get_background_knowledge(bk))
         except Exception as e:
             try:
-                return "PC was run with the current DAG and alpha=0.05 \n\n" + pc_algorithm(self.data, float(0.05), self._get_background_knowledge('1'))
+                return "PC was run with the current DAG and alpha=0.05 \n\n" + self._with_stability(
+                    pc_algorithm, float(0.05), self._get_background_knowledge('1'))
             except Exception as e:
                 return f"Error while running PC: {e}"
     def _fci_algorithm(self, input_str):
         try: 
             bk, alpha = input_str.split(',')
-            return fci_algorithm(self.data, float(alpha), self._get_background_knowledge(bk))
+            return self._with_stability(
+                fci_algorithm, float(alpha), self._get_background_knowledge(bk))
         except Exception as e:
             return f"Error while running FCI: {e}"
     def _lingam_algorithm(self, input_str: str):
@@ -322,20 +333,11 @@ class CausalDiscoveryAgentLLM:
     # Other tools are implemented here        
     def _update_dag(self, input_str):
         try:
-            changes: str = input_str.split(';')
-            G: nx.Graph = nx.node_link_graph(self.background_knowledge)
-            for change in changes:
-                action, node1, node2 = change.split(',')
-                if action == 'add_edge':
-                    G.add_edge(node1.strip(), node2.strip(), weight=1)
-                elif action == 'remove_edge':
-                    G.add_edge(node1.strip(), node2.strip(), weight=-1)
-            self.background_knowledge = nx.node_link_data(G)
-            return json.dumps(self.background_knowledge)
+            return self.dag.apply(input_str)
         except Exception as e:
             return f"Error while updating DAG: {e}"
     def _see_current_dag(self, _):
-        return json.dumps(self.background_knowledge)
+        return self.dag.render()
     def _calculate_properties(self, input_str):
         data: pd.DataFrame
         if input_str.strip():
@@ -346,73 +348,29 @@ class CausalDiscoveryAgentLLM:
                 data = self.data
         else:
             data = self.data
-        
-        results = "Data Properties:\n\n"
-        
-        # 1. Shapiro-Wilk test for normality
-        results += "1. Shapiro-Wilk Test for Normality:\n"
-        results += "Where a statistic closer to 1 indicates a normal distribution.\n"
-        results += "Where a p-value less than 0.05 indicates a non-Gaussian distribution.\n\n"
-        for column in data.columns:
-            try: 
-                stat, p = stats.shapiro(data[column])
-                results += f"{column}: statistic={stat:.4f}, p-value={p:.4f}\n"
-            except Exception as e:
-                results += f"{column}: {e}\n"
-        
-        # 2. Pearson correlation coefficient matrix
-        results += "\n2. Pearson Correlation Coefficient Matrix:\n"
-        results += "Where a value closer to 1 indicates a strong positive correlation\n"
-        results += "and a value closer to -1 indicates a strong negative correlation.\n"
-        try: 
-            pd.set_option('display.max_colwidth', None)
-            corr_matrix = data.corr()
-            results += corr_matrix.to_string() + "\n"
-        except Exception as e:
-            results += f"{e}\n"
-        
-        # 3. Durbin-Watson statistic
-        results += "\n3. Durbin-Watson Statistic (for each variable):\n"
-        results += "Where a value closer to 2 indicates no autocorrelation.\n"
-        results += "Where a value closer to 0 indicates positive autocorrelation.\n"
-        results += "Where a value closer to 4 indicates negative autocorrelation.\n\n"
-        for column in data.columns:
-            try:
-                dw = durbin_watson(data[column])
-                results += f"{column}: {dw:.4f}\n"
-            except Exception as e:
-                results += f"{column}: {e}\n"
-        
-        # 4. Augmented Dickey-Fuller test
-        results += "\n4. Augmented Dickey-Fuller Test (for each variable):\n"
-        results += "Where a p-value less than 0.05 indicates a stationary time series.\n\n"
-        for column in data.columns:
-            try:
-                adf = adfuller(data[column])
-                results += f"{column}: ADF Statistic: {adf[0]:.4f}, p-value: {adf[1]:.4f}\n"
-            except Exception as e:
-                results += f"{column}: {e}\n"
-                
-        # 5. Mean, Variance, Skewness, and Kurtosis
-        results += "\n5. Mean, Variance, Skewness, and Kurtosis:\n"
-        for column in data.columns:
-            try:
-                mean = data[column].mean()
-                variance = data[column].var()
-                skewness = data[column].skew()
-                kurtosis = data[column].kurt()
-                results += f"{column}: Mean: {mean:.4f}, Variance: {variance:.4f}, Skewness: {skewness:.4f}, Kurtosis: {kurtosis:.4f}\n"
-            except Exception as e:
-                results += f"{column}: {e}\n"
-        
-        return results
+        # statistics are computed once per column and reused across calls
+        return self.data_profile.report(list(data.columns))
     
+    @property
+    def background_knowledge(self) -> dict:
+        # Current DAG in node-link format
+        return self.dag.to_node_link()
     def _get_background_knowledge(self, use_current_bk: str):
         # To be used as an utility (NOT A TOOL!)
         if(use_current_bk == '0'):
             return None
         else:
             return self.background_knowledge
+    def _with_stability(self, algorithm, alpha, background_knowledge):
+        # To be used as an utility (NOT A TOOL!)
+        result = algorithm(
+            self.data, alpha, background_knowledge,
+            ci_test_cache=self.ci_test_cache, processes=self.ci_test_processes)
+        if self.bootstrap_runs > 0:
+            result += f"\n\nEdge stability over {self.bootstrap_runs} bootstrap resamples:\n" + bootstrap_stability(
+                algorithm, self.data, self.bootstrap_runs, self.bootstrap_processes,
+                alpha=alpha, background_knowledge=background_knowledge)
+        return result
     def _error(self, input_error: str) -> str:
         return "Parsing error - No Action was taken (no tool) \n\t\t" + input_error
     
@@ -423,7 +381,7 @@ class CausalDiscoveryAgentLLM:
         template: str
         tools: List[Tool]
         data: pd.DataFrame
-        background_knowledge: dict
+        background_knowledge: str
         
         def format(self, **kwargs) -> str:
             intermediate_steps = kwargs.pop("intermediate_steps")
@@ -437,7 +395,7 @@ class CausalDiscoveryAgentLLM:
             kwargs["data_columns"] = ", ".join(self.data.columns)
             kwargs["data_shape"] = str(self.data.shape)
             kwargs["data_head"] = str(self.data.head())
-            kwargs["background_knowledge"] = str(self.background_knowledge)
+            kwargs["background_knowledge"] = self.background_knowledge
             return self.template.format(**kwargs)
 
     class CustomOutputParser(AgentOutputParser):
@@ -504,7 +462,7 @@ class CausalDiscoveryAgentLLM:
                 {agent_scratchpad}""",
             tools=self.tools,
             data=self.data,
-            background_knowledge=self.background_knowledge,
+            background_knowledge=self.dag.render(),
             input_variables=["input", "context", "intermediate_steps"]
         )
 
@@ -532,10 +490,10 @@ class CausalDiscoveryAgentLLM:
             Your job is to analyze the causal relationships in the dataset to find causal relationships
             using systematic causal inference (tools) to update the causal graph.
             If, given the results, new links between variables are identified, UPDATE the current causal graph.
-            The links' weights from the initial causal graph are to be interpreted as follows:
-                weight = -1 : There is no direct relationship from Source to Target
-                weight > 0 : There is a direct relationship from Source to Target
-                no link for A to B: There was no background to support a causal relationship between the two nodes, but latent variables may exist.
+            The initial causal graph (background knowledge) is to be interpreted as follows:
+                Source -> Target : There is a direct relationship from Source to Target
+                A -/- B, Source -/-> Target : There is no direct relationship between A and B / from Source to Target
+                no edge for A and B: There was no background to support a causal relationship between the two nodes, but latent variables may exist.
                 
             Please give an exhaustive interpretation of the causal relationships found in the data given the systematic causal inference results and the final causal graph.
         """
@@ -556,7 +514,7 @@ class CausalDiscoveryAgentLLM:
             
             Head: {self.data.head().to_string()}
             
-            Causal Graph: {str(self.background_knowledge)}
+            Causal Graph: {self.dag.render()}
 
             > Construct a Structural Equation Model (SEM) that represents the causal relationships found in the data.
             Follow these guidelines:
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+from itertools import combinations
+from typing import Iterator
+
+import numpy as np
+from causallearn.graph.GraphNode import GraphNode
+from causallearn.utils.cit import CIT
+
+def data_hash(data: np.ndarray) -> str:
+    """ Hash of the full content of a data matrix. """
+    data = np.ascontiguousarray(data)
+    digest = hashlib.sha256(f"{data.dtype}{data.shape}".encode('utf-8'))
+    digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+class CITestCache:
+    """
+    On-disk store of conditional independence test p-values, shared by every
+    run (and process) pointing at the same SQLite file.
+
+    Results are keyed by the dataset hash, the test type (method and its
+    parameters) and the tested X, Y | conditioning set. They do not depend on
+    alpha, so runs with a different significance level reuse them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS ci_tests (
+                    data_hash TEXT NOT NULL,
+                    test_type TEXT NOT NULL,
+                    test TEXT NOT NULL,
+                    p_value REAL NOT NULL,
+                    PRIMARY KEY (data_hash, test_type, test)
+                )""")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """ A connection committed (or rolled back) and closed on exit. """
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            yield connection
+
+    def load(self, data_hash: str, test_type: str) -> dict:
+        """ p-values of every stored test, keyed by the causallearn test key. """
+        with self._lock, self._connect() as connection:
+            rows = connection.execute(
+                "SELECT test, p_value FROM ci_tests WHERE data_hash = ? AND test_type = ?",
+                (data_hash, test_type)).fetchall()
+        return dict(rows)
+
+    def save(self, data_hash: str, test_type: str, p_values: dict):
+        if not p_values:
+            return
+        with self._lock, self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO ci_tests (data_hash, test_type, test, p_value) VALUES (?, ?, ?, ?)",
+                [(data_hash, test_type, test, float(p)) for test, p in p_values.items()])
+
+
+## Parallel tests -----------------------------------------------------
+_worker_test = None
+
+def _init_worker(data: np.ndarray, method: str):
+    global _worker_test
+    _worker_test = CIT(data, method)
+
+def _run_tests(tests: list) -> list:
+    return [_worker_test(x, y, S) for x, y, S in tests]
+
+def _chunks(items: list, count: int) -> list:
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def prefetch_ci_tests(
+    data: np.ndarray,
+    method: str = 'fisherz',
+    alpha: float = 0.05,
+    background_knowledge=None,
+    node_names=None,
+    cache: CITestCache = None,
+    processes: int = 1) -> dict:
+    """
+    Run the conditional independence tests of the (stable) PC adjacency search,
+    which is also the first step of FCI, reusing the stored results of the
+    cache and running the missing tests of each depth in a process pool.
+
+    data: data matrix given to the causal discovery algorithm
+    method: causallearn CI test = 'fisherz'
+    alpha: significance level = 0.05
+    background_knowledge: causallearn BackgroundKnowledge = None
+    node_names: node names used by the background knowledge = None
+    cache: CITestCache to read and update = None
+    processes: number of worker processes, 1 to run the tests inline = 1
+
+    returns:
+        dict: causallearn p-value cache (as accepted through `cache_path`)
+    """
+    indep_test = CIT(data, method)
+    p_values = indep_test.pvalue_cache
+    hashed = data_hash(data)
+    test_type = f"{p_values['method_name']}:{p_values['parameters_hash']}"
+    if cache is not None:
+        p_values.update(cache.load(hashed, test_type))
+    computed = {}
+
+    n = data.shape[1]
+    nodes = [GraphNode(name) for name in (node_names if node_names is not None else [f"X{i + 1}" for i in range(n)])]
+    banned = np.zeros((n, n), dtype=bool)
+    if background_knowledge is not None:
+        for x, y in combinations(range(n), 2):
+            banned[x, y] = banned[y, x] = (
+                background_knowledge.is_forbidden(nodes[x], nodes[y])
+                and background_knowledge.is_forbidden(nodes[y], nodes[x]))
+
+    executor = ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(data, method)) if processes > 1 else None
+    try:
+        adjacency = ~np.eye(n, dtype=bool)
+        depth = -1
+        while adjacency.sum(axis=1).max() - 1 > depth:
+            depth += 1
+            # the adjacencies are fixed within a depth, so every test is known upfront
+            tests = []
+            for x in range(n):
+                neighbors = np.flatnonzero(adjacency[x])
+                for y in neighbors:
+                    for S in combinations(neighbors[neighbors != y], depth):
+                        tests.append((x, y, S, indep_test.get_formatted_XYZ_and_cachekey(x, y, S)[3]))
+
+            pending = {}
+            for x, y, S, key in tests:
+                if key not in p_values:
+                    pending.setdefault(key, (int(x), int(y), tuple(map(int, S))))
+            if executor is not None and len(pending) > 1:
+                chunks = _chunks(list(pending.items()), processes * 4)
+                for chunk, results in zip(chunks, executor.map(_run_tests, [[test for _, test in c] for c in chunks])):
+                    computed.update(zip([key for key, _ in chunk], results))
+            else:
+                for key, (x, y, S) in pending.items():
+                    computed[key] = indep_test(x, y, S)
+            p_values.update(computed)
+
+            removal = banned & adjacency
+            for x, y, _, key in tests:
+                if p_values[key] > alpha:
+                    removal[x, y] = removal[y, x] = True
+            adjacency &= ~removal
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if cache is not None:
+        cache.save(hashed, test_type, computed)
+    return p_values
+
+
+@contextmanager
+def ci_test_cache_path(data: np.ndarray, method: str, cache: CITestCache = None, processes: int = 1, **kwargs):
+    """
+    Prefetch the CI tests of `data` (see `prefetch_ci_tests`) into a temporary
+    causallearn cache file, yielding its path to be passed as `cache_path`.
+    Yields None when there is neither a cache nor a process pool to use.
+    """
+    if cache is None and processes <= 1:
+        yield None
+        return
+    p_values = prefetch_ci_tests(data, method, cache=cache, processes=processes, **kwargs)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ci_tests.json')
+        with open(path, 'w') as file:
+            json.dump(p_values, file)
+        yield path
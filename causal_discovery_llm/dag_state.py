@@ -0,0 +1,130 @@
+import copy
+from typing import Dict, List, Optional
+
+
+class DAGState:
+    """
+    Current DAG (background knowledge) of the causal discovery agent, kept as
+    adjacency lists of required edges (weight > 0, or any weight other than -1)
+    and forbidden edges (weight -1) instead of a full node-link graph.
+
+    It renders compactly for the prompts, reports the changes applied rather
+    than the full graph, and converts back to node-link format for the causal
+    discovery methods and the component output.
+    """
+
+    def __init__(self, graph: Optional[dict] = None):
+        self.nodes: List[str] = []
+        self.required: Dict[str, Dict[str, float]] = {}
+        self.forbidden: Dict[str, set] = {}
+        self._position: Dict[str, int] = {}
+        self._node_link = None
+        graph = graph or {}
+        for node in graph.get('nodes', []):
+            self._add_node(node['id'])
+        for link in graph.get('links', []):
+            if link.get('weight') == -1:
+                self._forbid(link['source'], link['target'])
+            else:
+                self._require(link['source'], link['target'], link.get('weight', 1))
+
+    # Changes ----------------------------------------------------------------
+    def _add_node(self, node: str):
+        if node not in self.required:
+            self._position[node] = len(self.nodes)
+            self.nodes.append(node)
+            self.required[node] = {}
+            self.forbidden[node] = set()
+
+    def _require(self, source: str, target: str, weight=1) -> bool:
+        self._add_node(source)
+        self._add_node(target)
+        changed = self.required[source].get(target) != weight or target in self.forbidden[source]
+        self.required[source][target] = weight
+        self.forbidden[source].discard(target)
+        return changed
+
+    def _forbid(self, source: str, target: str) -> bool:
+        self._add_node(source)
+        self._add_node(target)
+        changed = target not in self.forbidden[source]
+        self.forbidden[source].add(target)
+        self.required[source].pop(target, None)
+        return changed
+
+    def apply(self, changes: str) -> str:
+        """
+        Apply changes in the format add_edge,node1,node2 or remove_edge,node1,node2,
+        separated by semicolons, and return the diff (only what actually changed).
+        All the changes are validated first, so a malformed one leaves the DAG unchanged.
+        """
+        parsed = []
+        for change in changes.split(';'):
+            fields = [field.strip() for field in change.split(',')]
+            if len(fields) != 3 or not all(fields):
+                raise ValueError(f"Malformed change '{change.strip()}', expected action,node1,node2")
+            if fields[0] not in ('add_edge', 'remove_edge'):
+                raise ValueError(f"Unknown change '{fields[0]}'")
+            parsed.append(fields)
+
+        diff = []
+        for action, node1, node2 in parsed:
+            new_nodes = [node for node in (node1, node2) if node not in self.required]
+            if action == 'add_edge':
+                changed = self._require(node1, node2)
+                line = f"+ {node1} -> {node2}"
+            else:
+                changed = self._forbid(node1, node2)
+                line = f"- {node1} -/-> {node2}"
+            diff.extend(f"+ node {node}" for node in new_nodes)
+            if changed:
+                diff.append(line)
+        if diff:
+            self._node_link = None
+            return "DAG changes:\n" + "\n".join(diff)
+        return "No changes: the DAG already had these edges."
+
+    # Views ------------------------------------------------------------------
+    def render(self) -> str:
+        """
+        Compact text view: required edges as adjacency lists, pairs without causation
+        in either direction, and the remaining forbidden edges (the reverse of a
+        required edge is implied and not listed).
+        """
+        required = [
+            f"{source} -> {', '.join(targets)}"
+            for source, targets in self.required.items() if targets]
+        no_causation = []
+        forbidden = []
+        for source in self.nodes:
+            for target in sorted(self.forbidden[source], key=self._position.get):
+                if source in self.forbidden[target]:
+                    if self._position[source] < self._position[target]:
+                        no_causation.append(f"{source} -/- {target}")
+                elif source not in self.required[target]:
+                    forbidden.append(f"{source} -/-> {target}")
+        lines = [f"Nodes: {', '.join(self.nodes)}"]
+        lines.append(f"Direct causation (source -> targets): {'; '.join(required) or 'none'}")
+        lines.append(f"No causation in either direction: {', '.join(no_causation) or 'none'}")
+        if forbidden:
+            lines.append(f"No causation from source to target: {', '.join(forbidden)}")
+        lines.append("Pairs not listed have no background knowledge (latent variables may exist).")
+        return "\n".join(lines)
+
+    def to_node_link(self) -> dict:
+        """ Node-link format (forbidden edges as weight -1 links), a copy callers may change. """
+        if self._node_link is None:
+            links = [
+                {'weight': weight, 'source': source, 'target': target}
+                for source, targets in self.required.items() for target, weight in targets.items()]
+            links += [
+                {'weight': -1, 'source': source, 'target': target}
+                for source in self.nodes for target in sorted(self.forbidden[source], key=self._position.get)]
+            self._node_link = {
+                'directed': True,
+                'multigraph': False,
+                'graph': {},
+                'nodes': [{'id': node} for node in self.nodes],
+                'links': links,
+            }
+        return copy.deepcopy(self._node_link)
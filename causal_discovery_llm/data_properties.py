@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.stattools import durbin_watson
+from statsmodels.tsa.stattools import adfuller
+
+
+class DataProfile:
+    """
+    Statistical properties of a dataset, relevant for choosing a causal discovery
+    method, computed once per column and cached.
+
+    Moments and the correlation matrix are computed for every numeric column at
+    once with NumPy; the per-column tests (Shapiro-Wilk, Durbin-Watson, ADF) are
+    computed the first time a column is requested. A subset of variables is
+    served as a slice of the cached results.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._tests = {'shapiro': {}, 'durbin_watson': {}, 'adf': {}, 'moments': {}}
+        self._moments = None
+        self._correlation = None
+
+    # Per-column tests -----------------------------------------------------
+    def _test(self, name: str, column: str, func) -> str:
+        lines = self._tests[name]
+        if column not in lines:
+            try:
+                lines[column] = func(self.data[column])
+            except Exception as e:
+                lines[column] = f"{column}: {e}\n"
+        return lines[column]
+
+    def shapiro(self, column: str) -> str:
+        def _shapiro(values):
+            stat, p = stats.shapiro(values)
+            return f"{column}: statistic={stat:.4f}, p-value={p:.4f}\n"
+        return self._test('shapiro', column, _shapiro)
+
+    def durbin_watson(self, column: str) -> str:
+        def _durbin_watson(values):
+            return f"{column}: {durbin_watson(values):.4f}\n"
+        return self._test('durbin_watson', column, _durbin_watson)
+
+    def adf(self, column: str) -> str:
+        def _adf(values):
+            adf = adfuller(values)
+            return f"{column}: ADF Statistic: {adf[0]:.4f}, p-value: {adf[1]:.4f}\n"
+        return self._test('adf', column, _adf)
+
+    # Vectorized statistics ------------------------------------------------
+    def _numeric_columns(self) -> list:
+        # bool columns are numeric for pandas too (as 0 and 1)
+        return [
+            column for column in self.data.columns
+            if pd.api.types.is_numeric_dtype(self.data[column])]
+
+    @property
+    def moments(self) -> pd.DataFrame:
+        """ Mean, variance, skewness and kurtosis (as computed by pandas) of the numeric columns. """
+        if self._moments is None:
+            columns = self._numeric_columns()
+            values = self.data[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(values)
+            n = valid.sum(axis=0).astype(np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.nansum(values, axis=0) / n
+                centered = np.where(valid, values - mean, 0.0)
+                m2 = (centered ** 2).sum(axis=0) / n
+                m3 = (centered ** 3).sum(axis=0) / n
+                m4 = (centered ** 4).sum(axis=0) / n
+                variance = m2 * n / (n - 1)
+                # bias-corrected sample skewness and excess kurtosis
+                skewness = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+                kurtosis = ((n + 1) * (m4 / m2 ** 2 - 3) + 6) * (n - 1) / ((n - 2) * (n - 3))
+            constant = m2 <= np.finfo(np.float64).eps * np.maximum(mean ** 2, 1)
+            skewness = np.where(n < 3, np.nan, np.where(constant, 0.0, skewness))
+            kurtosis = np.where(n < 4, np.nan, np.where(constant, 0.0, kurtosis))
+            self._moments = pd.DataFrame(
+                {'mean': mean, 'variance': variance, 'skewness': skewness, 'kurtosis': kurtosis},
+                index=columns)
+        return self._moments
+
+    def moments_line(self, column: str) -> str:
+        if column not in self.moments.index:
+            # not numeric: report the error pandas gives
+            return self._test('moments', column, lambda values: f"{column}: Mean: {values.mean():.4f}\n")
+        mean, variance, skewness, kurtosis = self.moments.loc[column]
+        return f"{column}: Mean: {mean:.4f}, Variance: {variance:.4f}, Skewness: {skewness:.4f}, Kurtosis: {kurtosis:.4f}\n"
+
+    @property
+    def correlation(self) -> pd.DataFrame:
+        """ Pearson correlation matrix of the numeric columns. """
+        if self._correlation is None:
+            columns = self._numeric_columns()
+            numeric = self.data[columns]
+            if numeric.isna().to_numpy().any():
+                # pairwise complete observations
+                self._correlation = numeric.corr()
+            else:
+                self._correlation = pd.DataFrame(
+                    np.atleast_2d(np.corrcoef(numeric.to_numpy(dtype=np.float64, na_value=np.nan), rowvar=False)),
+                    index=columns, columns=columns)
+        return self._correlation
+
+    def correlation_matrix(self, columns: list) -> pd.DataFrame:
+        if all(column in self.correlation.index for column in columns):
+            return self.correlation.loc[columns, columns]
+        return self.data[columns].corr()
+
+    # Report -----------------------------------------------------------------
+    def report(self, columns: list) -> str:
+        results = ["Data Properties:\n\n"]
+
+        # 1. Shapiro-Wilk test for normality
+        results.append("1. Shapiro-Wilk Test for Normality:\n")
+        results.append("Where a statistic closer to 1 indicates a normal distribution.\n")
+        results.append("Where a p-value less than 0.05 indicates a non-Gaussian distribution.\n\n")
+        results.extend(self.shapiro(column) for column in columns)
+
+        # 2. Pearson correlation coefficient matrix
+        results.append("\n2. Pearson Correlation Coefficient Matrix:\n")
+        results.append("Where a value closer to 1 indicates a strong positive correlation\n")
+        results.append("and a value closer to -1 indicates a strong negative correlation.\n")
+        try:
+            pd.set_option('display.max_colwidth', None)
+            results.append(self.correlation_matrix(columns).to_string() + "\n")
+        except Exception as e:
+            results.append(f"{e}\n")
+
+        # 3. Durbin-Watson statistic
+        results.append("\n3. Durbin-Watson Statistic (for each variable):\n")
+        results.append("Where a value closer to 2 indicates no autocorrelation.\n")
+        results.append("Where a value closer to 0 indicates positive autocorrelation.\n")
+        results.append("Where a value closer to 4 indicates negative autocorrelation.\n\n")
+        results.extend(self.durbin_watson(column) for column in columns)
+
+        # 4. Augmented Dickey-Fuller test
+        results.append("\n4. Augmented Dickey-Fuller Test (for each variable):\n")
+        results.append("Where a p-value less than 0.05 indicates a stationary time series.\n\n")
+        results.extend(self.adf(column) for column in columns)
+
+        # 5. Mean, Variance, Skewness, and Kurtosis
+        results.append("\n5. Mean, Variance, Skewness, and Kurtosis:\n")
+        results.extend(self.moments_line(column) for column in columns)
+
+        return "".join(results)
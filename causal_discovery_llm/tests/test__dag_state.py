@@ -0,0 +1,44 @@
+import pytest
+from causal_discovery_llm.dag_state import DAGState
+
+
+class TestDAGState:
+    def setup_method(self):
+        self.dag = DAGState({
+            'nodes': [{'id': 'X1'}, {'id': 'X2'}, {'id': 'X3'}],
+            'links': [{'weight': 1, 'source': 'X1', 'target': 'X2'}],
+        })
+
+    def test_apply_reports_only_changes(self):
+        diff = self.dag.apply('add_edge,X1,X2; add_edge,X2,X3; remove_edge,X3,X1')
+        assert diff == "DAG changes:\n+ X2 -> X3\n- X3 -/-> X1"
+        assert self.dag.apply('add_edge,X2,X3') == "No changes: the DAG already had these edges."
+
+    def test_apply_adds_new_nodes(self):
+        diff = self.dag.apply('add_edge,X3,X4')
+        assert diff == "DAG changes:\n+ node X4\n+ X3 -> X4"
+        assert self.dag.nodes == ['X1', 'X2', 'X3', 'X4']
+
+    def test_apply_updates_node_link(self):
+        self.dag.to_node_link()
+        self.dag.apply('remove_edge,X1,X2')
+        assert self.dag.to_node_link()['links'] == [{'weight': -1, 'source': 'X1', 'target': 'X2'}]
+
+    @pytest.mark.parametrize('changes', [
+        'add_edge,X2,X3; add_edge,X3',
+        'add_edge,X2,X3; reverse_edge,X3,X1',
+        'add_edge,X2,X3; add_edge,X3,X4,X5',
+        'add_edge,X2,X3; add_edge,,X1',
+    ])
+    def test_apply_partly_malformed_changes_leaves_dag_unchanged(self, changes):
+        before = self.dag.to_node_link()
+        rendered = self.dag.render()
+        with pytest.raises(ValueError):
+            self.dag.apply(changes)
+        assert self.dag.to_node_link() == before
+        assert self.dag.nodes == ['X1', 'X2', 'X3']
+        assert self.dag.render() == rendered
+
+    def test_to_node_link_returns_a_copy(self):
+        self.dag.to_node_link()['links'].append({'weight': 1, 'source': 'X3', 'target': 'X1'})
+        assert self.dag.to_node_link()['links'] == [{'weight': 1, 'source': 'X1', 'target': 'X2'}]
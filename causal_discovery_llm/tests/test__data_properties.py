@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.stats.stattools import durbin_watson
+from statsmodels.tsa.stattools import adfuller
+from causal_discovery_llm.data_properties import DataProfile
+
+
+def baseline_report(data: pd.DataFrame) -> str:
+    """ The report as the agent computed it before DataProfile. """
+    results = "Data Properties:\n\n"
+    results += "1. Shapiro-Wilk Test for Normality:\n"
+    results += "Where a statistic closer to 1 indicates a normal distribution.\n"
+    results += "Where a p-value less than 0.05 indicates a non-Gaussian distribution.\n\n"
+    for column in data.columns:
+        try:
+            stat, p = stats.shapiro(data[column])
+            results += f"{column}: statistic={stat:.4f}, p-value={p:.4f}\n"
+        except Exception as e:
+            results += f"{column}: {e}\n"
+    results += "\n2. Pearson Correlation Coefficient Matrix:\n"
+    results += "Where a value closer to 1 indicates a strong positive correlation\n"
+    results += "and a value closer to -1 indicates a strong negative correlation.\n"
+    try:
+        pd.set_option('display.max_colwidth', None)
+        results += data.corr().to_string() + "\n"
+    except Exception as e:
+        results += f"{e}\n"
+    results += "\n3. Durbin-Watson Statistic (for each variable):\n"
+    results += "Where a value closer to 2 indicates no autocorrelation.\n"
+    results += "Where a value closer to 0 indicates positive autocorrelation.\n"
+    results += "Where a value closer to 4 indicates negative autocorrelation.\n\n"
+    for column in data.columns:
+        try:
+            results += f"{column}: {durbin_watson(data[column]):.4f}\n"
+        except Exception as e:
+            results += f"{column}: {e}\n"
+    results += "\n4. Augmented Dickey-Fuller Test (for each variable):\n"
+    results += "Where a p-value less than 0.05 indicates a stationary time series.\n\n"
+    for column in data.columns:
+        try:
+            adf = adfuller(data[column])
+            results += f"{column}: ADF Statistic: {adf[0]:.4f}, p-value: {adf[1]:.4f}\n"
+        except Exception as e:
+            results += f"{column}: {e}\n"
+    results += "\n5. Mean, Variance, Skewness, and Kurtosis:\n"
+    for column in data.columns:
+        try:
+            column_data = data[column]
+            results += (
+                f"{column}: Mean: {column_data.mean():.4f}, Variance: {column_data.var():.4f}, "
+                f"Skewness: {column_data.skew():.4f}, Kurtosis: {column_data.kurt():.4f}\n")
+        except Exception as e:
+            results += f"{column}: {e}\n"
+    return results
+
+
+class TestDataProfile:
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=200)
+        self.data = pd.DataFrame({
+            'X1': x,
+            'X2': 2 * x + rng.normal(size=200),
+            'X3': rng.integers(0, 5, size=200),
+            'B': x > 0,
+        })
+        self.profile = DataProfile(self.data)
+
+    def test_report_matches_baseline(self):
+        columns = list(self.data.columns)
+        assert self.profile.report(columns) == baseline_report(self.data)
+
+    def test_report_on_subset_matches_baseline(self):
+        assert self.profile.report(['B', 'X1']) == baseline_report(self.data[['B', 'X1']])
+
+    def test_bool_columns_report_all_moments(self):
+        line = self.profile.moments_line('B')
+        assert line.startswith('B: Mean: ')
+        assert 'Variance' in line and 'Skewness' in line and 'Kurtosis' in line
+
+    def test_results_are_cached(self):
+        first = self.profile.report(['X1', 'X2'])
+        assert self.profile._moments is not None
+        assert self.profile.report(['X1', 'X2']) == first
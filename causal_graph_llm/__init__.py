@@ -13,10 +13,12 @@ from langchain_openai import ChatOpenAI
 
 from .build_causal_digraph import CausalGraphBuilder
 from .causal_relation_llm import CausalDiscoveryAgentLLM
+from .wikipedia_cache import CachedWikipedia
 
 from typing import List, Optional, Any
 import pandas as pd
 from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor
 
 
 class CausalGraphDiscovery(
@@ -53,10 +55,28 @@ class CausalGraphDiscovery(
     component_group=ComponentGroup.CAUSAL_INFERENCE,
     openai_api_key="$LUNARENV::CAUSAL_GRAPH_DISCOVERY_OPENAI_API_KEY",
     model_name="$LUNARENV::CAUSAL_GRAPH_DISCOVERY_MODEL_NAME",
+    pair_batch_size="0",
+    max_workers="1",
+    transitivity_pruning="False",
+    wikipedia_cache_path="",
 ):
     def __init__(self, model: Optional[ComponentModel] = None, **kwargs: Any):
         super().__init__(model=model, configuration=kwargs)
-        self._client = ChatOpenAI(**self.configuration)
+        client_configuration = dict(self.configuration)
+        # pairs asked per batched LLM call (0: an agent run for every pair)
+        self._pair_batch_size = int(client_configuration.pop("pair_batch_size", 0) or 0)
+        # concurrent agent runs for the pairs left
+        self._max_workers = max(1, int(client_configuration.pop("max_workers", 1) or 1))
+        # skip the pairs already implied by the causal paths found
+        self._transitivity_pruning = client_configuration.pop("transitivity_pruning", False) in [True, 1, "True", "1"]
+        # Wikipedia lookups shared across pairs (and across runs, when persisted)
+        self._wikipedia_cache_path = client_configuration.pop("wikipedia_cache_path", "") or None
+        self._client = ChatOpenAI(**client_configuration)
+
+    def _implied_path(self, graph_builder: CausalGraphBuilder, var_1: str, var_2: str):
+        if not self._transitivity_pruning:
+            return None
+        return graph_builder.implied_path(var_1, var_2)
 
     def run(
         self, data_path: str, data_separator: str, context: str, log_file_name: str
@@ -69,23 +89,70 @@ class CausalGraphDiscovery(
 
         # Run the causal discovery
         causal_discovery = CausalDiscoveryAgentLLM(
-            self._client, WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
+            self._client,
+            CachedWikipedia(
+                WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper()),
+                self._wikipedia_cache_path,
+            ),
         )
         result_log = []
         full_log = []
         graph_builder = CausalGraphBuilder()
-        # Look for a->b or b->a for (a,b) in comb(vars, 2)
-        for var_1, var_2 in list(combinations(df.columns, 2)):
-            result = causal_discovery.determine_causal_relationship(
-                var_1, var_2, context
-            )
-            pred = result["prediction"]
-            # save the logs
-            result_log.append(f"{result['agent_output']} -> {pred}")
-            full_log.append(result["full_log"])
+
+        def _record(var_1, var_2, pred, output, log=None):
+            # save the logs (batched answers are logged once per batch)
+            result_log.append(f"{output} -> {pred}")
+            if log:
+                full_log.append(log)
             # update the graph
             graph_builder.update_graph(var_1, var_2, pred)
 
+        def _prune(pairs):
+            pending = []
+            for var_1, var_2 in pairs:
+                path = self._implied_path(graph_builder, var_1, var_2)
+                if path is None:
+                    pending.append((var_1, var_2))
+                else:
+                    implied = '(0,1)' if path[0] == var_1 else '(1,0)'
+                    _record(
+                        var_1, var_2, implied,
+                        f"{var_1}, {var_2}: implied by the causal graph",
+                        f"> {var_1}, {var_2}: implied by {' -> '.join(path)}",
+                    )
+            return pending
+
+        # Look for a->b or b->a for (a,b) in comb(vars, 2)
+        pairs = list(combinations(df.columns, 2))
+
+        # Batched LLM calls first, the pairs it does not know go to the agent
+        if self._pair_batch_size > 0:
+            unresolved = []
+            for start in range(0, len(pairs), self._pair_batch_size):
+                batch = _prune(pairs[start:start + self._pair_batch_size])
+                if not batch:
+                    continue
+                result = causal_discovery.determine_causal_relationships(batch, context)
+                full_log.append(result["full_log"])
+                for var_1, var_2 in batch:
+                    pred = result["predictions"].get((var_1, var_2))
+                    if pred is None:
+                        unresolved.append((var_1, var_2))
+                    else:
+                        _record(var_1, var_2, pred, f"{var_1}, {var_2}: batched LLM answer")
+            pairs = unresolved
+
+        # Agent runs, in waves of at most max_workers concurrent runs
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for start in range(0, len(pairs), self._max_workers):
+                wave = _prune(pairs[start:start + self._max_workers])
+                results = executor.map(
+                    lambda pair: causal_discovery.determine_causal_relationship(*pair, context),
+                    wave,
+                )
+                for (var_1, var_2), result in zip(wave, results):
+                    _record(var_1, var_2, result["prediction"], result["agent_output"], result["full_log"])
+
         # save the log file
         try:
             self._file_connector.delete_file(f"{log_file_name}.txt")
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 import networkx as nx
 
 class CausalGraphBuilder:
@@ -30,6 +32,20 @@ class CausalGraphBuilder:
             self.graph.add_node(var_1)
             self.graph.add_node(var_2)
 
+    def implied_path(self, var_1: str, var_2: str) -> Optional[List[str]]:
+        """
+        Return a path of causal links (weight 1) already in the graph between the
+        variables, from var_1 to var_2 or from var_2 to var_1, None if there is none.
+        """
+        causal = nx.subgraph_view(
+            self.graph, filter_edge=lambda u, v: self.graph[u][v].get('weight') == 1)
+        if var_1 not in causal or var_2 not in causal:
+            return None
+        for source, target in ((var_1, var_2), (var_2, var_1)):
+            if nx.has_path(causal, source, target):
+                return nx.shortest_path(causal, source, target)
+        return None
+
     def get_graph(self) -> any:
         """
         Return the current graph as a JSON serializable object (node-link format).
@@ -3,9 +3,12 @@ from langchain.prompts import StringPromptTemplate
 from langchain.chains import LLMChain
 from langchain.schema import AgentAction, AgentFinish
 from langchain.callbacks.base import BaseCallbackHandler
-from typing import List, Union
+from typing import List, Tuple, Union
+import json
 import re
 
+RELATIONS = ['(0,1)', '(1,0)', '(0,0)', '(-1,-1)']
+
 class LoggingCallback(BaseCallbackHandler):
     def __init__(self):
         self.log = []
@@ -179,4 +182,66 @@ class CausalDiscoveryAgentLLM:
             "agent_output": out,
             "prediction": pred.strip(),
             "full_log": "\n\n".join(callback.log)
-        }
\ No newline at end of file
+        }
+
+    def determine_causal_relationships(self, pairs: List[Tuple[str, str]], context: str) -> dict:
+        '''
+        Ask the LLM (without the Wikipedia agent) for the causal relationship of many
+        pairs of variables in a single call, answered as a JSON object.
+
+        pairs : List[Tuple[str, str]]
+            The (var_1, var_2) pairs of variables' names.
+        context : str
+            The context of the dataset.
+
+        Returns the predictions by pair, leaving out the pairs the LLM did not know
+        (or did not answer), which are left for the agent.
+        '''
+        listed_pairs = "\n".join(
+            f"{index}. {var_1} | {var_2}" for index, (var_1, var_2) in enumerate(pairs))
+        response = self.llm.bind(response_format={"type": "json_object"}).invoke(f'''
+        We assume the following definition of causation:
+        if we change A, B will also change.
+        The relationship does not have to be linear or monotonic.
+        We are interested in all types of causal relationships,
+        including partial and indirect relationships,
+        given that our definition holds.
+
+        With the given context:
+
+        {context}
+
+        For each of the following numbered pairs "A | B":
+
+        {listed_pairs}
+
+        answer (0,1) if A causes B,
+        answer (1,0) if B causes A,
+        answer (0,0) if there is no causal relationship between A and B,
+        answer (-1,-1) if you don't know. Importantly, don't try to
+        make up an answer if you don't know.
+
+        Reply only with a JSON object like:
+        {{"relations": [{{"pair": 0, "relation": "(0,1)"}}, {{"pair": 1, "relation": "(-1,-1)"}}]}}''')
+
+        predictions = {}
+        try:
+            relations = json.loads(response.content)["relations"]
+        except (ValueError, KeyError, TypeError):
+            relations = []
+        for relation in relations:
+            try:
+                index = int(relation["pair"])
+                pred = str(relation["relation"]).replace(" ", "")
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not 0 <= index < len(pairs):
+                continue
+            pair = pairs[index]
+            if pred in RELATIONS and pred != '(-1,-1)':
+                predictions[pair] = pred
+
+        return {
+            "predictions": predictions,
+            "full_log": f"> Batched pairs:\n{listed_pairs}\n> LLM output: {response.content}"
+        }
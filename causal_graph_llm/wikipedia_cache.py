@@ -0,0 +1,80 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterator, Optional
+
+
+class CachedWikipedia:
+    """
+    Memoizing wrapper around a Wikipedia tool (e.g. WikipediaQueryRun), so every
+    pair's agent shares the lookups of the same variable names.
+
+    Results are kept in memory for the run and, when a path is given, in a SQLite
+    file shared across runs. Queries are keyed once normalized (case, quotes,
+    underscores and spaces), as the agents are told to write them.
+    """
+
+    def __init__(self, wiki, path: Optional[str] = None):
+        self.wikipedia = wiki
+        self.path = path
+        self._results = {}
+        self._lock = threading.Lock()
+        self._query_locks = {}
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS wikipedia_lookups (
+                        query TEXT PRIMARY KEY,
+                        result TEXT NOT NULL
+                    )""")
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        query = query.strip().strip('"\'').replace('_', ' ')
+        return re.sub(r'\s+', ' ', query).lower()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """ A connection committed (or rolled back) and closed on exit. """
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            yield connection
+
+    def _load(self, key: str) -> Optional[str]:
+        if not self.path:
+            return None
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT result FROM wikipedia_lookups WHERE query = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _store(self, key: str, result: str):
+        if not self.path:
+            return
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO wikipedia_lookups (query, result) VALUES (?, ?)", (key, result))
+
+    def run(self, query: str) -> str:
+        key = self.normalize(query)
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+            # concurrent agents looking up the same query wait for a single fetch
+            query_lock = self._query_locks.setdefault(key, threading.Lock())
+        with query_lock:
+            with self._lock:
+                if key in self._results:
+                    return self._results[key]
+            result = self._load(key)
+            if result is None:
+                result = self.wikipedia.run(query)
+                self._store(key, result)
+            with self._lock:
+                self._results[key] = result
+                self._query_locks.pop(key, None)
+        return result
@@ -12,6 +12,8 @@ from typing import Optional, Any, Dict
 import pandas as pd
 
 from .causal_inference_llm import CausalInferenceAgentLLM
+from .casual_inference_methods import causalpy_sample_kwargs
+from lunar_data_reduction import read_csv_reduced, pop_data_reduction_settings
 
 
 class CausalInferenceLLM(
@@ -44,10 +46,38 @@ class CausalInferenceLLM(
     component_group=ComponentGroup.CAUSAL_INFERENCE,
     openai_api_key="$LUNARENV::CAUSAL_INFERENCE_OPENAI_API_KEY",
     model_name="$LUNARENV::CAUSAL_INFERENCE_MODEL_NAME",
+    max_rows="0",
+    stratify_by="",
+    read_chunk_size="100000",
+    downcast_dtypes="False",
+    refutation_simulations="0",
+    refutation_processes="1",
+    causalpy_draws="0",
+    causalpy_tune="0",
+    causalpy_chains="0",
+    causalpy_cores="0",
+    causalpy_random_seed="",
+    causalpy_approximation="",
 ):
     def __init__(self, model: Optional[ComponentModel] = None, **kwargs: Any):
         super().__init__(model=model, configuration=kwargs)
-        self._client = ChatOpenAI(**self.configuration)
+        client_configuration = dict(self.configuration)
+        self._data_reduction = pop_data_reduction_settings(client_configuration)
+        # 0: DoWhy's default number of simulations
+        self._refutation_simulations = int(client_configuration.pop("refutation_simulations", 0) or 0) or None
+        self._refutation_processes = int(client_configuration.pop("refutation_processes", 1) or 1)
+        # CausalPy sampler budget, 0 or empty: PyMC's default
+        random_seed = client_configuration.pop("causalpy_random_seed", "")
+        self._causalpy_sample_kwargs = causalpy_sample_kwargs(
+            draws=int(client_configuration.pop("causalpy_draws", 0) or 0) or None,
+            tune=int(client_configuration.pop("causalpy_tune", 0) or 0) or None,
+            chains=int(client_configuration.pop("causalpy_chains", 0) or 0) or None,
+            cores=int(client_configuration.pop("causalpy_cores", 0) or 0) or None,
+            random_seed=int(random_seed) if str(random_seed).strip() else None,
+        )
+        # advi or ols for fast fits while exploring, empty: MCMC
+        self._causalpy_approximation = client_configuration.pop("causalpy_approximation", "") or None
+        self._client = ChatOpenAI(**client_configuration)
 
     def run(
         self,
@@ -58,7 +88,7 @@ class CausalInferenceLLM(
         log_file_name: str,
     ):
         try:
-            df = pd.read_csv(data_path, sep=data_separator)
+            df = read_csv_reduced(data_path, sep=data_separator, **self._data_reduction)
         except Exception as e:
             raise Exception(f"Error getting dataset: {e}")
 
@@ -66,6 +96,10 @@ class CausalInferenceLLM(
             client=self._client,
             data=df,
             bg_knowledge=background_graph,
+            refutation_simulations=self._refutation_simulations,
+            refutation_processes=self._refutation_processes,
+            causalpy_sample_kwargs=self._causalpy_sample_kwargs,
+            causalpy_approximation=self._causalpy_approximation,
         )
 
         result = cdAgent.determine_causal_inference(context=context)
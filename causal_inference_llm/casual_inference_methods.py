@@ -1,9 +1,19 @@
+import copy
+import hashlib
+import json
+import pickle
 import numpy as np
+import pandas as pd
 import networkx as nx
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dowhy import CausalModel
 from dowhy.gcm.falsify import falsify_graph
 import matplotlib.pyplot as plt
 import causalpy as cp
+import pymc as pm
+from sklearn.linear_model import LinearRegression
 
 
 ## Utilities -----------------------------------------------------
@@ -26,6 +36,98 @@ def capture_console_output(func, *args, **kwargs):
         sys.stdout = old_stdout
 
     return output
+
+# Identified estimands by (graph, treatment, outcome, effect modifiers, observed variables)
+MAX_CACHED_ESTIMANDS = 32
+_estimands = OrderedDict()
+
+def _estimand_key(graph, treatment, outcome, effect_modifiers, columns) -> str:
+    return json.dumps({
+        'nodes': sorted(map(str, graph.nodes)) if graph is not None else None,
+        'edges': sorted([str(u), str(v)] for u, v in graph.edges) if graph is not None else None,
+        'treatment': treatment,
+        'outcome': outcome,
+        'effect_modifiers': effect_modifiers,
+        'columns': list(map(str, columns)),
+    }, sort_keys=True, default=str)
+
+def _identify_effect(model, key):
+    # estimating sets the identifier method on the estimand, hand out copies
+    if key in _estimands:
+        _estimands.move_to_end(key)
+        return copy.deepcopy(_estimands[key])
+    identified_estimand = model.identify_effect(proceed_when_unidentifiable=True)
+    _estimands[key] = copy.deepcopy(identified_estimand)
+    if len(_estimands) > MAX_CACHED_ESTIMANDS:
+        _estimands.popitem(last=False)
+    return identified_estimand
+
+## Refutations -----------------------------------------------------
+#   Random Common Cause:
+#     Adds randomly drawn covariates to data and re-runs the analysis
+#     to see if the causal estimate changes or not. If our assumption was
+#     originally correct then the causal estimate shouldn't change by much.
+#   Placebo Treatment Refuter:
+#     Randomly assigns any covariate as a treatment and re-runs the analysis.
+#     If our assumptions were correct then this newly found out estimate
+#     should go to 0.
+#   Data Subset Refuter:
+#     Creates subsets of the data (similar to cross-validation) and checks
+#     whether the causal estimates vary across subsets. If our assumptions
+#     were correct there shouldn't be much variation.
+#   Add Unobserved Common Cause:
+#     This refutation does not return a p-value. Instead, it provides a sensitivity test
+#     on how quickly the estimate changes if the identifying assumptions (used in identify_effect)
+#     are not valid. Specifically, it checks sensitivity to violation of the backdoor assumption:
+#     that all common causes are observed.
+SIMULATED_REFUTERS = ["random_common_cause", "placebo_treatment_refuter", "data_subset_refuter"]
+REFUTERS = SIMULATED_REFUTERS + ["add_unobserved_common_cause"]
+
+def _refute(model, identified_estimand, estimate, method_name, num_simulations=None):
+    try:
+        if method_name == "add_unobserved_common_cause":
+            res_unobserved = model.refute_estimate(identified_estimand, estimate, method_name="add_unobserved_common_cause",
+                                           confounders_effect_on_treatment="binary_flip", confounders_effect_on_outcome="linear",
+                                           effect_strength_on_treatment=[0.001, 0.005, 0.01, 0.02],
+                                           effect_strength_on_outcome=[0.001, 0.005, 0.01,0.02]
+                                           )
+            res_string = f"""
+                {res_unobserved.refutation_type}
+                Estimated effect: {res_unobserved.estimated_effect}
+                New Effect Range (must not include 0): {res_unobserved.new_effect}
+                """
+            return {"Method": method_name, "Results": res_string}
+        kwargs = {"num_simulations": num_simulations} if num_simulations else {}
+        refute_results = model.refute_estimate(identified_estimand, estimate, method_name=method_name, **kwargs)
+        return {"Method": method_name, "Results": str(refute_results)}
+    except Exception as e:
+        return {"Method": method_name, "Results": f"Failed: {str(e)}"}
+
+def run_refuters(model, identified_estimand, estimate, num_simulations=None, processes=1):
+    """
+    Run the DoWhy refuters (independent of each other), in a process pool when
+    processes > 1. num_simulations sets the simulations of the simulated refuters
+    (None for the DoWhy default). Refuter failures are reported per refuter by _refute;
+    the refuters run here when the model cannot be sent to the pool or the pool breaks.
+    """
+    if processes > 1:
+        try:
+            pickle.dumps((model, identified_estimand, estimate))
+        except Exception as e:
+            print(f"Running the refuters sequentially, the model cannot be pickled: {e}")
+        else:
+            try:
+                with ProcessPoolExecutor(max_workers=min(processes, len(REFUTERS))) as executor:
+                    futures = [
+                        executor.submit(_refute, model, identified_estimand, estimate, method_name, num_simulations)
+                        for method_name in REFUTERS]
+                    return [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                print(f"Running the refuters sequentially, the process pool failed: {e}")
+    return [
+        _refute(model, identified_estimand, estimate, method_name, num_simulations)
+        for method_name in REFUTERS]
+
 ## Do-calculus with DoWhy and Refutations
 def dowhy_causal_inference(
     data,
@@ -35,7 +137,9 @@ def dowhy_causal_inference(
     effect_modifiers,
     target_units,
     method,
-    method_params):
+    method_params,
+    num_simulations=None,
+    processes=1):
     """
     Run a causal analysis using the DoWhy library.
     
@@ -56,6 +160,8 @@ def dowhy_causal_inference(
                 - iv.instrumental_variable
                 - iv.regression_discontinuity
         method_params (dict, optional): The parameters for the chosen method.
+        num_simulations (int, optional): Simulations of each simulated refuter (DoWhy default if None).
+        processes (int, optional): Worker processes running the refuters (1: run them in turn).
     
     Returns:
         string of:
@@ -95,7 +201,10 @@ def dowhy_causal_inference(
         #   Thus in this step, by using properties of the causal graph,
         #   we identify the causal effect to be estimated
         
-        identified_estimand = model.identify_effect(proceed_when_unidentifiable=True)
+        #   The identified estimand only depends on the graph and variables, so
+        #   it is reused when only the method changes.
+        identified_estimand = _identify_effect(
+            model, _estimand_key(graph, treatment, outcome, effect_modifiers, data.columns))
     except Exception as e:
         return f"""
             identified_estimand: Error - {e}\n
@@ -121,69 +230,7 @@ def dowhy_causal_inference(
         )
         
         # Refute the results
-        
-        # -------------------------------------------
-        # Random Common Cause:
-        #   Adds randomly drawn covariates to data and re-runs the analysis
-        #   to see if the causal estimate changes or not. If our assumption was
-        #   originally correct then the causal estimate shouldn't change by much.
-        try:
-            refute_results1 = model.refute_estimate(identified_estimand, estimate,
-                                       method_name="random_common_cause")
-            refutes.append({"Method": "random_common_cause", "Results": str(refute_results1)})
-            
-        except Exception as e:
-            refutes.append({"Method": "random_common_cause", "Results": f"Failed: {str(e)}"})
-        # -------------------------------------------
-        
-        # -------------------------------------------
-        # Placebo Treatment Refuter:
-        #   Randomly assigns any covariate as a treatment and re-runs the analysis.
-        #   If our assumptions were correct then this newly found out estimate
-        #   should go to 0.
-        try:
-            refute_results2 = model.refute_estimate(identified_estimand, estimate,
-                                       method_name="placebo_treatment_refuter")
-            refutes.append({"Method": "placebo_treatment_refuter", "Results": str(refute_results2)})
-            
-        except Exception as e:
-            refutes.append({"Method": "placebo_treatment_refuter", "Results": f"Failed: {str(e)}"})
-        # -------------------------------------------
-        
-        # -------------------------------------------
-        # Data Subset Refuter:
-        #   Creates subsets of the data (similar to cross-validation) and checks
-        #   whether the causal estimates vary across subsets. If our assumptions
-        #   were correct there shouldn't be much variation.
-        try:
-            refute_results3=model.refute_estimate(identified_estimand, estimate,
-                                       method_name="data_subset_refuter")
-            refutes.append({"Method": "data_subset_refuter", "Results": str(refute_results3)})
-            
-        except Exception as e:
-            refutes.append({"Method": "data_subset_refuter", "Results": f"Failed: {str(e)}"})
-        
-        # -------------------------------------------
-        # Add Unobserved Common Cause:
-        #   This refutation does not return a p-value. Instead, it provides a sensitivity test
-        #   on how quickly the estimate changes if the identifying assumptions (used in identify_effect)
-        #   are not valid. Specifically, it checks sensitivity to violation of the backdoor assumption:
-        #   that all common causes are observed.
-        try:    
-            res_unobserved = model.refute_estimate(identified_estimand, estimate, method_name="add_unobserved_common_cause",
-                                           confounders_effect_on_treatment="binary_flip", confounders_effect_on_outcome="linear",
-                                           effect_strength_on_treatment=[0.001, 0.005, 0.01, 0.02],
-                                           effect_strength_on_outcome=[0.001, 0.005, 0.01,0.02]
-                                           )
-            res_string = f"""
-                {res_unobserved.refutation_type}
-                Estimated effect: {res_unobserved.estimated_effect}
-                New Effect Range (must not include 0): {res_unobserved.new_effect}
-                """
-            refutes.append({"Method": "add_unobserved_common_cause", "Results": res_string})
-        except Exception as e:
-            refutes.append({"Method": "add_unobserved_common_cause", "Results": f"Failed: {str(e)}"})
-        # -------------------------------------------
+        refutes = run_refuters(model, identified_estimand, estimate, num_simulations, processes)
         
     except Exception as e:
         estimate = f"Error: {e}"
@@ -205,30 +252,117 @@ def dowhy_falsify_dag(graph, data):
     except Exception as e:
         return f'Error while falsifying: {e}'
 
-## Causal Py Methods
+## Causal Py Methods -----------------------------------------------------
+# Approximations for a fast fit while exploring designs:
+#   advi: variational (ADVI) fit of the same PyMC model instead of MCMC sampling.
+#   ols: scikit-learn (OLS) fit of the same design, where CausalPy has one
+#     (synthetic control, diff in diff, regression discontinuity); the other
+#     designs fall back to ADVI (ANCOVA) or MCMC (instrumental variables).
+APPROXIMATIONS = ["advi", "ols"]
+ADVI_ITERATIONS = 10000
+
+def causalpy_sample_kwargs(draws=None, tune=None, chains=None, cores=None, random_seed=None) -> dict:
+    """ pymc.sample arguments for a sampler budget (unset values keep PyMC's defaults). """
+    budget = {'draws': draws, 'tune': tune, 'chains': chains, 'cores': cores, 'random_seed': random_seed}
+    return {name: value for name, value in budget.items() if value is not None}
+
+class _VariationalFit:
+    """ Fits a CausalPy PyMC model with ADVI, drawing `draws` samples from the approximation. """
+    def fit(self, X, y, coords=None):
+        random_seed = self.sample_kwargs.get("random_seed", None)
+        self.build_model(X, y, coords)
+        with self:
+            approximation = pm.fit(
+                n=ADVI_ITERATIONS, method="advi", random_seed=random_seed, progressbar=False)
+            self.idata = approximation.sample(self.sample_kwargs.get("draws", 1000), random_seed=random_seed)
+            self.idata.extend(pm.sample_prior_predictive(random_seed=random_seed))
+            self.idata.extend(
+                pm.sample_posterior_predictive(self.idata, progressbar=False, random_seed=random_seed))
+        return self.idata
+
+class VariationalLinearRegression(_VariationalFit, cp.pymc_models.LinearRegression):
+    pass
+
+class VariationalWeightedSumFitter(_VariationalFit, cp.pymc_models.WeightedSumFitter):
+    pass
+
+def _check_approximation(approximation):
+    if approximation is not None and approximation not in APPROXIMATIONS:
+        raise ValueError(f"Unknown approximation '{approximation}', expected one of {APPROXIMATIONS}")
+
+def _linear_regression(sample_kwargs=None, approximation=None):
+    if approximation is not None:
+        return VariationalLinearRegression(sample_kwargs=sample_kwargs)
+    return cp.pymc_models.LinearRegression(sample_kwargs=sample_kwargs)
+
+def _summary(result, approximation=None) -> str:
+    # the instrumental variable design only prints its coefficients
+    summary = capture_console_output(
+        result.summary if hasattr(result, 'summary') else result.print_coefficients)
+    if approximation is not None:
+        summary = f"(fast {approximation} approximation, re-run without it to confirm)\n" + summary
+    return summary
+
+# Fitted results by (design, formula, data hash, settings): the agent retries
+# the same design, each fit being a full MCMC run
+MAX_CACHED_FITS = 16
+_fits = OrderedDict()
+
+def _data_hash(data: pd.DataFrame) -> str:
+    digest = hashlib.sha256(json.dumps(list(map(str, data.columns))).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _cached_fit(design, formula, data, settings, fit):
+    key = json.dumps({
+        'design': design,
+        'formula': formula,
+        'data': _data_hash(data),
+        'settings': settings,
+    }, sort_keys=True, default=str)
+    if key in _fits:
+        _fits.move_to_end(key)
+        return _fits[key]
+    result = fit()
+    _fits[key] = result
+    if len(_fits) > MAX_CACHED_FITS:
+        _fits.popitem(last=False)
+    return result
+
 # ANCOVA
 def run_causalpy_ancova(
     data,
     outcome,
     pretreatment_variable_name,
     group_variable_name,
-) -> cp.pymc_experiments.PrePostNEGD:
+    sample_kwargs=None,
+    approximation=None,
+) -> dict:
+    _check_approximation(approximation)
     # Prepare the formula
     formula = f"{outcome} ~ 1 + C({group_variable_name}) + {pretreatment_variable_name}"
 
-    # Run ANCOVA
-    result = cp.pymc_experiments.PrePostNEGD(
-        data,
-        formula,
-        group_variable_name,
-        pretreatment_variable_name,
-        model=cp.pymc_models.LinearRegression(),
-    )
-
-    return {
-        'result': result,
-        'summary': capture_console_output(result.summary),
+    def fit():
+        # Run ANCOVA (no OLS design in CausalPy, approximated with ADVI)
+        result = cp.pymc_experiments.PrePostNEGD(
+            data,
+            formula,
+            group_variable_name,
+            pretreatment_variable_name,
+            model=_linear_regression(sample_kwargs, approximation),
+        )
+        return {
+            'result': result,
+            'summary': _summary(result, approximation and 'advi'),
+        }
+
+    settings = {
+        'group_variable_name': group_variable_name,
+        'pretreatment_variable_name': pretreatment_variable_name,
+        'sample_kwargs': sample_kwargs,
+        'approximation': approximation and 'advi',
     }
+    return _cached_fit('ancova', formula, data, settings, fit)
 
 # Synthetic Control
 def run_casualpy_syntheticcontrol(
@@ -236,7 +370,10 @@ def run_casualpy_syntheticcontrol(
     actual,
     intercept,
     treatment_time,
-    covariates) -> cp.pymc_experiments.SyntheticControl:
+    covariates,
+    sample_kwargs=None,
+    approximation=None) -> dict:
+    _check_approximation(approximation)
     
     # Prepare the formula
     if len(covariates) == 0:
@@ -244,19 +381,35 @@ def run_casualpy_syntheticcontrol(
     else:
         formula = f"{actual} ~ {intercept} + {' + '.join(covariates)}"
     print(formula)
-    result = cp.pymc_experiments.SyntheticControl(
-        data,
-        treatment_time,
-        formula=formula,
-        model=cp.pymc_models.WeightedSumFitter(
-            sample_kwargs={"target_accept": 0.95}
-    ),
-    )
-
-    return {
-        'result': result,
-        'summary': capture_console_output(result.summary),
+    sample_kwargs = {"target_accept": 0.95, **(sample_kwargs or {})}
+
+    def fit():
+        if approximation == 'ols':
+            result = cp.skl_experiments.SyntheticControl(
+                data,
+                treatment_time,
+                formula=formula,
+                model=cp.skl_models.WeightedProportion(),
+            )
+        else:
+            model_class = VariationalWeightedSumFitter if approximation else cp.pymc_models.WeightedSumFitter
+            result = cp.pymc_experiments.SyntheticControl(
+                data,
+                treatment_time,
+                formula=formula,
+                model=model_class(sample_kwargs=sample_kwargs),
+            )
+        return {
+            'result': result,
+            'summary': _summary(result, approximation),
+        }
+
+    settings = {
+        'treatment_time': treatment_time,
+        'sample_kwargs': sample_kwargs,
+        'approximation': approximation,
     }
+    return _cached_fit('synthetic_control', formula, data, settings, fit)
 
 # Diff in Diff
 def run_casualpy_differenceindifferences(
@@ -264,22 +417,45 @@ def run_casualpy_differenceindifferences(
     outcome,
     recieved_treatment,
     time_variable_name,
-    group_variable_name) -> cp.pymc_experiments.DifferenceInDifferences:
+    group_variable_name,
+    sample_kwargs=None,
+    approximation=None) -> dict:
+    _check_approximation(approximation)
     # Prepare the formula
     formula = f"{outcome} ~ 1 + {group_variable_name} * {recieved_treatment}"
 
-    did_result = cp.pymc_experiments.DifferenceInDifferences(
-        data,
-        formula,
-        time_variable_name=time_variable_name,
-        group_variable_name=group_variable_name,
-        model=cp.pymc_models.LinearRegression()
-    )
-
-    return {
-        'result': did_result,
-        'summary': capture_console_output(did_result.summary),
+    def fit():
+        if approximation == 'ols':
+            # the group variable is dummy coded, as for the PyMC design
+            did_result = cp.skl_experiments.DifferenceInDifferences(
+                data,
+                formula,
+                time_variable_name=time_variable_name,
+                group_variable_name=group_variable_name,
+                treated=1,
+                untreated=0,
+                model=LinearRegression(fit_intercept=False),
+            )
+        else:
+            did_result = cp.pymc_experiments.DifferenceInDifferences(
+                data,
+                formula,
+                time_variable_name=time_variable_name,
+                group_variable_name=group_variable_name,
+                model=_linear_regression(sample_kwargs, approximation),
+            )
+        return {
+            'result': did_result,
+            'summary': _summary(did_result, approximation),
+        }
+
+    settings = {
+        'time_variable_name': time_variable_name,
+        'group_variable_name': group_variable_name,
+        'sample_kwargs': sample_kwargs,
+        'approximation': approximation,
     }
+    return _cached_fit('difference_in_differences', formula, data, settings, fit)
 
 # Regression Discontinuity
 def run_casualpy_regressiondiscontinuity(
@@ -291,8 +467,11 @@ def run_casualpy_regressiondiscontinuity(
     bandwidth=None,
     use_splines=False,
     spline_df=6,
-    epsilon=0.001
-) -> cp.pymc_experiments.RegressionDiscontinuity:
+    epsilon=0.001,
+    sample_kwargs=None,
+    approximation=None,
+) -> dict:
+    _check_approximation(approximation)
 
     if bandwidth is None:
         bandwidth = np.inf
@@ -305,17 +484,43 @@ def run_casualpy_regressiondiscontinuity(
     else:
         formula = f"{outcome} ~ 1 + {running_variable_name} + {treatment_variable}"
 
-    rd_result = cp.pymc_experiments.RegressionDiscontinuity(
-        data,
-        formula,
-        running_variable_name=running_variable_name,
-        model=cp.pymc_models.LinearRegression(),
-        treatment_threshold=treatment_threshold,
-        bandwidth=bandwidth,
-        epsilon=epsilon,
-    )
+    def fit():
+        if approximation == 'ols':
+            # the scikit-learn design filters the bandwidth on a column named x
+            threshold = float(treatment_threshold)
+            running = data[running_variable_name]
+            rd_result = cp.skl_experiments.RegressionDiscontinuity(
+                data[(running >= threshold - bandwidth) & (running <= threshold + bandwidth)],
+                formula,
+                running_variable_name=running_variable_name,
+                model=LinearRegression(fit_intercept=False),
+                treatment_threshold=treatment_threshold,
+                epsilon=epsilon,
+            )
+        else:
+            rd_result = cp.pymc_experiments.RegressionDiscontinuity(
+                data,
+                formula,
+                running_variable_name=running_variable_name,
+                model=_linear_regression(sample_kwargs, approximation),
+                treatment_threshold=treatment_threshold,
+                bandwidth=bandwidth,
+                epsilon=epsilon,
+            )
+        return {
+            'result': rd_result,
+            'summary': _summary(rd_result, approximation),
+        }
 
-    return rd_result
+    settings = {
+        'running_variable_name': running_variable_name,
+        'treatment_threshold': treatment_threshold,
+        'bandwidth': bandwidth,
+        'epsilon': epsilon,
+        'sample_kwargs': sample_kwargs,
+        'approximation': approximation,
+    }
+    return _cached_fit('regression_discontinuity', formula, data, settings, fit)
 
 # Instrumental Variables Regression
 def run_causalpy_iv(
@@ -323,17 +528,29 @@ def run_causalpy_iv(
     outcome,
     treatment,
     instrument,
-    sample_kwargs=None) -> cp.pymc_experiments.InstrumentalVariable:
+    sample_kwargs=None,
+    approximation=None) -> dict:
+    _check_approximation(approximation)
 
     formula = f"{outcome} ~ 1 + {treatment}"
     instruments_formula = f"{treatment} ~ 1 + {instrument}"
 
-    iv_result = cp.pymc_experiments.InstrumentalVariable(
-        instruments_data=data[[treatment, instrument]],
-        data=data[[outcome, treatment]],
-        instruments_formula=instruments_formula,
-        formula=formula,
-        model=cp.pymc_models.InstrumentalVariableRegression(sample_kwargs=sample_kwargs),
-    )
+    def fit():
+        # no approximation of the IV model, sampled with MCMC within the sampler budget
+        iv_result = cp.pymc_experiments.InstrumentalVariable(
+            instruments_data=data[[treatment, instrument]],
+            data=data[[outcome, treatment]],
+            instruments_formula=instruments_formula,
+            formula=formula,
+            model=cp.pymc_models.InstrumentalVariableRegression(sample_kwargs=sample_kwargs),
+        )
+        return {
+            'result': iv_result,
+            'summary': _summary(iv_result),
+        }
 
-    return iv_result
\ No newline at end of file
+    settings = {
+        'instruments_formula': instruments_formula,
+        'sample_kwargs': sample_kwargs,
+    }
+    return _cached_fit('instrumental_variable', formula, data[[outcome, treatment, instrument]], settings, fit)
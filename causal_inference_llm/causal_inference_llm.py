@@ -37,10 +37,24 @@ class LoggingCallback(BaseCallbackHandler):
         self.log.append(f"\t> Agent finished with output: {finish.return_values['output']}\n")
 
 class CausalInferenceAgentLLM:
-    def __init__(self, client, data, bg_knowledge):
+    def __init__(
+        self,
+        client,
+        data,
+        bg_knowledge,
+        refutation_simulations=None,
+        refutation_processes=1,
+        causalpy_sample_kwargs=None,
+        causalpy_approximation=None):
         self.llm = client
         self.background_knowledge = bg_knowledge
         self.data = data
+        # DoWhy refuters: simulations (None: DoWhy default) and worker processes
+        self.refutation_simulations = refutation_simulations
+        self.refutation_processes = refutation_processes
+        # CausalPy fits: pymc.sample budget and fast approximation (None: MCMC)
+        self.causalpy_sample_kwargs = causalpy_sample_kwargs
+        self.causalpy_approximation = causalpy_approximation
         self.dci_res = []
         self.cpy_res = []
         self.tools = [
@@ -211,7 +225,9 @@ class CausalInferenceAgentLLM:
                 graph = None
             else:
                 graph = self.background_knowledge
-            dci = dowhy_causal_inference(self.data, treatment_var, outcome_var, graph, effect_vars, target_units, method, method_params)
+            dci = dowhy_causal_inference(
+                self.data, treatment_var, outcome_var, graph, effect_vars, target_units, method, method_params,
+                num_simulations=self.refutation_simulations, processes=self.refutation_processes)
             self.dci_res.append(dci)
             return dci
         except Exception as e:
@@ -220,13 +236,19 @@ class CausalInferenceAgentLLM:
         dfalsify = dowhy_falsify_dag(self.background_knowledge, self.data)
         self.dci_res.append(f"Falsify DAG results: \n{dfalsify}")
         return dfalsify
+    def _causalpy_settings(self) -> dict:
+        return {
+            'sample_kwargs': self.causalpy_sample_kwargs,
+            'approximation': self.causalpy_approximation,
+        }
     def _cp_ancova(self, input_str):
         try:
             post,pre,group = input_str.split(',')
         except Exception as e:
             return f"Error while parsing the input {e}"
         try:
-            ancova_res = run_causalpy_ancova(self.data, post, pre, group)
+            ancova_res = run_causalpy_ancova(
+                self.data, post, pre, group, **self._causalpy_settings())
             complete_res = ancova_res['result']
             summary = ancova_res['summary']
             fig, _ = complete_res.plot()
@@ -251,7 +273,8 @@ class CausalInferenceAgentLLM:
                 actual,
                 intercept,
                 tretment_time,
-                covariates)
+                covariates,
+                **self._causalpy_settings())
             complete_res = synth_res['result']
             summary = synth_res['summary']
             _, _ = complete_res.plot()
@@ -272,7 +295,8 @@ class CausalInferenceAgentLLM:
                 outcome,
                 treatment,
                 time,
-                group
+                group,
+                **self._causalpy_settings()
                 )
             complete_res = diff_res['result']
             summary = diff_res['summary']
@@ -320,7 +344,8 @@ class CausalInferenceAgentLLM:
                 bandwidth,
                 splines,
                 num_splines,
-                epsilon
+                epsilon,
+                **self._causalpy_settings()
                 )
             complete_res = reg_res['result']
             summary = reg_res['summary']
@@ -344,16 +369,18 @@ class CausalInferenceAgentLLM:
                 self.data,
                 outcome,
                 treatment,
-                instrument
+                instrument,
+                **self._causalpy_settings()
                 )
             complete_res = iv_res['result']
             summary = iv_res['summary']
-            fig, _ = complete_res.plot()
-            plt.title = "Instrumental Variables - " + outcome + " with " + treatment + " and " + instrument
-            # add title
-            fig.suptitle(plt.title, fontsize=16)
-            plt.savefig("IV_plot.png")
-            plt.close()
+            if hasattr(complete_res, 'plot'):
+                fig, _ = complete_res.plot()
+                plt.title = "Instrumental Variables - " + outcome + " with " + treatment + " and " + instrument
+                # add title
+                fig.suptitle(plt.title, fontsize=16)
+                plt.savefig("IV_plot.png")
+                plt.close()
             self.cpy_res.append(f"Instrumental Variables results: \n\t{summary}\n")
             return f"Instrumental Variables results: \n\t{summary}"
         except Exception as e:
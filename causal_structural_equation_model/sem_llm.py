@@ -3,9 +3,11 @@ from langchain.prompts import StringPromptTemplate
 from langchain import LLMChain
 from langchain.schema import AgentAction, AgentFinish
 from langchain.callbacks.base import BaseCallbackHandler
+from collections import OrderedDict
 from typing import List, Union
 from semopy import Model, calc_stats
 import pandas as pd
+import hashlib
 import re
 
 class LoggingCallback(BaseCallbackHandler):
@@ -39,11 +41,15 @@ class LoggingCallback(BaseCallbackHandler):
 ###################################################################################
 
 class SEMEnvironment:
+    # fitted models kept for descriptions the agent comes back to (e.g. rollbacks)
+    MAX_CACHED_FITS = 64
+
     def __init__(self, initial_model: str, data: pd.DataFrame):
         self.current_model = initial_model
         self.rollback_model = initial_model
         self.data = data
         self.fitted_model = None
+        self._fits = OrderedDict()
         self.fit_model()
 
     def add_latent_variable(self, latent_var: str, indicators: List[str]) -> str:
@@ -58,12 +64,54 @@ class SEMEnvironment:
         self.current_model = self.current_model + "\n"+ "# new covariance\n" + new_line
         return f"Added covariance between {var1} and {var2}"
 
+    @staticmethod
+    def _description_hash(description: str, obj: str, solver: str) -> str:
+        # comments, spacing and the order of the statements do not change the model
+        lines = sorted(filter(None, (
+            re.sub(r'\s+', ' ', line.split('#')[0]).strip() for line in description.splitlines())))
+        return hashlib.sha256("\n".join([obj, solver, *lines]).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _parameter_key(mod: Model, param) -> tuple:
+        # (matrix, lval, rval) of a parameter, stable across models (semopy names are not)
+        loc = param.locations[0]
+        n = next(i for i in range(len(mod.matrices)) if mod.matrices[i] is loc.matrix)
+        rows, cols = mod.names[n]
+        return n, rows[loc.indices[0]], cols[loc.indices[1]]
+
+    def _estimates(self, mod: Model) -> dict:
+        active = [param for param in mod.parameters.values() if param.active]
+        return {
+            self._parameter_key(mod, param): value
+            for param, value in zip(active, mod.param_vals)}
+
+    def _warm_start(self, mod: Model):
+        # start from the estimates of the last fit for the parameters both models share
+        if self.fitted_model is None:
+            return
+        try:
+            estimates = self._estimates(self.fitted_model)
+            for param in mod.parameters.values():
+                if param.active and param.start is None:
+                    param.start = estimates.get(self._parameter_key(mod, param))
+        except Exception:
+            pass
+
     def fit_model(self, obj='MLW', solver='SLSQP') -> str:
         try:
+            key = self._description_hash(self.current_model, obj, solver)
+            if key in self._fits:
+                self._fits.move_to_end(key)
+                self.fitted_model = self._fits[key]
+                return 'Model fitted successfully (same model as a previous fit). \n'
             mod = Model(description=self.current_model)
+            self._warm_start(mod)
             mod.fit(self.data, obj=obj, solver=solver)
             self.fitted_model = mod
             res_df : pd.DataFrame = mod.inspect()
+            self._fits[key] = mod
+            if len(self._fits) > self.MAX_CACHED_FITS:
+                self._fits.popitem(last=False)
             return 'Model fitted successfully. \n'
         except Exception as e:
             self.current_model = self.rollback_model
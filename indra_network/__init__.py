@@ -2,7 +2,7 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import Optional, Any
+from typing import Optional, Any, List
 
 from lunarcore.core.typings.components import ComponentGroup
 from lunarcore.core.data_models import ComponentInput, ComponentModel
@@ -19,6 +19,11 @@ class IndraNetwork(
     component_group=ComponentGroup.BIOMEDICAL,
     max_papers_per_gene=3,
     elsevier_api_key="$LUNARENV::ELSEVIER_API_KEY",
+    full_text_workers=4,
+    max_retries=3,
+    reach_workers=4,
+    reach_chunk_size=5000,
+    preassembly_batch_size=2000,
     output_properties=""
 ):
     def __init__(self, model: Optional[ComponentModel] = None, **kwargs):
@@ -37,6 +42,11 @@ class IndraNetwork(
             genes,
             max_papers_per_gene=int(self.configuration["max_papers_per_gene"]),
             elsevier_api_key=self.configuration["elsevier_api_key"],
+            full_text_workers=int(self.configuration["full_text_workers"]),
+            max_retries=int(self.configuration["max_retries"]),
+            reach_workers=int(self.configuration["reach_workers"]),
+            reach_chunk_size=int(self.configuration["reach_chunk_size"]),
+            preassembly_batch_size=int(self.configuration["preassembly_batch_size"]),
         )
 
         result = dict()
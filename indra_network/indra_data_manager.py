@@ -3,13 +3,18 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import os
+import re
+import hashlib
 import requests
 import sqlite3
 import json
+import threading
 import networkx as nx
-from typing import List, Set, Dict
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Set, Dict, Optional, Tuple
+from time import sleep, monotonic
 from random import random
+from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from xml.etree.ElementTree import ParseError
 from indra import literature
@@ -17,28 +22,231 @@ from indra.literature.elsevier_client import extract_text
 from indra.tools.gene_network import GeneNetwork
 from indra.statements import Modification, RegulateActivity
 from indra.statements.statements import Statement, stmts_from_json, stmts_to_json
+from indra.preassembler import Preassembler
+from indra.ontology.bio import bio_ontology
 from indra.assemblers.indranet import IndraNetAssembler, IndraNet
 from tqdm import tqdm
 from indra.assemblers.sbgn.assembler import SBGNAssembler, states
 from indra.assemblers.cyjs.assembler import CyJSAssembler
 
 
+# Network errors worth retrying (malformed XML usually comes from a throttled response)
+RETRY_ERRORS = (requests.RequestException, ParseError)
+
+
+def with_retries(func, *args, retries: int = 3, backoff: float = 1.0, **kwargs):
+    """ Call `func`, retrying on network errors with exponential backoff and jitter. """
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except RETRY_ERRORS:
+            if attempt == retries:
+                raise
+            sleep(backoff * 2 ** attempt * (1 + random()))
+
+
+class HostRateLimiter:
+    """
+    Spaces out the requests made to each host, shared by every worker thread.
+    Hosts match a configured rate when they are, or end with, its key.
+    """
+
+    def __init__(self, requests_per_second: Dict[str, float], default: float = 5.0):
+        self.requests_per_second = requests_per_second
+        self.default = default
+        self._next_slot: Dict[str, float] = dict()
+        self._lock = threading.Lock()
+
+    def _rate(self, host: str) -> Tuple[str, float]:
+        for key, rate in self.requests_per_second.items():
+            if host == key or host.endswith("." + key):
+                return key, rate
+        return host, self.default
+
+    def wait(self, url: str, count: int = 1):
+        """
+        Block until a request to the host of `url` (or a bare host) may be sent,
+        reserving the budget of `count` requests to that host.
+        """
+        key, rate = self._rate(urlparse(url).netloc or url)
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot.get(key, now))
+            self._next_slot[key] = slot + count / rate
+        if slot > now:
+            sleep(slot - now)
+
+
+class PMCacheWriter:
+    """
+    Buffers the PubMed cache writes and flushes them in batched transactions
+    (upserts of the changed columns only), shared by every worker thread.
+    Buffered records are visible through `pending` until they are flushed.
+    """
+
+    COLUMNS = ("content", "content_type", "pm_statements")
+    # columns holding JSON
+    JSON_COLUMNS = ("pm_statements",)
+
+    def __init__(self, connection: sqlite3.Connection, batch_size: int = 100):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.lock = threading.RLock()
+        self._records: Dict[str, dict] = dict()
+        self._excluded: Dict[str, None] = dict()
+        self._failures: Dict[str, int] = dict()
+        self._chunks: Dict[Tuple[str, str], list] = dict()
+        self._read: Dict[str, None] = dict()
+        self._preassembled: Dict[str, list] = dict()
+
+    def _buffered(self) -> int:
+        return (
+            len(self._records) + len(self._excluded) + len(self._failures) + len(self._chunks)
+            + len(self._read) + len(self._preassembled)
+        )
+
+    def set(self, pmid: str, data: dict):
+        unknown = set(data) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown PubMed cache fields: {sorted(unknown)}")
+        with self.lock:
+            self._records.setdefault(pmid, dict()).update(data)
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def exclude(self, pmid: str):
+        with self.lock:
+            self._excluded[pmid] = None
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def set_failures(self, pmid: str, failures: int):
+        """ Number of runs in which no content was returned for a paper. """
+        with self.lock:
+            self._failures[pmid] = failures
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def set_chunk(self, pmid: str, chunk: str, statements: list):
+        """ Statements read from one chunk of a paper, kept until the paper is fully read. """
+        with self.lock:
+            self._chunks[(pmid, chunk)] = statements
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def clear_chunks(self, pmid: str):
+        """ Drop the chunks of a paper once its merged statements are cached. """
+        with self.lock:
+            self._read[pmid] = None
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def set_preassembled(self, statements_hash: str, statements: list):
+        with self.lock:
+            self._preassembled[statements_hash] = statements
+            if self._buffered() >= self.batch_size:
+                self.flush()
+
+    def pending(self, pmid: str) -> dict:
+        with self.lock:
+            return dict(self._records.get(pmid, dict()))
+
+    def flush(self):
+        with self.lock:
+            if not self._buffered():
+                return
+            # one upsert per set of changed columns
+            batches: Dict[tuple, list] = dict()
+            for pmid, data in self._records.items():
+                columns = tuple(column for column in self.COLUMNS if column in data)
+                batches.setdefault(columns, list()).append(
+                    (pmid,) + tuple(
+                        json.dumps(data[column]) if column in self.JSON_COLUMNS else data[column]
+                        for column in columns
+                    )
+                )
+            with self.connection:
+                for columns, rows in batches.items():
+                    self.connection.executemany(
+                        f"insert into pm_cache (pmid, {', '.join(columns)}) "
+                        f"values (?, {', '.join('?' for _ in columns)}) "
+                        f"on conflict(pmid) do update set "
+                        f"{', '.join(f'{column} = excluded.{column}' for column in columns)}",
+                        rows,
+                    )
+                self.connection.executemany(
+                    "insert into pm_exclude (pmid) select ? "
+                    "where not exists (select 1 from pm_exclude where pmid = ?)",
+                    [(pmid, pmid) for pmid in self._excluded],
+                )
+                self.connection.executemany(
+                    "insert into full_text_failures (pmid, failures) values (?, ?) "
+                    "on conflict(pmid) do update set failures = excluded.failures",
+                    list(self._failures.items()),
+                )
+                self.connection.executemany(
+                    "insert into reach_chunks (pmid, chunk, statements) values (?, ?, ?) "
+                    "on conflict(pmid, chunk) do update set statements = excluded.statements",
+                    [(pmid, chunk, json.dumps(statements)) for (pmid, chunk), statements in self._chunks.items()],
+                )
+                self.connection.executemany(
+                    "delete from reach_chunks where pmid = ?", [(pmid,) for pmid in self._read]
+                )
+                self.connection.executemany(
+                    "insert into preassembly_cache (statements_hash, statements) values (?, ?) "
+                    "on conflict(statements_hash) do update set statements = excluded.statements",
+                    [(key, json.dumps(statements)) for key, statements in self._preassembled.items()],
+                )
+            self._records.clear()
+            self._excluded.clear()
+            self._failures.clear()
+            self._chunks.clear()
+            self._read.clear()
+            self._preassembled.clear()
+
+
 class IndraDataManager:
     REACH_API_URL = "http://api.indra.bio:8000/reach/process_text"
     ASSEMBLER_API_URL = "http://api.indra.bio:8000/assemblers/english"
     PREASSEMBLY_API_URL = "http://api.indra.bio:8000/preassembly"
+    # Keep only the top level (most specific) statements, on the server and when merging batches
+    PREASSEMBLY_RETURN_TOPLEVEL = True
 
     PM_CACHE_PATH = "/tmp/pm_cache.db"
     PM_CACHE = None
+    PM_CACHE_WRITER = None
+    PM_CACHE_BATCH_SIZE = 100
 
+    # Seconds to wait for REACH to read a chunk
+    REACH_TIMEOUT = 600
+
+    # PMIDs known to be cached or excluded, looked up in the cache as they are
+    # requested (see `load_pmid_membership`) rather than loaded at start-up
     PMIDS = set()
     PMIDS_EXCLUDE = set()
+    # PMIDs per IN lookup, under SQLite's limit of bound parameters
+    PMID_LOOKUP_BATCH_SIZE = 500
+
+    # Requests per second per host, NCBI allows 3 without an API key.
+    # A full text fetch makes up to 3 NCBI requests (ID conversion, PMC, then
+    # the PubMed abstract), so each paper reserves the budget of all of them.
+    NCBI_HOST = "ncbi.nlm.nih.gov"
+    NCBI_REQUESTS_PER_PAPER = 3
+    # indra returns no content both when its requests fail and when a paper has no
+    # text, so a paper is only excluded after that many runs without content
+    FULL_TEXT_MAX_FAILURES = 3
+    RATE_LIMITER = HostRateLimiter({NCBI_HOST: 3.0, "api.elsevier.com": 5.0, "api.indra.bio": 5.0})
 
     def __init__(
         self,
         genes: List[str],
         max_papers_per_gene: int = 0,
         elsevier_api_key: str = "",
+        full_text_workers: int = 4,
+        max_retries: int = 3,
+        reach_workers: int = 4,
+        reach_chunk_size: int = 5000,
+        preassembly_batch_size: int = 2000,
     ):
         self.__class__.init()
 
@@ -46,7 +254,8 @@ class IndraDataManager:
         self._gene_doc_map: Dict[str, Set[str]] = dict()
         self._papers: Dict[str, str] = dict()
         self._pm_statements: Dict[str, dict] = dict()
-        self._gn_statements: List[Statement] = list()
+        # JSON statements, like the PubMed statements they are batched with
+        self._gn_statements: List[dict] = list()
         self._all_statements: List[Statement] = list()
         self._assembled_statements: Dict[str, str] = dict()
         self._pm_mem = dict()
@@ -54,66 +263,171 @@ class IndraDataManager:
         self._cyjs_model = None
         self.max_papers_per_gene: int = max_papers_per_gene
         self.elsevier_api_key = elsevier_api_key
+        self.full_text_workers: int = max(1, full_text_workers)
+        self.max_retries: int = max_retries
+        self.reach_workers: int = max(1, reach_workers)
+        self.reach_chunk_size: int = reach_chunk_size
+        self.preassembly_batch_size: int = preassembly_batch_size
 
         if elsevier_api_key:
             os.environ["ELSEVIER_API_KEY"] = elsevier_api_key
 
     @classmethod
     def init(cls):
-        cache_new = os.path.exists(cls.PM_CACHE_PATH)
-        cls.PM_CACHE = sqlite3.connect(cls.PM_CACHE_PATH)
+        if cls.PM_CACHE is None:
+            cls.PM_CACHE = sqlite3.connect(cls.PM_CACHE_PATH, timeout=30, check_same_thread=False)
+            cls.PM_CACHE_WRITER = PMCacheWriter(cls.PM_CACHE, cls.PM_CACHE_BATCH_SIZE)
 
         cur = cls.PM_CACHE.cursor()
-        if not cache_new:
-            cur.execute("create table if not exists pm_cache (pmid varchar, data json)")
-            cur.execute("create table if not exists pm_exclude (pmid varchar)")
-            cur.execute("create unique index if not exists idx_pmid on pm_cache(pmid)")
-
-        cur.execute("select pmid from pm_cache")
-        cls.PMIDS.update([row[0] for row in cur.fetchall()])
-        cur.execute("select pmid from pm_exclude")
-        cls.PMIDS_EXCLUDE.update([row[0] for row in cur.fetchall()])
+        cur.execute("pragma journal_mode=wal")
+        cur.execute("pragma synchronous=normal")
+        # data holds the JSON records of caches written before the separate columns
+        cur.execute("create table if not exists pm_cache (pmid varchar, data json)")
+        cur.execute("create table if not exists pm_exclude (pmid varchar)")
+        cur.execute("create unique index if not exists idx_pmid on pm_cache(pmid)")
+        cur.execute("create index if not exists idx_exclude_pmid on pm_exclude(pmid)")
+        # statements of the chunks read so far of papers not fully read
+        cur.execute(
+            "create table if not exists reach_chunks "
+            "(pmid varchar, chunk varchar, statements json, primary key (pmid, chunk))"
+        )
+        # runs in which no content was returned for a paper not excluded yet
+        cur.execute("create table if not exists full_text_failures (pmid varchar primary key, failures integer)")
+        # preassembled statements by the hash of the statement set sent
+        cur.execute(
+            "create table if not exists preassembly_cache (statements_hash varchar primary key, statements json)"
+        )
+        columns = {row[1] for row in cur.execute("pragma table_info(pm_cache)").fetchall()}
+        for column, column_type in (("content", "text"), ("content_type", "varchar"), ("pm_statements", "json")):
+            if column not in columns:
+                cur.execute(f"alter table pm_cache add column {column} {column_type}")
+        cls.PM_CACHE.commit()
         cur.close()
 
+    @classmethod
+    def _pmid_batches(cls, pmids: List[str]) -> List[List[str]]:
+        size = cls.PMID_LOOKUP_BATCH_SIZE
+        return [pmids[i:i + size] for i in range(0, len(pmids), size)]
+
+    @classmethod
+    def load_pmid_membership(cls, pmids: List[str]):
+        """ Add the PMIDs cached or excluded among `pmids` (not known yet) to PMIDS and PMIDS_EXCLUDE. """
+        unknown = [
+            str(pmid) for pmid in dict.fromkeys(pmids)
+            if pmid not in cls.PMIDS and pmid not in cls.PMIDS_EXCLUDE
+        ]
+        with cls.PM_CACHE_WRITER.lock:
+            cls.PM_CACHE_WRITER.flush()
+            cur = cls.PM_CACHE.cursor()
+            for batch in cls._pmid_batches(unknown):
+                placeholders = ",".join("?" for _ in batch)
+                cur.execute(f"select pmid from pm_cache where pmid in ({placeholders})", batch)
+                cls.PMIDS.update(row[0] for row in cur.fetchall())
+                cur.execute(f"select distinct pmid from pm_exclude where pmid in ({placeholders})", batch)
+                cls.PMIDS_EXCLUDE.update(row[0] for row in cur.fetchall())
+            cur.close()
+
+    @classmethod
+    def fetch_full_text_failures(cls, pmids: List[str]) -> Dict[str, int]:
+        """ Runs in which no content was returned, for the papers among `pmids` that had any. """
+        failures: Dict[str, int] = dict()
+        with cls.PM_CACHE_WRITER.lock:
+            cls.PM_CACHE_WRITER.flush()
+            cur = cls.PM_CACHE.cursor()
+            for batch in cls._pmid_batches([str(pmid) for pmid in pmids]):
+                cur.execute(
+                    f"select pmid, failures from full_text_failures where pmid in ({','.join('?' for _ in batch)})",
+                    batch,
+                )
+                failures.update(cur.fetchall())
+            cur.close()
+        return failures
+
+    @classmethod
+    def fetch_reach_chunks(cls, pmids: List[str]) -> Dict[str, Dict[str, list]]:
+        """ Statements of the chunks already read of the (not fully read) papers `pmids`. """
+        chunks: Dict[str, Dict[str, list]] = dict()
+        with cls.PM_CACHE_WRITER.lock:
+            cls.PM_CACHE_WRITER.flush()
+            cur = cls.PM_CACHE.cursor()
+            for batch in cls._pmid_batches([str(pmid) for pmid in pmids]):
+                cur.execute(
+                    f"select pmid, chunk, statements from reach_chunks where pmid in ({','.join('?' for _ in batch)})",
+                    batch,
+                )
+                for pmid, chunk, statements in cur.fetchall():
+                    chunks.setdefault(pmid, dict())[chunk] = json.loads(statements)
+            cur.close()
+        return chunks
+
+    @classmethod
+    def fetch_preassembled(cls, statements_hash: str) -> Optional[list]:
+        with cls.PM_CACHE_WRITER.lock:
+            cls.PM_CACHE_WRITER.flush()
+            cur = cls.PM_CACHE.cursor()
+            row = cur.execute(
+                "select statements from preassembly_cache where statements_hash = ?", (statements_hash,)
+            ).fetchone()
+            cur.close()
+        return json.loads(row[0]) if row else None
+
+    PM_CACHE_SELECT = "select pmid, data, content, content_type, pm_statements from pm_cache"
+
+    @staticmethod
+    def _pm_cache_record(data, content, content_type, pm_statements) -> dict:
+        pm_data = json.loads(data) if data else dict()
+        if content is not None:
+            pm_data["content"] = content
+        if content_type is not None:
+            pm_data["content_type"] = content_type
+        if pm_statements is not None:
+            pm_data["pm_statements"] = json.loads(pm_statements)
+        return pm_data
+
     @staticmethod
     def fetch_pm_cache(pmid: str) -> dict:
-        cur = IndraDataManager.PM_CACHE.cursor()
-        pm_data = cur.execute(
-            "select data from pm_cache where pmid = ?", (pmid,)
-        ).fetchone()
-        cur.close()
-        return json.loads(pm_data[0])
+        writer = IndraDataManager.PM_CACHE_WRITER
+        with writer.lock:
+            cur = IndraDataManager.PM_CACHE.cursor()
+            pm_data = cur.execute(
+                f"{IndraDataManager.PM_CACHE_SELECT} where pmid = ?", (pmid,)
+            ).fetchone()
+            cur.close()
+            pending = writer.pending(pmid)
+        return (IndraDataManager._pm_cache_record(*pm_data[1:]) if pm_data else dict()) | pending
 
     @staticmethod
     def set_pm_cache(pmid: str, data: dict):
-        cur = IndraDataManager.PM_CACHE.cursor()
-        pm_data = cur.execute(
-            "select data from pm_cache where pmid = ?", (pmid,)
-        ).fetchone()
-        if pm_data:
-            data = json.loads(pm_data[0]) | data
-            cur.execute(
-                "update pm_cache set data = ? where pmid = ?", (json.dumps(data), pmid)
-            )
-        else:
-            cur.execute("insert into pm_cache values (?, ?)", (pmid, json.dumps(data)))
-        cur.close()
-        IndraDataManager.PM_CACHE.commit()
+        IndraDataManager.PM_CACHE_WRITER.set(pmid, data)
 
     @staticmethod
     def set_pm_exlude(pmid: str):
-        cur = IndraDataManager.PM_CACHE.cursor()
-        cur.execute("insert into pm_exclude values (?)", (pmid,))
-        cur.close()
-        IndraDataManager.PM_CACHE.commit()
+        IndraDataManager.PM_CACHE_WRITER.exclude(pmid)
         IndraDataManager.PMIDS_EXCLUDE.add(pmid)
 
     @staticmethod
-    def call_reach_process_text(text: str, offline: bool = False) -> Dict[str, dict]:
+    def flush_pm_cache():
+        IndraDataManager.PM_CACHE_WRITER.flush()
+
+    @staticmethod
+    def call_reach_process_text(text: str, offline: bool = False, retries: int = 3) -> Optional[List[dict]]:
         params = {"text": text, "offline": offline, "url": None}
 
-        sleep(random())
-        response = requests.post(IndraDataManager.REACH_API_URL, json=params)
+        def _post():
+            IndraDataManager.RATE_LIMITER.wait(IndraDataManager.REACH_API_URL)
+            response = requests.post(
+                IndraDataManager.REACH_API_URL, json=params, timeout=IndraDataManager.REACH_TIMEOUT
+            )
+            if response.status_code == 429 or response.status_code >= 500:
+                # overloaded, retried
+                response.raise_for_status()
+            return response
+
+        try:
+            response = with_retries(_post, retries=retries)
+        except RETRY_ERRORS as e:
+            print(f"Request failed: {e}")
+            return None
         result = (
             response.json()["statements"] if (response.status_code == 200) else None
         )
@@ -126,7 +440,37 @@ class IndraDataManager:
         return result
 
     @staticmethod
-    def call_preassembly_statements(statements: List[Statement]) -> List[Statement]:
+    def split_paragraphs(text: str, max_chars: int) -> List[str]:
+        """
+        Split a paper in chunks of whole paragraphs of up to `max_chars` characters
+        (a longer paragraph is a chunk of its own), the whole text if `max_chars` <= 0.
+        """
+        if max_chars <= 0:
+            return [text]
+        chunks = list()
+        current = ""
+        for paragraph in re.split(r"\n+", text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + 1 + len(paragraph) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def chunk_key(chunk: str) -> str:
+        return hashlib.sha1(chunk.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def call_preassembly_statements(statements: List[Statement], strict: bool = False) -> List[Statement]:
+        """
+        Ground, map sequences and preassemble statements with the INDRA API. A
+        failed step is skipped, or raises an exception if `strict`.
+        """
         params = {
             "statements": [stt.to_json() for stt in statements],
             "grounding_map": {},
@@ -147,6 +491,8 @@ class IndraDataManager:
         )
 
         if grounded_statements is None:
+            if strict:
+                raise Exception(f"Grounding request failed with status code {grounding_response.status_code}")
             print(
                 f"Grounding request failed with status code {grounding_response.status_code}"
             )
@@ -164,13 +510,18 @@ class IndraDataManager:
         )
 
         if sequenced_statements is None:
+            if strict:
+                raise Exception(f"Sequence request failed with status code {sequence_response.status_code}")
             print(
                 f"Sequence request failed with status code {sequence_response.status_code}"
             )
             print(f"Response text: {sequence_response.text}")
             sequenced_statements = grounded_statements
 
-        params.update({"statements": sequenced_statements})
+        params.update({
+            "statements": sequenced_statements,
+            "return_toplevel": IndraDataManager.PREASSEMBLY_RETURN_TOPLEVEL,
+        })
         preassembly_response = requests.post(
             f"{IndraDataManager.PREASSEMBLY_API_URL}/run_preassembly", json=params
         )
@@ -181,6 +532,8 @@ class IndraDataManager:
         )
 
         if preassembled_statements is None:
+            if strict:
+                raise Exception(f"Preassembly request failed with status code {preassembly_response.status_code}")
             print(
                 f"Preassembly request failed with status code {preassembly_response.status_code}"
             )
@@ -231,64 +584,180 @@ class IndraDataManager:
 
         return sorted(pmids)
 
+    @staticmethod
+    def fetch_full_text(pmid: str, retries: int = 3) -> Tuple[Optional[str], Optional[str]]:
+        """ Content and content type of a paper (full text or abstract), rate limited and retried. """
+        def _fetch():
+            IndraDataManager.RATE_LIMITER.wait(
+                IndraDataManager.NCBI_HOST, IndraDataManager.NCBI_REQUESTS_PER_PAPER
+            )
+            return literature.get_full_text(pmid, "pmid")
+
+        return with_retries(_fetch, retries=retries)
+
+    @staticmethod
+    def extract_paper_text(content: Optional[str], content_type: Optional[str]) -> Optional[str]:
+        if content_type == "abstract":
+            return content
+        elif content_type == "pmc_oa_xml":
+            if content.startswith("<?xml"):
+                soup = BeautifulSoup(content, features="xml")
+                body = soup.find_all("body")
+                return body[0].text if body else ""
+            return content
+        elif content_type == "elsevier_xml" and os.environ.get(
+            "ELSEVIER_API_KEY", ""
+        ):
+            try:
+                return extract_text(content)
+            except ParseError:
+                return ""
+        return content
+
+    def _add_paper(self, paper_contents: Dict[str, str], pmid: str, content: str, content_type: str):
+        paper_contents[pmid] = IndraDataManager.extract_paper_text(content, content_type)
+
+        if not paper_contents[pmid]:
+            del paper_contents[pmid]
+            IndraDataManager.set_pm_exlude(pmid)
+
+        if pmid in paper_contents and pmid not in IndraDataManager.PMIDS:
+            pm_data = {
+                "content": paper_contents[pmid],
+                "content_type": content_type,
+            }
+            IndraDataManager.set_pm_cache(pmid, pm_data)
+            # not cached before, nothing else to merge
+            self._pm_mem[pmid] = pm_data
+            IndraDataManager.PMIDS.add(pmid)
+
     def get_full_text(self, pubmed_ids: List[str]) -> Dict[str, str]:
         paper_contents = dict()
+        IndraDataManager.load_pmid_membership(pubmed_ids)
 
-        for pmid in tqdm(pubmed_ids, desc="Getting papers"):
-            if pmid in IndraDataManager.PMIDS_EXCLUDE:
+        for pmid in pubmed_ids:
+            if pmid in IndraDataManager.PMIDS_EXCLUDE or pmid not in IndraDataManager.PMIDS:
                 continue
-            if pmid in IndraDataManager.PMIDS:
-                pm_data = (
-                    self._pm_mem[pmid]
-                    if pmid in self._pm_mem
-                    else IndraDataManager.fetch_pm_cache(pmid)
-                )
-                content, content_type = pm_data["content"], pm_data["content_type"]
-            else:
-                content, content_type = literature.get_full_text(pmid, "pmid")
-
-            if content_type == "abstract":
-                paper_contents[pmid] = content
-            elif content_type == "pmc_oa_xml":
-                if content.startswith("<?xml"):
-                    soup = BeautifulSoup(content, features="xml")
-                    body = soup.find_all("body")
-                    paper_contents[pmid] = body[0].text if body else ""
-                else:
-                    paper_contents[pmid] = content
-            elif content_type == "elsevier_xml" and os.environ.get(
-                "ELSEVIER_API_KEY", ""
-            ):
-                try:
-                    paper_contents[pmid] = extract_text(content)
-                except ParseError:
-                    paper_contents[pmid] = ""
-            else:
-                paper_contents[pmid] = content
-
-            if pmid in paper_contents and not paper_contents[pmid]:
-                del paper_contents[pmid]
-                IndraDataManager.set_pm_exlude(pmid)
-
-            if pmid in paper_contents and pmid not in IndraDataManager.PMIDS:
-                pm_data = {
-                    "content": paper_contents[pmid],
-                    "content_type": content_type,
+            pm_data = (
+                self._pm_mem[pmid]
+                if pmid in self._pm_mem
+                else IndraDataManager.fetch_pm_cache(pmid)
+            )
+            self._add_paper(paper_contents, pmid, pm_data["content"], pm_data["content_type"])
+
+        # Papers not cached yet are fetched concurrently; results are processed
+        # and cached on this thread, as they complete, so an interrupted run
+        # keeps what it fetched
+        missing = [
+            pmid for pmid in dict.fromkeys(pubmed_ids)
+            if pmid not in IndraDataManager.PMIDS_EXCLUDE and pmid not in IndraDataManager.PMIDS
+        ]
+        failures = IndraDataManager.fetch_full_text_failures(missing)
+        try:
+            with ThreadPoolExecutor(max_workers=self.full_text_workers) as executor:
+                futures = {
+                    executor.submit(IndraDataManager.fetch_full_text, pmid, self.max_retries): pmid
+                    for pmid in missing
                 }
-                IndraDataManager.set_pm_cache(pmid, pm_data)
-                self._pm_mem[pmid] = pm_data | IndraDataManager.fetch_pm_cache(pmid)
-                IndraDataManager.PMIDS.add(pmid)
-
-        return paper_contents
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Getting papers"):
+                    pmid = futures[future]
+                    try:
+                        content, content_type = future.result()
+                    except RETRY_ERRORS as e:
+                        # not excluded, it is fetched again on the next run
+                        print(f"Full text request failed for PMID {pmid}: {e}")
+                        continue
+                    if content is None:
+                        # a failed request or a paper without text, excluded once it keeps failing
+                        failures[pmid] = failures.get(pmid, 0) + 1
+                        if failures[pmid] >= IndraDataManager.FULL_TEXT_MAX_FAILURES:
+                            IndraDataManager.set_pm_exlude(pmid)
+                        else:
+                            IndraDataManager.PM_CACHE_WRITER.set_failures(pmid, failures[pmid])
+                        continue
+                    self._add_paper(paper_contents, pmid, content, content_type)
+        finally:
+            IndraDataManager.flush_pm_cache()
+
+        return {pmid: paper_contents[pmid] for pmid in pubmed_ids if pmid in paper_contents}
 
     def load_pm_mem(self, pmids: List[str]):
-        cur = IndraDataManager.PM_CACHE.cursor()
-        pm_data = cur.execute(
-            f"select pmid, data from pm_cache where pmid in ({','.join(pmids)})"
-        )
-        for pmid, data in pm_data.fetchall():
-            self._pm_mem[pmid] = json.loads(data)
-        cur.close()
+        with IndraDataManager.PM_CACHE_WRITER.lock:
+            IndraDataManager.PM_CACHE_WRITER.flush()
+            cur = IndraDataManager.PM_CACHE.cursor()
+            for batch in IndraDataManager._pmid_batches([str(pmid) for pmid in pmids]):
+                pm_data = cur.execute(
+                    f"{IndraDataManager.PM_CACHE_SELECT} where pmid in ({','.join('?' for _ in batch)})",
+                    batch,
+                )
+                for pmid, *record in pm_data.fetchall():
+                    self._pm_mem[pmid] = IndraDataManager._pm_cache_record(*record)
+                    IndraDataManager.PMIDS.add(pmid)
+            cur.close()
+
+    def read_papers(self, papers: Dict[str, str]) -> Dict[str, list]:
+        """
+        Read papers with REACH, split in paragraph chunks read concurrently
+        (`reach_workers` at a time). The statements of each chunk are cached as
+        it is read, so an interrupted run resumes from the chunks left; the
+        statements of a paper are merged, in chunk order, and cached once all
+        its chunks are read. Papers with a failed chunk are left out.
+        """
+        chunks = {
+            pmid: {
+                IndraDataManager.chunk_key(chunk): chunk
+                for chunk in IndraDataManager.split_paragraphs(text, self.reach_chunk_size)
+            }
+            for pmid, text in papers.items()
+        }
+        read = IndraDataManager.fetch_reach_chunks(list(papers))
+        statements: Dict[str, list] = dict()
+        failed = set()
+
+        def _merge(pmid: str):
+            statements[pmid] = [stmt for key in chunks[pmid] for stmt in read[pmid][key]]
+            IndraDataManager.set_pm_cache(pmid, {"pm_statements": statements[pmid]})
+            IndraDataManager.PM_CACHE_WRITER.clear_chunks(pmid)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.reach_workers) as executor:
+                futures = dict()
+                for pmid, paper_chunks in chunks.items():
+                    read.setdefault(pmid, dict())
+                    for key, chunk in paper_chunks.items():
+                        if key not in read[pmid]:
+                            future = executor.submit(
+                                IndraDataManager.call_reach_process_text, chunk, False, self.max_retries
+                            )
+                            futures[future] = (pmid, key)
+                left = {pmid: 0 for pmid in chunks}
+                for pmid, _ in futures.values():
+                    left[pmid] += 1
+                for pmid in chunks:
+                    if not left[pmid]:
+                        _merge(pmid)
+
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Getting statements..."):
+                    pmid, key = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Reading failed for PMID {pmid}: {e}")
+                        result = None
+                    if result is None:
+                        failed.add(pmid)
+                    else:
+                        read[pmid][key] = result
+                        IndraDataManager.PM_CACHE_WRITER.set_chunk(pmid, key, result)
+                    left[pmid] -= 1
+                    if not left[pmid] and pmid not in failed:
+                        _merge(pmid)
+        finally:
+            IndraDataManager.flush_pm_cache()
+
+        for pmid in failed:
+            print(f"Could not read PMID {pmid}, its chunks read so far are kept to resume")
+        return {pmid: statements[pmid] for pmid in papers if pmid in statements}
 
     @property
     def pubmed_statements(self) -> Dict[str, dict]:
@@ -299,17 +768,25 @@ class IndraDataManager:
                 pmids.update(pmid_set)
             self.load_pm_mem(list(pmids))
             self._papers = self.get_full_text(list(pmids))
-            self._pm_statements = dict()
-            for pmid in tqdm(self._papers, desc="Getting statements..."):
+
+            cached = dict()
+            for pmid in self._papers:
                 if pmid in IndraDataManager.PMIDS:
                     pm_data = self._pm_mem[pmid] if pmid in self._pm_mem else IndraDataManager.fetch_pm_cache(pmid)
-                    if "pm_statements" in pm_data:
-                        self._pm_statements[pmid] = pm_data["pm_statements"]
+                    # failed readings were cached as None by earlier versions, read again
+                    if pm_data.get("pm_statements") is not None:
+                        cached[pmid] = pm_data["pm_statements"]
 
-                if pmid not in self._pm_statements:
-                    self._pm_statements[pmid] = IndraDataManager.call_reach_process_text(self._papers[pmid])
-                    IndraDataManager.set_pm_cache(pmid, {"pm_statements": self._pm_statements[pmid]})
-                    self._pm_mem[pmid] = {"pm_statements": self._pm_statements[pmid]} | IndraDataManager.fetch_pm_cache(pmid)
+            read = self.read_papers({pmid: text for pmid, text in self._papers.items() if pmid not in cached})
+            for pmid, pm_statements in read.items():
+                pm_data = self._pm_mem[pmid] if pmid in self._pm_mem else IndraDataManager.fetch_pm_cache(pmid)
+                self._pm_mem[pmid] = pm_data | {"pm_statements": pm_statements}
+
+            self._pm_statements = {
+                pmid: cached[pmid] if pmid in cached else read[pmid]
+                for pmid in self._papers
+                if pmid in cached or pmid in read
+            }
 
         return self._pm_statements
 
@@ -327,14 +804,84 @@ class IndraDataManager:
 
         return self._papers
 
+    @staticmethod
+    def statements_hash(statements: List[dict]) -> str:
+        """ Hash of a set of statements (JSON), independent of their order and ids. """
+        digest = hashlib.sha256()
+        for stmt in sorted(
+            json.dumps({key: value for key, value in stmt.items() if key != "id"}, sort_keys=True)
+            for stmt in statements
+        ):
+            digest.update(stmt.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def preassembly_batches(self) -> List[List[dict]]:
+        """
+        Statements (JSON) preassembled separately: the PubMed statements of each
+        gene (a paper belongs to the first gene citing it) and the GeneNetwork
+        statements, in batches of up to `preassembly_batch_size`.
+
+        A gene's batches hold whole papers in PMID order (a larger paper is a batch
+        on its own), so newer papers only change the last batches of the gene and
+        the hashes of the others still match their cached preassembly.
+        """
+        size = self.preassembly_batch_size if self.preassembly_batch_size > 0 else None
+        batches = list()
+        assigned = set()
+        for gene in self._genes:
+            pmids = sorted(
+                set(self._gene_doc_map.get(gene, ())) - assigned,
+                key=lambda pmid: (len(str(pmid)), str(pmid)),
+            )
+            assigned.update(pmids)
+            batch = list()
+            for pmid in pmids:
+                paper = self.pubmed_statements.get(pmid) or []
+                if size and batch and len(batch) + len(paper) > size:
+                    batches.append(batch)
+                    batch = list()
+                batch.extend(paper)
+            if batch:
+                batches.append(batch)
+
+        gn_size = size or max(1, len(self._gn_statements))
+        batches.extend(
+            self._gn_statements[i:i + gn_size] for i in range(0, len(self._gn_statements), gn_size)
+        )
+        return batches
+
+    def preassemble_batch(self, statements: List[dict]) -> List[Statement]:
+        """ Preassembled statements of a batch, cached by the hash of the batch. """
+        statements_hash = IndraDataManager.statements_hash(statements)
+        cached = IndraDataManager.fetch_preassembled(statements_hash)
+        if cached is not None:
+            return stmts_from_json(cached)
+        try:
+            preassembled = IndraDataManager.call_preassembly_statements(stmts_from_json(statements), strict=True)
+        except Exception as e:
+            # not cached, preassembled again on the next run
+            print(f"Preassembly failed for a batch of {len(statements)} statements: {e}")
+            return stmts_from_json(statements)
+        IndraDataManager.PM_CACHE_WRITER.set_preassembled(statements_hash, stmts_to_json(preassembled))
+        return preassembled
+
     @property
     def statements(self) -> List[Statement]:
         if (not self._all_statements):
-            self._gn_statements = IndraDataManager.get_gn_statements(self._genes)
-            statements = stmts_from_json(self.pubmed_statements.values()) + self._gn_statements
-            statements = IndraDataManager.call_preassembly_statements(statements)
-            self._gn_statements = stmts_to_json(self._gn_statements)
-            self._all_statements = statements
+            self._gn_statements = stmts_to_json(IndraDataManager.get_gn_statements(self._genes))
+            _ = self.pubmed_statements
+            statements = list()
+            try:
+                for batch in tqdm(self.preassembly_batches(), desc="Preassembling statements"):
+                    statements.extend(self.preassemble_batch(batch))
+            finally:
+                IndraDataManager.flush_pm_cache()
+            # batches share statements (papers citing several genes, GeneNetwork) and refine
+            # each other, merge their evidence and relate them as run_preassembly does per batch
+            self._all_statements = Preassembler(bio_ontology, statements).combine_related(
+                return_toplevel=IndraDataManager.PREASSEMBLY_RETURN_TOPLEVEL
+            )
 
         return self._all_statements
 
@@ -11,10 +11,17 @@ from lunarcore.component.lunar_component import LunarComponent
 from lunarcore.component.component_group import ComponentGroup
 from lunarcore.component.data_types import DataType
 
-from lunar_nl2sql.services.ai import AzureOpenAIService
+from lunar_nl2sql.services.ai import (
+    AzureOpenAIService,
+    MemoryResponseCache,
+    SqliteResponseCache,
+)
 from lunar_nl2sql.indexers.indexer import Indexer
+from lunar_nl2sql.indexers.schema_store import SchemaStore
 from lunar_nl2sql.retrievers.context_retriever import ContextRetriever
 from lunar_nl2sql.generators.generator import Generator
+from lunar_nl2sql.generators.types import QueryValidation
+from lunar_nl2sql.generators.context_builder import ContextBuilder
 from nl2sql.data_access_factory import data_access_factory
 
 
@@ -33,6 +40,19 @@ class NL2SQL(
     deployment_name="$LUNARENV::DEPLOYMENT_NAME",
     openai_api_key="$LUNARENV::OPENAI_API_KEY",
     azure_endpoint="$LUNARENV::AZURE_OPENAI_ENDPOINT",
+    schema_store_path="",
+    max_concurrency="1",
+    embedding_deployment_name="",
+    max_candidate_tables="0",
+    response_cache_size="0",
+    response_cache_path="",
+    response_cache_ttl="0",
+    use_value_index="False",
+    query_validation="",
+    validation_row_limit="100",
+    validation_timeout="10",
+    refresh_data_access="False",
+    context_token_budget="0",
 ):
     def __init__(self, **kwargs: Any):
         super().__init__(configuration=kwargs)
@@ -42,18 +62,71 @@ class NL2SQL(
                 "openai_api_version": self.configuration["openai_api_version"],
                 "azure_endpoint": self.configuration["azure_endpoint"],
                 "model": self.configuration["deployment_name"],
-            }
+                "max_concurrency": int(self.configuration["max_concurrency"]),
+                "embedding_model": self.configuration["embedding_deployment_name"],
+            },
+            response_cache=self._response_cache(),
         )
+        self.schema_store = (
+            SchemaStore(self.configuration["schema_store_path"])
+            if self.configuration.get("schema_store_path")
+            else None
+        )
+
+    def _response_cache(self):
+        ttl = float(self.configuration["response_cache_ttl"]) or None
+        if self.configuration["response_cache_path"]:
+            return SqliteResponseCache(self.configuration["response_cache_path"], ttl)
+        if int(self.configuration["response_cache_size"]) > 0:
+            return MemoryResponseCache(
+                int(self.configuration["response_cache_size"]), ttl
+            )
+        return None
 
     def run(self, questions: List[str], db_type: str, db_config: dict) -> dict:
-        data_access = data_access_factory(db_type, db_config)
+        data_access = data_access_factory(
+            db_type,
+            db_config,
+            refresh=self.configuration["refresh_data_access"]
+            in [True, 1, "True", "1"],
+        )
 
-        indexer = Indexer(self.ai_service, data_access)
-        context_retriever = ContextRetriever(self.ai_service, indexer)
+        indexer = Indexer(self.ai_service, data_access, self.schema_store)
+        context_retriever = ContextRetriever(
+            self.ai_service,
+            indexer,
+            max_candidate_tables=int(self.configuration["max_candidate_tables"]),
+            use_value_index=self.configuration["use_value_index"]
+            in [True, 1, "True", "1"],
+        )
+
+        query_validation = self.configuration["query_validation"]
+        generator = Generator(
+            self.ai_service,
+            context_retriever,
+            data_access=data_access,
+            validation=(
+                QueryValidation(query_validation)
+                if query_validation
+                else QueryValidation.EXPLAIN
+            ),
+            row_limit=int(self.configuration["validation_row_limit"]),
+            timeout=float(self.configuration["validation_timeout"]),
+            context_builder=ContextBuilder(
+                token_budget=int(self.configuration["context_token_budget"]) or None
+            ),
+        )
 
-        generator = Generator(self.ai_service, context_retriever)
+        # Index once up front so the questions share it instead of racing to build it.
+        indexer.nl_db_schema
+        if context_retriever.use_value_index:
+            indexer.value_index
 
-        result = {}
-        for nl_query in questions:
-            result[nl_query] = generator.generate(nl_query)
-        return result
+        if query_validation:
+            results = self.ai_service.map(
+                lambda nl_query: generator.generate_validated(nl_query).model_dump(),
+                questions,
+            )
+        else:
+            results = self.ai_service.map(generator.generate, questions)
+        return dict(zip(questions, results))
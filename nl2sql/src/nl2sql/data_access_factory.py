@@ -1,14 +1,48 @@
+import json
+import threading
 from nl2sql.types.enums.db_types_enum import DBTypesEnum
 import lunar_nl2sql.data_access as data_access
 import nl2sql.types.db_types_config as db_types_config
 from pydantic import ValidationError
 
+"""
+Data accesses shared by the runs of the process, keyed by database type and configuration,
+so connections, table lists and samples are reused across runs.
+"""
+_registry: dict[tuple[str, str], data_access.DataAccess] = {}
+_registry_lock = threading.Lock()
 
-def data_access_factory(db_type: str, config: dict) -> data_access.DataAccess:
+
+def data_access_factory(
+    db_type: str, config: dict, refresh: bool = False
+) -> data_access.DataAccess:
+    """
+    Return the data access of the database, creating it on first use.
+    With refresh, a registered data access reloads its tables and samples.
+    """
+    key = (db_type, json.dumps(config, sort_keys=True, default=str))
+    with _registry_lock:
+        instance = _registry.get(key)
+        if instance is None:
+            instance = _registry[key] = _create_data_access(db_type, config)
+        elif refresh:
+            instance.refresh()
+    return instance
+
+
+def clear_data_access_registry() -> None:
+    with _registry_lock:
+        _registry.clear()
+
+
+def _create_data_access(db_type: str, config: dict) -> data_access.DataAccess:
     try:
         if db_type == DBTypesEnum.CSV.value:
             db_types_config.CsvConfig(**config)
             return data_access.CsvDataAccess(**config)
+        elif db_type == DBTypesEnum.DUCKDB_CSV.value:
+            db_types_config.CsvConfig(**config)
+            return data_access.DuckDBCsvDataAccess(**config)
         elif db_type == DBTypesEnum.SQLITE.value:
             db_types_config.SqliteConfig(**config)
             return data_access.SqliteDataAccess(**config)
@@ -3,4 +3,5 @@ from enum import Enum
 
 class DBTypesEnum(Enum):
     CSV = "csv"
+    DUCKDB_CSV = "duckdb_csv"
     SQLITE = "sqlite"